@@ -1,10 +1,15 @@
 import os
 import logging
 import sys
+import time
 from datetime import datetime
-from flask import Flask, render_template
+from flask import Flask, render_template, request, jsonify
 from flask_socketio import SocketIO, emit
-from src.orchestrator.agent_orchestrator import AgentOrchestrator
+from src.orchestrator.session_registry import SessionRegistry
+from src.orchestrator.turn_metrics import BARGE_IN, TURN_GAP
+from src.orchestrator.voice_channel import VoiceChannel
+from src.services.sentence_splitter import SentenceStream, split_sentences
+from config.settings import settings
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -35,34 +40,143 @@ app = Flask(__name__,
 # async_mode='eventlet' or 'gevent' is recommended for production-grade sockets
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode=None)
 
-orchestrator = None
+# One orchestrator per Socket.IO client; LLM, KB, DB and speech clients are shared.
+sessions = SessionRegistry()
 
 def get_orchestrator():
-    global orchestrator
-    if orchestrator is None:
-        logger.info("Initializing Agent Orchestrator...")
-        orchestrator = AgentOrchestrator()
-    return orchestrator
+    return sessions.get(request.sid)
 
 @app.route('/')
 def index():
     logger.info("New browser connection established.")
     return render_template('index.html')
 
+@app.route('/stats')
+def stats():
+    services = sessions.services
+    audio_cache = services.speech_service.audio_cache
+    return jsonify({
+        "active_sessions": len(sessions),
+        "session_evictions": sessions.evictions,
+        "turn_classifier": services.turn_classifier.get_stats(),
+        "tts_cache": audio_cache.get_stats() if audio_cache else None,
+        "turn_metrics": services.turn_metrics.get_stats(),
+        "speech_pools": services.speech_service.get_pool_stats(),
+        "tts_output_format": services.speech_service.output_format.name,
+        "catalog_version": services.knowledge_service.catalog_version,
+        "listing_cache": services.knowledge_service.get_listing_stats(),
+        "availability_cache": services.booking_service.get_availability_stats(),
+        "slot_holds": services.booking_service.get_hold_stats()
+    })
+
 # 3. WEBSOCKET EVENT HANDLERS
 @socketio.on('connect')
 def handle_connect():
     logger.info("Client connected via WebSocket.")
 
+@socketio.on('disconnect')
+def handle_disconnect(*args):
+    sessions.remove(request.sid)
+    logger.info("Client disconnected.")
+
+# Replies are emitted with socketio.emit(..., to=sid) rather than the request-bound
+# emit(), because voice turns are answered from background tasks.
+
+# Every reply event carries its turn id, so after a barge-in the browser can drop
+# whatever of the interrupted turn is still in flight.
+
+# Audio is emitted as raw bytes: Socket.IO sends them as binary attachments, and the
+# browser receives an ArrayBuffer it can hand straight to a Blob or decodeAudioData.
+# Each payload names its format (TTS_OUTPUT_FORMAT) so the client picks the MIME type.
+def emit_audio_chunks(orch, chunks, sid, heard_at=None):
+    """Emits finished chunks until the turn is interrupted; returns how many were sent."""
+    sent = 0
+    for seq, sentence, audio in chunks:
+        if orch.turn_cancelled.is_set():
+            break
+        socketio.emit('assistant_audio_chunk', {
+            **orch.speech_service.output_format.describe(),
+            "turn": orch.turn_id,
+            "seq": seq,
+            "text": sentence,
+            "audio": audio or None
+        }, to=sid)
+        if heard_at is not None and sent == 0:
+            orch.services.turn_metrics.record(TURN_GAP, heard_at)
+        sent += 1
+    return sent
+
+def send_reply(orch, pieces, sid, heard_at=None, **extra):
+    """Forwards reply text as it is produced, then sends its audio.
+
+    With TTS streaming, each sentence goes to synthesis as soon as it is complete
+    in the text stream, so audio for the first sentence can play while the LLM is
+    still writing the rest. If the caller barges in, generation and any queued
+    synthesis are abandoned and the reply is cut off where it stands.
+    """
+    pipeline = orch.speech_service.synthesis_pipeline() if settings.TTS_STREAMING_ENABLED else None
+    splitter = SentenceStream()
+    parts = []
+
+    try:
+        for piece in pieces:
+            if orch.turn_cancelled.is_set():
+                break
+            parts.append(piece)
+            socketio.emit('assistant_partial', {"turn": orch.turn_id, "text": piece}, to=sid)
+            if pipeline:
+                for sentence in splitter.feed(piece):
+                    pipeline.submit(sentence)
+                if emit_audio_chunks(orch, pipeline.ready(), sid, heard_at):
+                    heard_at = None
+    finally:
+        if hasattr(pieces, "close"):
+            pieces.close()
+
+    response_text = "".join(parts).strip()
+    reply = {**extra, "turn": orch.turn_id, "response": response_text}
+
+    if orch.turn_cancelled.is_set():
+        if pipeline:
+            pipeline.cancel()
+        logger.info(f"AGENT_SOCKET_RESP (interrupted): {response_text}")
+        socketio.emit('assistant_response', {**reply, "audio": None, "interrupted": True}, to=sid)
+        return
+
+    logger.info(f"AGENT_SOCKET_RESP: {response_text}")
+
+    if not pipeline:
+        audio = orch.speech_service.text_to_speech(response_text)
+        socketio.emit('assistant_response', {
+            **reply,
+            **orch.speech_service.output_format.describe(),
+            "audio": audio or None
+        }, to=sid)
+        if heard_at is not None and audio:
+            orch.services.turn_metrics.record(TURN_GAP, heard_at)
+        return
+
+    for sentence in splitter.flush():
+        pipeline.submit(sentence)
+    socketio.emit('assistant_response', {**reply, "audio": None, "streaming": True}, to=sid)
+    emit_audio_chunks(orch, pipeline.drain(), sid, heard_at)
+    pipeline.cancel()
+    socketio.emit('assistant_audio_end', {"turn": orch.turn_id}, to=sid)
+
+def reply_to(orch, user_text, sid, heard_at=None, **extra):
+    with orch.turn_lock:
+        orch.begin_turn()
+        if settings.LLM_STREAMING_ENABLED:
+            send_reply(orch, orch.stream_text_input(user_text), sid, heard_at, **extra)
+        else:
+            send_reply(orch, [orch.process_text_input(user_text)], sid, heard_at, **extra)
+
 @socketio.on('request_greeting')
 def handle_greeting():
     orch = get_orchestrator()
-    greeting = orch._handle_greeting()
-    audio = orch.speech_service.text_to_speech(greeting)
-    emit('assistant_response', {
-        "response": greeting,
-        "audio": audio.hex() if audio else None
-    })
+    with orch.turn_lock:
+        orch.begin_turn()
+        send_reply(orch, [orch._handle_greeting()], request.sid)
 
 @socketio.on('send_message')
 def handle_message(data):
@@ -70,39 +184,71 @@ def handle_message(data):
     logger.info(f"USER_SOCKET_TEXT: {user_text}")
     
     orch = get_orchestrator()
-    response_text = orch.process_text_input(user_text)
-    
-    logger.info(f"AGENT_SOCKET_RESP: {response_text}")
-    audio = orch.speech_service.text_to_speech(response_text)
-    
-    emit('assistant_response', {
-        "response": response_text,
-        "audio": audio.hex() if audio else None
-    })
+    reply_to(orch, user_text, request.sid)
 
-@socketio.on('start_voice')
-def handle_voice():
+# Browser microphone: 16 kHz 16-bit mono PCM frames are pushed into a per-session
+# continuous recognizer; partial hypotheses go back to the caller as they arrive and
+# every final utterance is answered as soon as the end of speech is detected.
+@socketio.on('start_stream')
+def handle_start_stream():
+    sid = request.sid
     orch = get_orchestrator()
-    logger.info("Microphone triggered via WebSocket")
-    user_input = orch.speech_service.listen_and_transcribe()
-    
-    if not user_input:
-        emit('assistant_response', {
-            "response": "I didn't catch that. Could you please repeat?",
-            "audio": None
-        })
+    orch.close_voice_channel()
+    orch.voice_channel = VoiceChannel(
+        orch.speech_service,
+        on_partial=lambda text: socketio.emit('partial_transcript', {"text": text}, to=sid),
+        on_final=lambda text: socketio.start_background_task(handle_utterance, sid, text, time.monotonic()),
+        on_speech_start=lambda: handle_speech_start(orch, sid)
+    )
+    logger.info("Microphone stream opened via WebSocket")
+    emit('stream_started', {"sample_rate": settings.SPEECH_SAMPLE_RATE})
+
+@socketio.on('audio_frame')
+def handle_audio_frame(frame):
+    orch = sessions.touch(request.sid)
+    if orch and orch.voice_channel:
+        orch.voice_channel.write(frame)
+
+@socketio.on('stop_stream')
+def handle_stop_stream():
+    orch = sessions.touch(request.sid)
+    if orch:
+        orch.close_voice_channel()
+    logger.info("Microphone stream closed via WebSocket")
+
+def handle_speech_start(orch, sid):
+    # Barge-in: the caller started talking. Abandon the reply if it is still being
+    # produced, and have the browser stop whatever of it is still playing.
+    orch.interrupt()
+    socketio.emit('barge_in', {"turn": orch.turn_id}, to=sid)
+
+@socketio.on('barge_in_ack')
+def handle_barge_in_ack(data):
+    # The browser stopped playback; only count it if something was actually playing
+    orch = sessions.touch(request.sid)
+    channel = orch.voice_channel if orch else None
+    if channel and channel.speech_started_at and data.get('stopped'):
+        orch.services.turn_metrics.record(BARGE_IN, channel.speech_started_at)
+
+def handle_utterance(sid, user_input, heard_at):
+    orch = sessions.touch(sid)
+    if orch is None:
         return
 
     logger.info(f"USER_SOCKET_VOICE: {user_input}")
-    response_text = orch.process_text_input(user_input)
-    audio = orch.speech_service.text_to_speech(response_text)
-    
-    emit('assistant_response', {
-        "user_said": user_input,
-        "response": response_text,
-        "audio": audio.hex() if audio else None
-    })
+    socketio.emit('user_transcript', {"text": user_input}, to=sid)
+    reply_to(orch, user_input, sid, heard_at)
+
+def warm_up():
+    services = sessions.services
+    services.speech_service.prewarm()
+    prompts = services.known_prompts()
+    if settings.TTS_STREAMING_ENABLED:
+        # Streamed replies are cached per sentence, so warm the sentences too
+        prompts += [sentence for prompt in prompts for sentence in split_sentences(prompt)]
+    services.speech_service.warm_cache(prompts)
 
 if __name__ == '__main__':
     logger.info(f"--- Application started. Logging to {log_filename} ---")
+    socketio.start_background_task(warm_up)
     socketio.run(app, debug=True, port=5000, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""Compares hex-in-JSON against binary Socket.IO attachments for TTS audio payloads.
+
+Measures, for typical 3-10 second replies:
+  * bytes on the wire, using python-socketio's own packet encoder
+  * server encode time (bytes.hex() vs. nothing)
+  * client decode time, replaying the browser's old algorithm (regex split +
+    parseInt per byte) against the new one (wrap the ArrayBuffer in a Blob, i.e.
+    no per-byte work)
+
+Usage: python benchmarks/bench_audio_transport.py
+"""
+import io
+import math
+import random
+import re
+import sys
+import time
+import wave
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from socketio import packet
+
+SAMPLE_RATE = 24000  # Azure's default synthesis format: 24 kHz, 16-bit mono RIFF
+DURATIONS = [3, 5, 10]
+REPEATS = 5
+
+
+def make_wav(seconds: float) -> bytes:
+    rng = random.Random(seconds)
+    frames = bytearray()
+    for i in range(int(SAMPLE_RATE * seconds)):
+        value = 8000 * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE) + rng.randint(-500, 500)
+        frames += int(value).to_bytes(2, "little", signed=True)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(bytes(frames))
+    return buffer.getvalue()
+
+
+def wire_bytes(payload: dict) -> int:
+    encoded = packet.Packet(packet.EVENT, data=["assistant_response", payload]).encode()
+    parts = encoded if isinstance(encoded, list) else [encoded]
+    return sum(len(p.encode("utf-8") if isinstance(p, str) else p) for p in parts)
+
+
+def best_of(fn) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def decode_hex_like_browser(hex_string: str) -> bytes:
+    # new Uint8Array(hex.match(/.{1,2}/g).map(byte => parseInt(byte, 16)))
+    return bytes(int(pair, 16) for pair in re.findall(r".{1,2}", hex_string))
+
+
+def decode_binary_like_browser(buffer: bytes) -> memoryview:
+    # new Blob([arrayBuffer]) - a view over the received buffer, no per-byte work
+    return memoryview(buffer)
+
+
+def main():
+    text = "Great, I have you down for the 2024 Toyota Camry. What time works best for you?"
+    print(f"{'seconds':>7} {'audio KB':>9} {'hex KB':>9} {'binary KB':>10} {'saved':>6} "
+          f"{'encode ms':>10} {'hex decode ms':>14} {'bin decode ms':>14}")
+
+    for seconds in DURATIONS:
+        audio = make_wav(seconds)
+        hex_audio = audio.hex()
+
+        hex_size = wire_bytes({"response": text, "audio": hex_audio})
+        binary_size = wire_bytes({"response": text, "audio": audio})
+
+        encode_ms = best_of(lambda: audio.hex())
+        hex_decode_ms = best_of(lambda: decode_hex_like_browser(hex_audio))
+        binary_decode_ms = best_of(lambda: decode_binary_like_browser(audio))
+
+        assert decode_hex_like_browser(hex_audio) == audio
+
+        print(f"{seconds:>7} {len(audio) / 1024:>9.1f} {hex_size / 1024:>9.1f} {binary_size / 1024:>10.1f} "
+              f"{1 - binary_size / hex_size:>6.0%} {encode_ms:>10.2f} {hex_decode_ms:>14.2f} {binary_decode_ms:>14.4f}")
+
+
+if __name__ == "__main__":
+    main()
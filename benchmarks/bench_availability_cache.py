@@ -0,0 +1,125 @@
+"""Availability questions during a busy weekend morning, with and without the availability cache.
+
+Fills a bookings database with a year of bookings, then replays the same mix
+of calls against BookingService both ways: mostly "is 2pm free?", "what's open
+Saturday?" and "next opening this week" about the coming weekend, with a
+booking or a cancellation now and then. Answers are checked to match; the
+SELECTs sent to the database are counted.
+
+Usage: python benchmarks/bench_availability_cache.py [calls]
+"""
+import logging
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from sqlalchemy import event, insert
+from src.agents.booking_agent import NEXT_OPENING_SEARCH_DAYS
+from src.services.booking_service import Booking, BookingService, SlotUnavailableError
+from config.settings import settings
+
+CALLS = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+ROWS = 100_000
+VEHICLES = 200
+WRITE_SHARE = 0.03
+
+
+def make_calls(start: datetime):
+    rng = random.Random(11)
+    weekend = [start + timedelta(days=5), start + timedelta(days=6)]
+    calls = []
+    for _ in range(CALLS):
+        day = rng.choice(weekend) if rng.random() < 0.8 else start + timedelta(days=rng.randrange(14))
+        slot = day.replace(hour=rng.randrange(9, 17), minute=rng.choice([0, 30]))
+        vehicle = f"veh_{rng.randrange(VEHICLES):03d}"
+        roll = rng.random()
+        if roll < WRITE_SHARE:
+            calls.append(("book", slot, vehicle))
+        elif roll < 2 * WRITE_SHARE:
+            calls.append(("cancel", rng.random(), vehicle))
+        elif roll < 0.45:
+            calls.append(("is_free", slot, vehicle))
+        elif roll < 0.8:
+            calls.append(("day", day, vehicle))
+        else:
+            calls.append(("next", day, vehicle))
+    return calls
+
+
+def replay(service: BookingService, calls):
+    booked, answers = [], []
+    began = time.perf_counter()
+    for kind, arg, vehicle in calls:
+        if kind == "book":
+            try:
+                booked.append(service.create_booking("Customer", "5551234567", vehicle, "Car", arg).id)
+            except SlotUnavailableError:
+                answers.append(None)
+        elif kind == "cancel":
+            if booked:
+                answers.append(service.cancel_booking(booked.pop(int(arg * len(booked)))))
+        elif kind == "is_free":
+            answers.append(service.is_slot_available(arg, vehicle))
+        elif kind == "day":
+            answers.append(service.get_available_slots(arg, vehicle_id=vehicle))
+        else:
+            answers.append(service.find_available_slots(arg, NEXT_OPENING_SEARCH_DAYS, limit=1, vehicle_id=vehicle))
+    return answers, (time.perf_counter() - began) * 1000
+
+
+def run(path: str, cached: bool, calls):
+    settings.AVAILABILITY_CACHE_ENABLED = cached
+    service = BookingService(f"sqlite:///{path}")
+    selects = [0]
+
+    @event.listens_for(service.engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects[0] += 1
+
+    answers, elapsed_ms = replay(service, calls)
+    service.engine.dispose()
+    return answers, elapsed_ms, selects[0], service.get_availability_stats()
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    rng = random.Random(3)
+    start = datetime(2025, 6, 2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = [{"customer_name": "x", "customer_phone": "5551234567",
+                 "vehicle_id": f"veh_{rng.randrange(VEHICLES):03d}", "vehicle_name": "Car",
+                 "booking_date": start + timedelta(days=rng.randrange(-180, 180), hours=rng.randrange(9, 18)),
+                 "status": "confirmed"} for _ in range(ROWS)]
+        seed = BookingService(f"sqlite:///{tmp}/seed.db")
+        with seed.unit_of_work() as session:
+            session.execute(insert(Booking), rows)
+        seed.engine.dispose()
+
+        calls = make_calls(start)
+        results = {}
+        for cached in (False, True):
+            # Each run gets its own copy so both see the same bookings
+            path = f"{tmp}/{'cached' if cached else 'plain'}.db"
+            Path(path).write_bytes(Path(f"{tmp}/seed.db").read_bytes())
+            results[cached] = run(path, cached, calls)
+
+    assert results[False][0] == results[True][0], "cached answers differ"
+    writes = sum(kind in ("book", "cancel") for kind, _, _ in calls)
+    print(f"{CALLS} calls ({writes} bookings/cancellations) over {ROWS} existing bookings\n")
+    print(f"{'availability cache':<20} {'total ms':>9} {'SELECTs':>8}")
+    for cached in (False, True):
+        _, elapsed_ms, selects, _ = results[cached]
+        print(f"{'on' if cached else 'off':<20} {elapsed_ms:>9.0f} {selects:>8}")
+    print(f"\ncache: {results[True][3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Energy VAD used for barge-in: detection delay, false triggers and CPU cost.
+
+Synthetic 16 kHz audio: a noise bed at a few levels with "speech" bursts (a
+harmonic tone under a syllable-rate envelope) dropped in. Reports, per noise
+level, how long after a burst starts the VAD fires (this delay plus the network
+round trip is what the caller hears before the assistant stops), how often a
+pure-noise stretch triggers it, and how long one second of audio takes to process.
+
+Usage: python benchmarks/bench_barge_in.py
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.services.voice_activity import EnergyVAD, SPEECH_START
+
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = 1365  # what the browser sends: 4096 samples at 48 kHz, downsampled
+NOISE_DBFS = [-70, -55, -45]
+TRIALS = 30
+
+
+def noise(rng, dbfs, seconds):
+    return rng.normal(0, 32768 * 10 ** (dbfs / 20), int(SAMPLE_RATE * seconds))
+
+
+def speech(rng, seconds, dbfs=-20):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    voice = sum(np.sin(2 * np.pi * f0 * t) / k for k, f0 in enumerate((140, 280, 420, 560), 1))
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)  # ~4 syllables per second
+    voice = voice / np.max(np.abs(voice)) * envelope
+    return voice * 32768 * 10 ** (dbfs / 20) + rng.normal(0, 50, len(t))
+
+
+def to_frames(signal):
+    pcm = np.clip(signal, -32768, 32767).astype("<i2").tobytes()
+    step = FRAME_SAMPLES * 2
+    return [pcm[i:i + step] for i in range(0, len(pcm), step)]
+
+
+def detection_delay_ms(vad, rng, noise_dbfs):
+    """Feeds 2 s of noise then speech; returns ms of speech audio before the VAD fired."""
+    for frame in to_frames(noise(rng, noise_dbfs, 2.0)):
+        if SPEECH_START in vad.feed(frame):
+            return None  # fired on noise
+    fed = 0
+    bed = noise(rng, noise_dbfs, 1.0)
+    for frame in to_frames(speech(rng, 1.0) + bed):
+        fed += len(frame) // 2
+        if SPEECH_START in vad.feed(frame):
+            return fed / SAMPLE_RATE * 1000
+    return float("inf")
+
+
+def main():
+    rng = np.random.default_rng(7)
+    print(f"{'noise dBFS':>10} {'p50 delay ms':>13} {'max delay ms':>13} {'missed':>7} {'false starts':>13}")
+
+    for noise_dbfs in NOISE_DBFS:
+        delays, false_starts, missed = [], 0, 0
+        for _ in range(TRIALS):
+            delay = detection_delay_ms(EnergyVAD(), rng, noise_dbfs)
+            if delay is None:
+                false_starts += 1
+            elif delay == float("inf"):
+                missed += 1
+            else:
+                delays.append(delay)
+        p50 = f"{statistics.median(delays):13.0f}" if delays else f"{'-':>13}"
+        worst = f"{max(delays):13.0f}" if delays else f"{'-':>13}"
+        print(f"{noise_dbfs:>10} {p50} {worst} {missed:>7} {false_starts:>13}")
+
+    frames = to_frames(noise(rng, -55, 10.0))
+    vad = EnergyVAD()
+    start = time.perf_counter()
+    for frame in frames:
+        vad.feed(frame)
+    per_second = (time.perf_counter() - start) * 1000 / 10
+    print(f"\nCPU: {per_second:.3f} ms per second of audio")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Bulk booking load and export at 100k rows.
+
+Times create_booking one row per commit (on a sample, extrapolated) against
+create_bookings (batched executemany, one transaction), the CSV import path,
+and exporting every booking to CSV and JSON Lines through the streaming
+iter_bookings against loading them all with query(...).all() first. Peak
+Python memory during each export is measured with tracemalloc.
+
+Usage: python benchmarks/bench_booking_bulk.py [rows]
+"""
+import csv
+import logging
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.services.booking_io import EXPORT_FIELDS, export_file, import_file, write_bookings
+from src.services.booking_service import Booking, BookingService
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+SAMPLE = 2_000
+
+
+def make_rows(count: int):
+    rng = random.Random(8)
+    start = datetime(2025, 1, 6, 9)
+    # One booking per vehicle per hour, so the per-row path's slot check never refuses one
+    return [{"customer_name": f"Walk-in {i}", "customer_phone": "5551234567", "vehicle_id": f"veh_{i % 1000:04d}",
+             "vehicle_name": "2024 Test Car", "booking_date": start + timedelta(days=i // 9000, hours=(i // 1000) % 9),
+             "status": "confirmed" if rng.random() < 0.95 else "cancelled"} for i in range(count)]
+
+
+def timed(fn, *args):
+    began = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - began
+
+
+def peak_mb(fn, *args):
+    tracemalloc.start()
+    began = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - began
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def export_materialized(service: BookingService, path: str):
+    """Export as it'd be written without streaming: every Booking loaded, then written."""
+    with service.unit_of_work() as session:
+        bookings = session.query(Booking).order_by(Booking.booking_date, Booking.id).all()
+    with open(path, "w", newline="") as target:
+        write_bookings(({field: getattr(b, field) for field in EXPORT_FIELDS} for b in bookings), target, "csv")
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    rows = make_rows(ROWS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        single = BookingService(f"sqlite:///{tmp}/single.db")
+        _, single_s = timed(lambda: [single.create_booking(r["customer_name"], r["customer_phone"], r["vehicle_id"],
+                                                           r["vehicle_name"], r["booking_date"]) for r in rows[:SAMPLE]])
+        single_rate = SAMPLE / single_s
+
+        service = BookingService(f"sqlite:///{tmp}/bulk.db")
+        count, bulk_s = timed(service.create_bookings, rows)
+        assert count == ROWS
+
+        csv_path, jsonl_path, full_path = f"{tmp}/all.csv", f"{tmp}/all.jsonl", f"{tmp}/all_loaded.csv"
+        csv_s, csv_mb = peak_mb(export_file, service, csv_path)
+        jsonl_s, jsonl_mb = peak_mb(export_file, service, jsonl_path)
+        full_s, full_mb = peak_mb(export_materialized, service, full_path)
+        assert Path(csv_path).read_bytes() == Path(full_path).read_bytes()
+
+        imported = BookingService(f"sqlite:///{tmp}/imported.db")
+        count, import_s = timed(import_file, imported, csv_path)
+        assert count == ROWS
+        with open(csv_path, newline="") as f:
+            exported = sum(1 for _ in csv.reader(f)) - 1
+        assert exported == ROWS
+
+    print(f"{ROWS} bookings\n")
+    print(f"{'load':<34} {'seconds':>8} {'rows/s':>9}")
+    print(f"{'create_booking, one per commit':<34} {ROWS / single_rate:>8.1f} {single_rate:>9.0f}   "
+          f"(extrapolated from {SAMPLE})")
+    print(f"{'create_bookings, one transaction':<34} {bulk_s:>8.1f} {ROWS / bulk_s:>9.0f}")
+    print(f"{'import CSV (parse + create_bookings)':<34} {import_s:>8.1f} {ROWS / import_s:>9.0f}")
+    print(f"\n{'export':<34} {'seconds':>8} {'peak MB':>9}")
+    print(f"{'iter_bookings -> CSV':<34} {csv_s:>8.1f} {csv_mb:>9.1f}")
+    print(f"{'iter_bookings -> JSONL':<34} {jsonl_s:>8.1f} {jsonl_mb:>9.1f}")
+    print(f"{'query().all() -> CSV':<34} {full_s:>8.1f} {full_mb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Bookings/sec and reads/sec with N simultaneous writers and readers.
+
+Compares the previous BookingService (one Session shared by every caller, SQLite
+in its default rollback-journal mode) with the current one (a session per unit of
+work from a pooled engine, SQLite in WAL mode). Each writer books distinct slots
+as fast as it can; each reader alternates a slot check and a day listing. Errors
+are calls that raised.
+
+Usage: python benchmarks/bench_booking_concurrency.py [seconds_per_run]
+"""
+import logging
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.services.booking_service import Base, Booking, BookingService
+
+SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+THREAD_COUNTS = (1, 4, 16)
+
+
+class SharedSessionBookingService:
+    """BookingService as it was: a single Session on the instance, used by every thread."""
+
+    def __init__(self, url):
+        self.engine = create_engine(url)
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+    def create_booking(self, customer_name, customer_phone, vehicle_id, vehicle_name, booking_date):
+        try:
+            booking = Booking(customer_name=customer_name, customer_phone=customer_phone, vehicle_id=vehicle_id,
+                              vehicle_name=vehicle_name, booking_date=booking_date)
+            self.session.add(booking)
+            self.session.commit()
+            return booking
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def get_bookings_by_date(self, date):
+        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.session.query(Booking).filter(Booking.booking_date >= start_of_day,
+                                                  Booking.booking_date < start_of_day + timedelta(days=1),
+                                                  Booking.status == 'confirmed').all()
+
+    def is_slot_available(self, booking_date):
+        buffer = timedelta(minutes=15)
+        return self.session.query(Booking).filter(Booking.booking_date >= booking_date - buffer,
+                                                  Booking.booking_date <= booking_date + buffer,
+                                                  Booking.status == 'confirmed').count() == 0
+
+
+def run(service, threads):
+    stop = threading.Event()
+    counts = {"bookings": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+    base = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    def count(key):
+        with lock:
+            counts[key] += 1
+
+    def writer(index):
+        i = 0
+        while not stop.is_set():
+            # Hourly, so no two of them clash and every booking is accepted
+            slot = base + timedelta(days=index * 1000 + i // 9, hours=i % 9)
+            try:
+                service.create_booking(f"Writer {index}", "5551234567", "veh_1", "2024 Test Car", slot)
+                count("bookings")
+            except Exception:
+                count("errors")
+            i += 1
+
+    def reader(index):
+        i = 0
+        while not stop.is_set():
+            day = base + timedelta(days=i % 50)
+            try:
+                service.is_slot_available(day + timedelta(hours=index % 8))
+                service.get_bookings_by_date(day)
+                count("reads")
+            except Exception:
+                count("errors")
+            i += 1
+
+    workers = [threading.Thread(target=writer, args=(i,)) for i in range(threads)]
+    workers += [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    time.sleep(SECONDS)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return counts
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")  # the shared session warns on every interleaving it trips over
+    print(f"{'service':<16} {'writers+readers':>16} {'bookings/s':>11} {'reads/s':>9} {'errors':>7}")
+    for name, factory in (("shared session", SharedSessionBookingService), ("unit of work", BookingService)):
+        for threads in THREAD_COUNTS:
+            with tempfile.TemporaryDirectory() as tmp:
+                service = factory(f"sqlite:///{tmp}/bookings.db")
+                counts = run(service, threads)
+                service.engine.dispose()
+            print(f"{name:<16} {f'{threads}+{threads}':>16} {counts['bookings'] / SECONDS:>11.0f} "
+                  f"{counts['reads'] / SECONDS:>9.0f} {counts['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
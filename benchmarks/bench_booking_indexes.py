@@ -0,0 +1,109 @@
+"""Availability-check latency on a large bookings table, before and after the index migration.
+
+Writes a bookings database in the pre-migration schema (no indexes, no
+schema_version) with ~3 years of bookings, times BookingService's queries
+against it, then lets BookingService upgrade the file in place and times them
+again.
+
+Usage: python benchmarks/bench_booking_indexes.py [rows]
+"""
+import logging
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.services import booking_service as booking_module
+from src.services.booking_service import BookingService
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+QUERIES = 50
+
+# The bookings table as the first version of BookingService created it
+LEGACY_SCHEMA = """CREATE TABLE bookings (
+    id INTEGER NOT NULL, customer_name VARCHAR, customer_phone VARCHAR, vehicle_id VARCHAR,
+    vehicle_name VARCHAR, booking_date DATETIME, created_at DATETIME, status VARCHAR, PRIMARY KEY (id))"""
+
+
+def write_legacy_database(path: str, start: datetime):
+    rng = random.Random(5)
+    connection = sqlite3.connect(path)
+    connection.execute(LEGACY_SCHEMA)
+
+    def rows():
+        for i in range(ROWS):
+            slot = start + timedelta(days=rng.randrange(3 * 365), hours=rng.randrange(9, 18), minutes=15 * rng.randrange(4))
+            status = "confirmed" if rng.random() < 0.9 else "cancelled"
+            yield (f"Customer {i}", "5551234567", f"veh_{rng.randrange(500):03d}", "2024 Test Car",
+                   slot.strftime("%Y-%m-%d %H:%M:%S.000000"), slot.strftime("%Y-%m-%d %H:%M:%S.000000"), status)
+
+    connection.executemany("INSERT INTO bookings (customer_name, customer_phone, vehicle_id, vehicle_name, "
+                           "booking_date, created_at, status) VALUES (?, ?, ?, ?, ?, ?, ?)", rows())
+    connection.commit()
+    connection.close()
+
+
+def time_queries(service: BookingService, days):
+    availability, listing = [], []
+    for day in days:
+        slot = day.replace(hour=14)
+        start = time.perf_counter()
+        service.is_slot_available(slot)
+        availability.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        service.get_bookings_by_date(day)
+        listing.append((time.perf_counter() - start) * 1000)
+    return statistics.median(availability), statistics.median(listing)
+
+
+def query_plan(path: str) -> str:
+    connection = sqlite3.connect(path)
+    plan = connection.execute("EXPLAIN QUERY PLAN SELECT count(*) FROM bookings WHERE booking_date >= ? "
+                              "AND booking_date <= ? AND status = 'confirmed'", ("2025", "2026")).fetchall()
+    connection.close()
+    return "; ".join(row[-1] for row in plan)
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    start = datetime(2024, 1, 1)
+    rng = random.Random(9)
+    days = [start + timedelta(days=rng.randrange(3 * 365)) for _ in range(QUERIES)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/bookings.db"
+        began = time.perf_counter()
+        write_legacy_database(path, start)
+        print(f"{ROWS} bookings written in {time.perf_counter() - began:.1f} s\n")
+
+        # Open it without migrating to time the old schema
+        migrate = booking_module.migrate
+        booking_module.migrate = lambda engine: 0
+        legacy = BookingService(f"sqlite:///{path}")
+        before = time_queries(legacy, days)
+        plan_before = query_plan(path)
+        legacy.engine.dispose()
+        booking_module.migrate = migrate
+
+        began = time.perf_counter()
+        service = BookingService(f"sqlite:///{path}")
+        migrate_s = time.perf_counter() - began
+        after = time_queries(service, days)
+        plan_after = query_plan(path)
+
+    print(f"{'schema':<12} {'is_slot_available ms':>21} {'get_bookings_by_date ms':>24}")
+    print(f"{'no indexes':<12} {before[0]:>21.2f} {before[1]:>24.2f}")
+    print(f"{'version ' + str(service.schema_version):<12} {after[0]:>21.2f} {after[1]:>24.2f}")
+    print(f"\nmigration ran in {migrate_s:.1f} s")
+    print(f"plan before: {plan_before}\nplan after:  {plan_after}")
+
+
+if __name__ == "__main__":
+    main()
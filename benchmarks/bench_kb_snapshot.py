@@ -0,0 +1,77 @@
+"""KnowledgeService startup from knowledge_base.json vs. from the compiled snapshot.
+
+Writes a synthetic inventory as JSON, compiles it, then times constructing
+KnowledgeService (parse/load + catalog, fuzzy matcher and retrieval indexes)
+both ways, plus a first search that has to build its result rows. The retrieval
+index is built once up front so neither side pays for it.
+
+Usage: python benchmarks/bench_kb_snapshot.py [vehicle_count]
+"""
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from bench_vehicle_catalog import make_inventory
+from config.settings import settings
+from src.services.kb_snapshot import compile_snapshot
+from src.services.knowledge_service import KnowledgeService
+
+VEHICLE_COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+RUNS = 5
+
+
+def directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.iterdir())
+
+
+def time_startup():
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        service = KnowledgeService()
+        loaded = time.perf_counter()
+        service.search_vehicles(make="Toyota", category="suv")
+        timings.append(((loaded - start) * 1000, (time.perf_counter() - loaded) * 1000))
+    return statistics.median(t for t, _ in timings), statistics.median(t for _, t in timings)
+
+
+def main():
+    vehicles = make_inventory(VEHICLE_COUNT)
+    for vehicle in vehicles:
+        vehicle["colors"] = ["Midnight Black", "Pearl White", "Silver"]
+        vehicle["transmission"] = "Automatic"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        kb_path = Path(tmp) / "knowledge_base.json"
+        snapshot_path = Path(tmp) / "knowledge_base.snapshot"
+        kb_path.write_text(json.dumps({"dealership": {"name": "Bench Motors"}, "vehicles": vehicles}))
+        settings.KNOWLEDGE_BASE_PATH = str(kb_path)
+        settings.RETRIEVAL_INDEX_PATH = str(Path(tmp) / "vectors.npz")
+        settings.KNOWLEDGE_BASE_RELOAD_ENABLED = False
+
+        settings.KNOWLEDGE_BASE_SNAPSHOT_PATH = ""
+        KnowledgeService()  # builds and persists the retrieval index
+        json_ms, json_search_ms = time_startup()
+
+        start = time.perf_counter()
+        compile_snapshot(str(kb_path), str(snapshot_path))
+        compile_ms = (time.perf_counter() - start) * 1000
+        settings.KNOWLEDGE_BASE_SNAPSHOT_PATH = str(snapshot_path)
+        snapshot_ms, snapshot_search_ms = time_startup()
+
+        print(f"{VEHICLE_COUNT} vehicles: JSON {kb_path.stat().st_size / 1e6:.1f} MB, "
+              f"snapshot {directory_size(snapshot_path) / 1e6:.1f} MB (compiled in {compile_ms:.0f} ms)\n")
+        print(f"{'source':<10} {'startup ms':>11} {'first search ms':>16}")
+        print(f"{'json':<10} {json_ms:>11.0f} {json_search_ms:>16.2f}")
+        print(f"{'snapshot':<10} {snapshot_ms:>11.0f} {snapshot_search_ms:>16.2f}")
+        print(f"\nstartup speedup {json_ms / snapshot_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
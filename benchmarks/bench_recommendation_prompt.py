@@ -0,0 +1,74 @@
+"""Recommendation prompt size: the whole available inventory vs. the top-k retrieved vehicles.
+
+For growing synthetic inventories, reports how many tokens (approximated as
+characters / 4) the vehicle list adds to the recommendation prompt with both
+approaches, how long retrieval takes per query, and how long the vector index
+takes to build vs. to load from disk. No LLM calls are made.
+
+Usage: python benchmarks/bench_recommendation_prompt.py [max_vehicle_count]
+"""
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from bench_vehicle_catalog import make_inventory
+from config.settings import settings
+from src.services.vehicle_retriever import VehicleRetriever
+
+MAX_VEHICLES = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+QUERIES = 200
+REQUIREMENTS = [
+    "a family SUV with room for the kids, under 45k",
+    "cheap hybrid for my commute",
+    "electric car with good tech",
+    "a truck for towing our boat",
+    "something sporty with heated seats",
+    "affordable sedan with apple carplay under 30000",
+]
+
+
+def summary(vehicle):
+    # Same shape as KnowledgeService.get_vehicle_summary
+    text = f"- {vehicle['year']} {vehicle['make']} {vehicle['model']} {vehicle['variant']} - ${vehicle['price']:,}"
+    return text + f", {vehicle['fuel_type']}. Key features: {', '.join(vehicle['features'][:3])}"
+
+
+def main():
+    rng = random.Random(3)
+    k = settings.RECOMMENDATION_TOP_K
+
+    print(f"{'vehicles':>9} {'full ~tokens':>12} {'top-k ~tokens':>13} {'search p50 ms':>14} "
+          f"{'build ms':>9} {'load ms':>8}")
+    for count in (100, 1000, 10_000, MAX_VEHICLES):
+        vehicles = make_inventory(count)
+        full = "\n".join(summary(v) for v in vehicles if v['available'])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "vectors.npz")
+            start = time.perf_counter()
+            VehicleRetriever.load_or_build(vehicles, path, "bench", settings.RETRIEVAL_DIMENSIONS)
+            build_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            retriever = VehicleRetriever.load_or_build(vehicles, path, "bench", settings.RETRIEVAL_DIMENSIONS)
+            load_ms = (time.perf_counter() - start) * 1000
+
+        latencies = []
+        for _ in range(QUERIES):
+            requirements = rng.choice(REQUIREMENTS)
+            start = time.perf_counter()
+            candidates = retriever.search(requirements, k)
+            latencies.append((time.perf_counter() - start) * 1000)
+        top_k = "\n".join(summary(v) for v in candidates)
+
+        print(f"{count:>9} {len(full) // 4:>12} {len(top_k) // 4:>13} "
+              f"{statistics.median(latencies):>14.3f} {build_ms:>9.0f} {load_ms:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
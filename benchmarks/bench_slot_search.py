@@ -0,0 +1,105 @@
+"""Slot availability: one COUNT query per candidate slot vs. the slot engine.
+
+Fills a bookings database (current schema, indexed) with a year of bookings,
+then, using the knowledge base's test-drive rules and weekday hours, times
+listing the free slots of a day and finding free slots over a week and a month
+both ways. The engine lays out a range's candidates with one broadcast over
+whole weeks and checks them all against one load of the bookings. Results are
+checked to match. The first two columns run with the availability cache off so
+both hit the database; the last is the engine with the cache warm.
+
+Usage: python benchmarks/bench_slot_search.py [rows]
+"""
+import json
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from sqlalchemy import insert
+from src.services.booking_service import Booking, BookingService
+from src.services.slot_engine import SlotEngine
+from config.settings import settings
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+QUERIES = 100
+
+
+# The per-slot implementation: walk the offered hours day by day, one query each
+def slots_per_query(service, start, days, limit=None):
+    engine = service.slot_engine
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    free = []
+    for offset in range(days):
+        for hour, minute in sorted(set(engine.available_hours)):
+            slot = (day + timedelta(days=offset)).replace(hour=hour, minute=minute)
+            if slot >= start and service.is_slot_available(slot):
+                free.append(slot)
+                if limit is not None and len(free) == limit:
+                    return free
+    return free
+
+
+def median_ms(fn, args_list):
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    rng = random.Random(3)
+    start = datetime(2025, 1, 1)
+    with open(settings.KNOWLEDGE_BASE_PATH) as f:
+        engine = SlotEngine.from_knowledge_base(json.load(f))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.AVAILABILITY_CACHE_ENABLED = False
+        service = BookingService(f"sqlite:///{tmp}/bookings.db", slot_rules=lambda: engine)
+        # Dense enough that a good share of days are full and "next slot" has to look ahead
+        rows = [{"customer_name": "x", "customer_phone": "5551234567", "vehicle_id": "veh_1", "vehicle_name": "Car",
+                 "booking_date": start + timedelta(days=rng.randrange(365), hours=rng.randrange(9, 18)),
+                 "status": "confirmed"} for _ in range(ROWS)]
+        with service.unit_of_work() as session:
+            session.execute(insert(Booking), rows)
+
+        days = [start + timedelta(days=rng.randrange(330), hours=10) for _ in range(QUERIES)]
+        for day in days:
+            assert [s.strftime("%H:%M") for s in slots_per_query(service, day.replace(hour=0), 1)] == \
+                service.get_available_slots(day)
+            assert slots_per_query(service, day, 7, limit=1) == service.find_available_slots(day, 7, limit=1)
+            assert slots_per_query(service, day, 30) == service.find_available_slots(day, 30)
+
+        settings.AVAILABILITY_CACHE_ENABLED = True
+        cached = BookingService(f"sqlite:///{tmp}/bookings.db", slot_rules=lambda: engine)
+        for day in days:
+            assert cached.find_available_slots(day, 30) == service.find_available_slots(day, 30)
+
+        day_args = [(d,) for d in days]
+        rows_out = [("free slots of a day", median_ms(lambda d: slots_per_query(service, d.replace(hour=0), 1), day_args),
+                     median_ms(service.get_available_slots, day_args), median_ms(cached.get_available_slots, day_args))]
+        for label, n, limit in (("next free slot (7 days)", 7, 1), ("all free slots (7 days)", 7, None),
+                                ("all free slots (30 days)", 30, None)):
+            args = [(d, n, limit) for d in days]
+            rows_out.append((label, median_ms(lambda *a: slots_per_query(service, *a), args),
+                             median_ms(lambda d, n, l: service.find_available_slots(d, n, limit=l), args),
+                             median_ms(lambda d, n, l: cached.find_available_slots(d, n, limit=l), args)))
+
+    print(f"{ROWS} bookings over a year, hours {engine.weekly_hours}\n")
+    print(f"{'query':<26} {'per-slot ms':>12} {'engine ms':>10} {'engine, cached ms':>18}")
+    for name, per_slot, vectorized, warm in rows_out:
+        print(f"{name:<26} {per_slot:>12.2f} {vectorized:>10.2f} {warm:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Per-call synthesizer construction vs. the pooled SpeechService, on the fake speech engine.
+
+The fake backend charges a connection handshake whenever a handle is first used,
+which is what building a new SpeechSynthesizer per turn costs against Azure. A
+small failure rate exercises the pool's recycle-and-retry path.
+
+Usage: python benchmarks/bench_speech_pool.py
+"""
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from config.settings import settings
+from src.services.speech_backends import FakeSpeechBackend
+from src.services.speech_service import SpeechService
+
+TURNS = 40
+CONCURRENCY = 4
+PROMPT = "Great, I have you down for the 2024 Toyota Camry. What time works best for you?"
+
+
+def timed_calls(fn):
+    latencies = []
+
+    def one(_):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    with ThreadPoolExecutor(CONCURRENCY) as executor:
+        list(executor.map(one, range(TURNS)))
+    return latencies
+
+
+def report(label, latencies, backend):
+    print(f"{label:<22} p50 {statistics.median(latencies):7.1f} ms   "
+          f"max {max(latencies):7.1f} ms   handles {backend.handles_created:3}   "
+          f"connects {backend.connections_opened:3}   failures {backend.failures}")
+
+
+def main():
+    settings.TTS_CACHE_ENABLED = False
+
+    backend = FakeSpeechBackend(failure_rate=0.05, seed=3)
+
+    def per_call():
+        synthesizer = backend.create_synthesizer()
+        try:
+            backend.synthesize(synthesizer, PROMPT)
+        except Exception:
+            pass
+
+    report("new synthesizer/call", timed_calls(per_call), backend)
+
+    backend = FakeSpeechBackend(failure_rate=0.05, seed=3)
+    service = SpeechService(backend=backend)
+    service.prewarm(CONCURRENCY)
+    report("pooled + prewarmed", timed_calls(lambda: service.text_to_speech(PROMPT)), backend)
+    print(f"pool stats: {service.get_pool_stats()['synthesizer']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Linear-scan vehicle lookups vs. the indexed VehicleCatalog, over a synthetic 50k-vehicle inventory.
+
+The linear versions are the KnowledgeService methods as they were before the
+catalog; results of both are checked to be identical before timing.
+
+Usage: python benchmarks/bench_vehicle_catalog.py [vehicle_count]
+"""
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from config.settings import settings
+from src.services.knowledge_service import KnowledgeService
+
+VEHICLE_COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+QUERIES = 200
+
+MAKES = {
+    "Toyota": ["Camry", "Corolla", "RAV4", "Highlander", "Tacoma", "Prius"],
+    "Honda": ["Accord", "Civic", "CR-V", "Pilot", "Odyssey"],
+    "Ford": ["Explorer", "Escape", "F-150", "Mustang", "Bronco"],
+    "Tesla": ["Model 3", "Model Y", "Model S", "Model X"],
+    "BMW": ["3 Series", "5 Series", "X3", "X5", "i4"],
+    "Hyundai": ["Elantra", "Sonata", "Tucson", "Santa Fe", "Ioniq 5"],
+    "Kia": ["Forte", "K5", "Sportage", "Telluride", "EV6"],
+    "Chevrolet": ["Malibu", "Equinox", "Tahoe", "Silverado", "Bolt"],
+}
+CATEGORIES = ["sedan", "suv", "truck", "electric", "hatchback", "minivan", "coupe"]
+
+
+def make_inventory(count: int):
+    rng = random.Random(42)
+    vehicles = []
+    for i in range(count):
+        make = rng.choice(list(MAKES))
+        vehicles.append({
+            "id": f"veh_{i:06d}",
+            "category": rng.choice(CATEGORIES),
+            "make": make,
+            "model": rng.choice(MAKES[make]),
+            "year": rng.choice([2022, 2023, 2024, 2025]),
+            "variant": rng.choice(["Base", "Sport", "Limited", "Touring"]),
+            "price": rng.randrange(18_000, 95_000, 250),
+            "features": ["Apple CarPlay", "Heated Seats", "Lane Assist"],
+            "fuel_type": rng.choice(["Gasoline", "Hybrid", "Electric"]),
+            "available": rng.random() < 0.85,
+        })
+    return vehicles
+
+
+# The pre-catalog implementations
+def linear_by_id(vehicles, vehicle_id):
+    for vehicle in vehicles:
+        if vehicle.get('id') == vehicle_id:
+            return vehicle
+    return None
+
+
+def linear_search(vehicles, make=None, model=None, category=None, max_price=None):
+    results = vehicles
+    if make:
+        results = [v for v in results if v.get('make', '').lower() == make.lower()]
+    if model:
+        results = [v for v in results if v.get('model', '').lower() == model.lower()]
+    if category:
+        results = [v for v in results if v.get('category', '').lower() == category.lower()]
+    if max_price:
+        results = [v for v in results if v.get('price', float('inf')) <= max_price]
+    return [v for v in results if v.get('available', False)]
+
+
+def linear_categories(vehicles):
+    return sorted(set(v['category'] for v in vehicles if v.get('available', False)))
+
+
+def timed(fn, args_list):
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e6
+
+
+def main():
+    vehicles = make_inventory(VEHICLE_COUNT)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "knowledge_base.json"
+        path.write_text(json.dumps({"vehicles": vehicles}))
+        settings.KNOWLEDGE_BASE_PATH = str(path)
+
+        start = time.perf_counter()
+        service = KnowledgeService()
+        load_ms = (time.perf_counter() - start) * 1000
+    vehicles = service.get_all_vehicles()
+
+    rng = random.Random(7)
+    ids = [(f"veh_{rng.randrange(VEHICLE_COUNT):06d}",) for _ in range(QUERIES)]
+    searches = {
+        "make": [(rng.choice(list(MAKES)), None, None, None) for _ in range(QUERIES)],
+        "make+model": [(m, rng.choice(MAKES[m]), None, None) for m in (rng.choice(list(MAKES)) for _ in range(QUERIES))],
+        "category": [(None, None, rng.choice(CATEGORIES), None) for _ in range(QUERIES)],
+        "max_price (cheap)": [(None, None, None, rng.randrange(19_000, 25_000)) for _ in range(QUERIES)],
+        "make+category+price": [(rng.choice(list(MAKES)), None, rng.choice(CATEGORIES), rng.randrange(20_000, 60_000))
+                                for _ in range(QUERIES)],
+    }
+
+    for args in ids:
+        assert linear_by_id(vehicles, *args) is service.get_vehicle_by_id(*args)
+    for args_list in searches.values():
+        for args in args_list:
+            assert linear_search(vehicles, *args) == service.search_vehicles(*args)
+    assert linear_categories(vehicles) == service.get_available_categories()
+
+    print(f"{VEHICLE_COUNT} vehicles, load + index {load_ms:.0f} ms\n")
+    print(f"{'query':<22} {'linear us':>12} {'indexed us':>12} {'speedup':>9}")
+
+    rows = [("by id", timed(lambda i: linear_by_id(vehicles, i), ids),
+             timed(service.get_vehicle_by_id, ids)),
+            ("categories", timed(lambda: linear_categories(vehicles), [()] * 20),
+             timed(service.get_available_categories, [()] * 20))]
+    for name, args_list in searches.items():
+        rows.append((name, timed(lambda *a: linear_search(vehicles, *a), args_list[:40]),
+                     timed(service.catalog.search, args_list)))
+
+    for name, linear_us, indexed_us in rows:
+        print(f"{name:<22} {linear_us:>12.1f} {indexed_us:>12.1f} {linear_us / indexed_us:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
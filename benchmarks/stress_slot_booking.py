@@ -0,0 +1,109 @@
+"""Many callers racing for the same test-drive slot: no slot may be booked twice.
+
+Each round releases a crowd of threads at once (through a barrier) at one
+slot, the way parallel sessions would after all being told it's free:
+
+- check-then-insert: is_slot_available followed by a plain insert, as the
+  booking flow used to work. This is what double-books.
+- create_booking: the conditional insert. At most `capacity` per slot may win.
+- hold_slot: only one caller may hold a free slot.
+
+The database is then scanned for clashing confirmed bookings.
+
+Usage: python benchmarks/stress_slot_booking.py [threads]
+"""
+import logging
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.services.booking_service import Booking, BookingService, SlotUnavailableError
+
+THREADS = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+ROUNDS = 20
+
+
+def check_then_insert(service, slot, vehicle_id, index):
+    if not service.is_slot_available(slot, vehicle_id):
+        return False
+    with service.unit_of_work() as session:
+        session.add(Booking(customer_name=f"Caller {index}", customer_phone="5551234567", vehicle_id=vehicle_id,
+                            vehicle_name="2024 Test Car", booking_date=slot))
+    return True
+
+
+def conditional_insert(service, slot, vehicle_id, index):
+    try:
+        service.create_booking(f"Caller {index}", "5551234567", vehicle_id, "2024 Test Car", slot)
+        return True
+    except SlotUnavailableError:
+        return False
+
+
+def hold(service, slot, vehicle_id, index):
+    return service.hold_slot(slot, vehicle_id, f"caller-{index}")
+
+
+def race(service, attempt, slot, vehicle_id):
+    """Releases THREADS callers at `slot` together; how many got it, and how many raised."""
+    barrier = threading.Barrier(THREADS)
+    wins, errors = [], []
+
+    def caller(index):
+        barrier.wait()
+        try:
+            if attempt(service, slot, vehicle_id, index):
+                wins.append(index)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(wins), len(errors)
+
+
+def clashing_pairs(service):
+    """Confirmed bookings of the same vehicle starting closer together than the slot engine allows."""
+    window = service.slot_engine.window
+    with service.unit_of_work() as session:
+        rows = session.query(Booking.vehicle_id, Booking.booking_date).filter(
+            Booking.status == 'confirmed').order_by(Booking.vehicle_id, Booking.booking_date).all()
+    return sum(1 for a, b in zip(rows, rows[1:]) if a[0] == b[0] and b[1] - a[1] < window)
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    base = datetime.now().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    print(f"{THREADS} callers per slot, {ROUNDS} slots each\n")
+    print(f"{'strategy':<20} {'booked':>7} {'max per slot':>13} {'errors':>7} {'clashes in db':>14} {'ms/round':>9}")
+
+    for name, attempt in (("check-then-insert", check_then_insert), ("create_booking", conditional_insert),
+                          ("hold_slot", hold)):
+        with tempfile.TemporaryDirectory() as tmp:
+            service = BookingService(f"sqlite:///{tmp}/bookings.db")
+            wins, errors = [], 0
+            began = time.perf_counter()
+            for round_index in range(ROUNDS):
+                slot = base + timedelta(days=round_index)
+                won, failed = race(service, attempt, slot, "veh_1")
+                wins.append(won)
+                errors += failed
+            elapsed_ms = (time.perf_counter() - began) * 1000 / ROUNDS
+            clashes = clashing_pairs(service)
+            service.engine.dispose()
+        print(f"{name:<20} {sum(wins):>7} {max(wins):>13} {errors:>7} {clashes:>14} {elapsed_ms:>9.1f}")
+        if name != "check-then-insert":
+            assert max(wins) <= service.slot_engine.capacity and clashes == 0, f"{name} double-booked a slot"
+
+
+if __name__ == "__main__":
+    main()
@@ -20,22 +20,85 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # Default to gpt-4o-mini (faster & cheaper)
     OPENAI_TEMPERATURE: float = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
+    # One structured "understand turn" call instead of detect_intent + extract_booking_details
+    COMBINED_TURN_UNDERSTANDING: bool = os.getenv("COMBINED_TURN_UNDERSTANDING", "true").lower() == "true"
+    # Settle "yes"/"hi"/bare slot answers with patterns + dialogue state before calling the LLM
+    FAST_PATH_CLASSIFIER: bool = os.getenv("FAST_PATH_CLASSIFIER", "true").lower() == "true"
+    # Forward generated replies token by token instead of waiting for the whole completion
+    LLM_STREAMING_ENABLED: bool = os.getenv("LLM_STREAMING_ENABLED", "true").lower() == "true"
     
     AZURE_SPEECH_KEY: str = os.getenv("AZURE_SPEECH_KEY", "")
     AZURE_SPEECH_REGION: str = os.getenv("AZURE_SPEECH_REGION", "eastus")
     
     SPEECH_LANGUAGE: str = os.getenv("SPEECH_LANGUAGE", "en-US")
     SPEECH_SAMPLE_RATE: int = 16000
+    SPEECH_END_SILENCE_MS: int = int(os.getenv("SPEECH_END_SILENCE_MS", "500"))
+    # Barge-in: caller speech picked up while the assistant is replying cuts the reply off
+    BARGE_IN_ENABLED: bool = os.getenv("BARGE_IN_ENABLED", "true").lower() == "true"
+    VAD_THRESHOLD_DB: float = float(os.getenv("VAD_THRESHOLD_DB", "-40"))
+    VAD_NOISE_MARGIN_DB: float = float(os.getenv("VAD_NOISE_MARGIN_DB", "12"))
+    VAD_SPEECH_MS: int = int(os.getenv("VAD_SPEECH_MS", "160"))
+    VAD_HANGOVER_MS: int = int(os.getenv("VAD_HANGOVER_MS", "400"))
     
     TTS_VOICE_NAME: str = os.getenv("TTS_VOICE_NAME", "en-US-JennyNeural")
     TTS_SPEAKING_RATE: str = os.getenv("TTS_SPEAKING_RATE", "1.0")
     TTS_PITCH: str = os.getenv("TTS_PITCH", "0%")
+    # See src/services/audio_formats.py for the options (wav, raw pcm, mp3, opus)
+    TTS_OUTPUT_FORMAT: str = os.getenv("TTS_OUTPUT_FORMAT", "mp3-24khz-48kbps")
+    TTS_CACHE_ENABLED: bool = os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true"
+    TTS_CACHE_DIR: str = os.getenv("TTS_CACHE_DIR", str(DATA_DIR / "tts_cache"))
+    TTS_CACHE_MAX_MB: int = int(os.getenv("TTS_CACHE_MAX_MB", "200"))
+    # Split replies into sentences and emit each one's audio as soon as it is synthesized
+    TTS_STREAMING_ENABLED: bool = os.getenv("TTS_STREAMING_ENABLED", "true").lower() == "true"
+    TTS_STREAM_WORKERS: int = int(os.getenv("TTS_STREAM_WORKERS", "4"))
+    
+    # Long-lived synthesizers shared by all sessions (size it to at least TTS_STREAM_WORKERS)
+    SPEECH_SYNTHESIZER_POOL_SIZE: int = int(os.getenv("SPEECH_SYNTHESIZER_POOL_SIZE", "4"))
+    SPEECH_POOL_PREWARM: int = int(os.getenv("SPEECH_POOL_PREWARM", "2"))
+    SPEECH_POOL_ACQUIRE_TIMEOUT: float = float(os.getenv("SPEECH_POOL_ACQUIRE_TIMEOUT", "10"))
+    SPEECH_CONNECTION_REFRESH_SECONDS: int = int(os.getenv("SPEECH_CONNECTION_REFRESH_SECONDS", "120"))
     
     DATABASE_URL: str = f"sqlite:///{DATA_DIR / 'bookings.db'}"
+    # Connections are checked out per unit of work, so size the pool to the callers served at once
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    # Availability is answered from an in-process copy of each day's bookings, kept
+    # current by create/cancel; the TTL only catches writes from other processes
+    AVAILABILITY_CACHE_ENABLED: bool = os.getenv("AVAILABILITY_CACHE_ENABLED", "true").lower() == "true"
+    AVAILABILITY_CACHE_TTL_SECONDS: float = float(os.getenv("AVAILABILITY_CACHE_TTL_SECONDS", "60"))
+    AVAILABILITY_CACHE_MAX_DAYS: int = int(os.getenv("AVAILABILITY_CACHE_MAX_DAYS", "400"))
+    # A slot confirmed as free is held for the caller this long while they give their details
+    SLOT_HOLD_SECONDS: float = float(os.getenv("SLOT_HOLD_SECONDS", "300"))
+    # Bulk imports insert this many rows per statement; exports fetch this many per round trip
+    BULK_INSERT_BATCH_SIZE: int = int(os.getenv("BULK_INSERT_BATCH_SIZE", "5000"))
+    EXPORT_FETCH_SIZE: int = int(os.getenv("EXPORT_FETCH_SIZE", "1000"))
     
     KNOWLEDGE_BASE_PATH: str = str(DATA_DIR / "knowledge_base.json")
+    # Compiled form of the knowledge base (python -m src.services.kb_snapshot); used
+    # instead of parsing the JSON whenever it's up to date, set empty to disable
+    KNOWLEDGE_BASE_SNAPSHOT_PATH: str = os.getenv("KNOWLEDGE_BASE_SNAPSHOT_PATH", str(DATA_DIR / "knowledge_base.snapshot"))
+    # Inventory edits are picked up without a restart: the file is polled and a
+    # changed one is re-indexed in the background, then swapped in whole
+    KNOWLEDGE_BASE_RELOAD_ENABLED: bool = os.getenv("KNOWLEDGE_BASE_RELOAD_ENABLED", "true").lower() == "true"
+    KNOWLEDGE_BASE_POLL_SECONDS: float = float(os.getenv("KNOWLEDGE_BASE_POLL_SECONDS", "2"))
+    VEHICLE_ALIASES_PATH: str = os.getenv("VEHICLE_ALIASES_PATH", str(DATA_DIR / "vehicle_aliases.json"))
+    # Retry make/model searches that find nothing with the closest catalog names ("camri" -> Camry)
+    FUZZY_VEHICLE_MATCHING: bool = os.getenv("FUZZY_VEHICLE_MATCHING", "true").lower() == "true"
+    FUZZY_MATCH_MIN_SCORE: float = float(os.getenv("FUZZY_MATCH_MIN_SCORE", "0.6"))
+    FUZZY_MATCH_MARGIN: float = float(os.getenv("FUZZY_MATCH_MARGIN", "0.1"))
+    # Formatted "we have N options..." listings kept per catalog version
+    LISTING_CACHE_SIZE: int = int(os.getenv("LISTING_CACHE_SIZE", "256"))
+    # Recommendations only put the top-k retrieved vehicles in the prompt; the vector
+    # index is rebuilt next to the knowledge base whenever the knowledge base changes
+    RECOMMENDATION_TOP_K: int = int(os.getenv("RECOMMENDATION_TOP_K", "5"))
+    RETRIEVAL_INDEX_PATH: str = os.getenv("RETRIEVAL_INDEX_PATH", str(DATA_DIR / "knowledge_base.vectors.npz"))
+    RETRIEVAL_DIMENSIONS: int = int(os.getenv("RETRIEVAL_DIMENSIONS", "1024"))
     
     MAX_CONVERSATION_TURNS: int = 10
+    SESSION_MAX_COUNT: int = int(os.getenv("SESSION_MAX_COUNT", "500"))
+    SESSION_IDLE_TTL_SECONDS: int = int(os.getenv("SESSION_IDLE_TTL_SECONDS", "1800"))
     AGENT_TIMEOUT_SECONDS: int = 30
     AUDIO_CHUNK_SIZE: int = 1024
     AUDIO_FORMAT: int = 8  # pyaudio.paInt16
@@ -1,5 +1,5 @@
 from langchain_openai import ChatOpenAI
-from src.services.booking_service import BookingService
+from src.services.booking_service import BookingService, SlotUnavailableError
 from datetime import datetime, timedelta
 from dateutil import parser
 from typing import Dict, Optional, List
@@ -8,6 +8,8 @@ import re
 
 logger = logging.getLogger(__name__)
 
+NEXT_OPENING_SEARCH_DAYS = 7
+
 class BookingAgent:
     def __init__(self, llm: ChatOpenAI, booking_service: BookingService):
         self.llm = llm
@@ -54,25 +56,48 @@ class BookingAgent:
             return (parsed.hour, parsed.minute)
         except Exception: return None
     
-    def check_availability(self, booking_date: datetime) -> Dict:
+    def check_availability(self,
+                           booking_date: datetime,
+                           vehicle_id: Optional[str] = None,
+                           holder: Optional[str] = None) -> Dict:
+        """With a `holder`, a free slot is also held for them until they book or the hold runs out."""
         if booking_date < datetime.now():
             return {'available': False, 'message': "That time has already passed. Please choose a future date."}
         
-        if self.booking_service.is_slot_available(booking_date):
+        if holder is not None:
+            available = self.booking_service.hold_slot(booking_date, vehicle_id, holder)
+        else:
+            available = self.booking_service.is_slot_available(booking_date, vehicle_id)
+        
+        if available:
             return {'available': True, 'message': f"Great! {booking_date.strftime('%I:%M %p')} is available."}
         else:
-            standard_hours = ["09:00", "10:00", "11:00", "14:00", "15:00", "16:00", "17:00"]
-            avail = self.booking_service.get_available_slots(booking_date, standard_hours)
+            avail = self.booking_service.get_available_slots(booking_date, vehicle_id=vehicle_id, holder=holder)
             if avail:
                 formatted = [datetime.strptime(s, "%H:%M").strftime("%I:%M %p") for s in avail[:2]]
+                reason = ("that time is already booked" if self.booking_service.slot_engine.is_bookable(booking_date)
+                          else "we don't run test drives at that time")
                 return {
                     'available': False,
-                    'message': f"I'm sorry, that time is already booked. Would {' or '.join(formatted)} work instead?",
+                    'message': f"I'm sorry, {reason}. Would {' or '.join(formatted)} work instead?",
                     'alternatives': avail
                 }
+            
+            # Nothing left that day: offer the first opening in the following week
+            next_day = booking_date.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            upcoming = self.booking_service.find_available_slots(max(next_day, datetime.now()), NEXT_OPENING_SEARCH_DAYS,
+                                                                 limit=1, vehicle_id=vehicle_id, holder=holder)
+            if upcoming:
+                opening = upcoming[0].strftime("%A at %I:%M %p")
+                return {
+                    'available': False,
+                    'message': f"We are fully booked that day. The next opening is {opening}. Would that work?",
+                    'next_available': upcoming[0]
+                }
             return {'available': False, 'message': "We are fully booked that day. How about another date?"}
         
-    def create_booking(self, booking_details: Dict) -> Dict:
+    def create_booking(self, booking_details: Dict, holder: Optional[str] = None) -> Dict:
+        """On {'success': False, 'slot_taken': True} the slot went to someone else; the message offers alternatives."""
         try:
             d_obj = self.parse_date(booking_details.get('date'))
             t_tup = self.parse_time(booking_details.get('time'))
@@ -84,9 +109,18 @@ class BookingAgent:
                 customer_phone=booking_details.get('customer_phone'),
                 vehicle_id=booking_details.get('vehicle_id'),
                 vehicle_name=booking_details.get('vehicle_name'),
-                booking_date=dt
+                booking_date=dt,
+                holder=holder
             )
             return {'success': True, 'message': self.booking_service.get_booking_summary(booking)}
+        except SlotUnavailableError as e:
+            if e.alternatives:
+                formatted = [slot.strftime("%I:%M %p") for slot in e.alternatives[:2]]
+                message = f"I'm sorry, that time was just taken. Would {' or '.join(formatted)} work instead?"
+            else:
+                message = "I'm sorry, that time was just taken and the rest of that day is full. How about another date?"
+            return {'success': False, 'slot_taken': True, 'message': message,
+                    'alternatives': [slot.strftime("%H:%M") for slot in e.alternatives]}
         except Exception as e:
             logger.error(f"Error creating booking: {str(e)}")
             return {'success': False, 'message': "There was an error saving your booking."}
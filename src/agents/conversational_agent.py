@@ -2,7 +2,7 @@ from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Literal, Optional
 import json
 import logging
 
@@ -24,6 +24,43 @@ class BookingDetails(BaseModel):
     customer_phone: Optional[str] = Field(default=None, description="Customer phone number")
 
 
+class TurnEntities(BaseModel):
+    vehicle_category: Optional[str] = Field(default=None, description="Vehicle category: sedan, suv, truck or electric")
+    vehicle_make: Optional[str] = Field(default=None, description="Vehicle make, e.g. Toyota")
+    vehicle_model: Optional[str] = Field(default=None, description="Vehicle model, e.g. Camry")
+    max_price: Optional[float] = Field(default=None, description="Maximum budget in dollars")
+    date: Optional[str] = Field(default=None, description="Requested date as the customer said it")
+    time: Optional[str] = Field(default=None, description="Requested time as the customer said it")
+    customer_name: Optional[str] = Field(default=None, description="Customer name")
+    customer_phone: Optional[str] = Field(default=None, description="Customer phone number")
+
+
+class TurnUnderstanding(BaseModel):
+    """Intent, entities and booking slots for one customer turn."""
+    intent: Literal["greeting", "inquiry", "booking", "confirmation", "modification", "cancellation", "general"] = Field(
+        description="The detected intent of the latest customer message"
+    )
+    entities: TurnEntities = Field(default_factory=TurnEntities, description="Entities mentioned in the latest customer message")
+    booking: BookingDetails = Field(default_factory=BookingDetails, description="Booking details gathered from the whole conversation")
+    confidence: float = Field(default=0.0, description="Confidence score 0-1")
+
+
+def _inline_schema_refs(schema: Dict) -> Dict:
+    """Replaces '$ref' pointers with their '$defs' entries so the schema is self-contained."""
+    defs = schema.get("$defs", {})
+    
+    def resolve(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return resolve(defs[node["$ref"].split("/")[-1]])
+            return {k: resolve(v) for k, v in node.items() if k != "$defs"}
+        if isinstance(node, list):
+            return [resolve(v) for v in node]
+        return node
+    
+    return resolve(schema)
+
+
 class ConversationalAgent:
     
     def __init__(self, llm: ChatOpenAI):
@@ -71,36 +108,98 @@ Context: {context}"""),
             {format_instructions}"""),
             ("user", "Conversation History:\n{conversation}")
         ])
+        
+        self.understanding_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert at understanding customer turns in auto dealership conversations.
+
+For the customer's latest message identify:
+1. Intent: greeting, inquiry, booking, confirmation, modification, cancellation, or general
+2. Entities mentioned in that message: vehicle_category (sedan/suv/truck/electric), vehicle_make, vehicle_model, max_price, date, time, customer_name, customer_phone
+3. Booking details (vehicle_name, date, time, customer_name, customer_phone) gathered from the whole conversation.
+   Pay attention to the Assistant's questions to understand what the User's short answers mean.
+   Example: If Assistant asks "What is your name?" and User says "John", then customer_name is "John".
+4. Confidence: How confident you are (0.0 to 1.0)
+
+CRITICAL RULES:
+- If the user says "yes", "please", "sure", "book it", or "okay", the intent is 'confirmation'.
+- If the user says "hi", "hello", "good morning", the intent is 'greeting'.
+- NEVER label "yes" as a greeting.
+- Leave any field you are not sure about empty."""),
+            ("user", "Conversation History:\n{conversation}\n\nLatest customer message: {input}")
+        ])
+        # Each sync/async method pair shares its chain, inputs and parsing; they differ only in invoke vs ainvoke
+        self.intent_chain = self.intent_prompt | self.llm
+        self.response_chain = self.response_prompt | self.llm
+        self.booking_chain = self.booking_prompt | self.llm
+        
+        # Function calling gives us a validated TurnUnderstanding instead of free text to slice JSON out of.
+        # The schema is passed as a plain dict because langchain's converter drops nested pydantic v2 models.
+        understanding_tool = {
+            "name": "TurnUnderstanding",
+            "description": TurnUnderstanding.__doc__,
+            "parameters": _inline_schema_refs(TurnUnderstanding.model_json_schema())
+        }
+        self.understanding_chain = (
+            self.understanding_prompt
+            | self.llm.with_structured_output(understanding_tool)
+            | TurnUnderstanding.model_validate
+        )
     
-    def detect_intent(self, user_input: str) -> Dict:
+    async def aunderstand_turn(self, user_input: str, conversation_history: str) -> Dict:
+        """Single LLM call returning the detect_intent result plus 'booking_details'."""
         try:
-            chain = self.intent_prompt | self.llm
-            format_instructions = self.intent_parser.get_format_instructions()
-            
-            response = chain.invoke({
+            understanding = await self.understanding_chain.ainvoke({
                 "input": user_input,
-                "format_instructions": format_instructions
+                "conversation": conversation_history
             })
-            
-            content = response.content
-            
-            if "```json" in content:
-                json_str = content.split("```json")[1].split("```")[0].strip()
-            elif "{" in content:
-                start = content.find("{")
-                end = content.rfind("}") + 1
-                json_str = content[start:end]
-            else:
-                json_str = content
-            
-            intent_obj = json.loads(json_str)
-            logger.info(f"Detected intent: {intent_obj}")
-            
-            return intent_obj
-            
         except Exception as e:
-            logger.error(f"Error detecting intent: {str(e)}")
+            logger.error(f"Error understanding turn: {str(e)}")
             return self._fallback_intent_detection(user_input)
+        
+        result = {
+            "intent": understanding.intent,
+            "entities": {k: v for k, v in understanding.entities.model_dump().items() if v is not None},
+            "confidence": understanding.confidence,
+            "booking_details": {k: v for k, v in understanding.booking.model_dump().items() if v is not None}
+        }
+        logger.info(f"Understood turn: {result}")
+        return result
+    
+    def detect_intent(self, user_input: str) -> Dict:
+        try:
+            return self._parse_intent(self.intent_chain.invoke(self._intent_inputs(user_input)))
+        except Exception as e:
+            return self._intent_failed(e, user_input)
+    
+    async def adetect_intent(self, user_input: str) -> Dict:
+        try:
+            return self._parse_intent(await self.intent_chain.ainvoke(self._intent_inputs(user_input)))
+        except Exception as e:
+            return self._intent_failed(e, user_input)
+    
+    def _intent_inputs(self, user_input: str) -> Dict:
+        return {"input": user_input, "format_instructions": self.intent_parser.get_format_instructions()}
+    
+    def _parse_intent(self, response) -> Dict:
+        intent_obj = self._parse_json_content(response.content)
+        logger.info(f"Detected intent: {intent_obj}")
+        return intent_obj
+    
+    def _intent_failed(self, error: Exception, user_input: str) -> Dict:
+        logger.error(f"Error detecting intent: {str(error)}")
+        return self._fallback_intent_detection(user_input)
+    
+    def _parse_json_content(self, content: str) -> Dict:
+        if "```json" in content:
+            json_str = content.split("```json")[1].split("```")[0].strip()
+        elif "{" in content:
+            start = content.find("{")
+            end = content.rfind("}") + 1
+            json_str = content[start:end]
+        else:
+            json_str = content
+        
+        return json.loads(json_str)
     
     def _fallback_intent_detection(self, user_input: str) -> Dict:
         user_input_lower = user_input.lower()
@@ -153,46 +252,58 @@ Context: {context}"""),
     
     def generate_response(self, context: str, user_input: str) -> str:
         try:
-            chain = self.response_prompt | self.llm
-            
-            response = chain.invoke({
-                "context": context,
-                "input": user_input
-            })
-            
-            response_text = response.content.strip()
-            logger.info(f"Generated response: {response_text}")
-            return response_text
-            
+            return self._response_text(self.response_chain.invoke(self._response_inputs(context, user_input)))
+        except Exception as e:
+            return self._response_failed(e)
+    
+    async def agenerate_response(self, context: str, user_input: str) -> str:
+        try:
+            return self._response_text(await self.response_chain.ainvoke(self._response_inputs(context, user_input)))
+        except Exception as e:
+            return self._response_failed(e)
+    
+    def stream_response(self, context: str, user_input: str) -> Iterator[str]:
+        """Like generate_response, but yields text as the model produces it."""
+        try:
+            for chunk in self.response_chain.stream(self._response_inputs(context, user_input)):
+                if chunk.content:
+                    yield chunk.content
         except Exception as e:
-            logger.error(f"Error generating response: {str(e)}")
-            return "I apologize, I'm having trouble processing that. Could you please repeat?"
+            yield self._response_failed(e)
+    
+    def _response_inputs(self, context: str, user_input: str) -> Dict:
+        return {"context": context, "input": user_input}
+    
+    def _response_text(self, response) -> str:
+        response_text = response.content.strip()
+        logger.info(f"Generated response: {response_text}")
+        return response_text
+    
+    def _response_failed(self, error: Exception) -> str:
+        logger.error(f"Error generating response: {str(error)}")
+        return "I apologize, I'm having trouble processing that. Could you please repeat?"
     
     def extract_booking_details(self, conversation_history: str) -> Dict:
         try:
-            chain = self.booking_prompt | self.llm
-            format_instructions = self.booking_parser.get_format_instructions()
-            
-            response = chain.invoke({
-                "conversation": conversation_history,
-                "format_instructions": format_instructions
-            })
-            
-            content = response.content
-            
-            if "```json" in content:
-                json_str = content.split("```json")[1].split("```")[0].strip()
-            elif "{" in content:
-                start = content.find("{")
-                end = content.rfind("}") + 1
-                json_str = content[start:end]
-            else:
-                json_str = content
-            
-            details = json.loads(json_str)
-            logger.info(f"Extracted booking details: {details}")
-            return details
-            
+            return self._parse_booking_details(self.booking_chain.invoke(self._booking_inputs(conversation_history)))
+        except Exception as e:
+            return self._extraction_failed(e)
+    
+    async def aextract_booking_details(self, conversation_history: str) -> Dict:
+        try:
+            return self._parse_booking_details(
+                await self.booking_chain.ainvoke(self._booking_inputs(conversation_history)))
         except Exception as e:
-            logger.error(f"Error extracting booking details: {str(e)}")
-            return {}
+            return self._extraction_failed(e)
+    
+    def _booking_inputs(self, conversation_history: str) -> Dict:
+        return {"conversation": conversation_history, "format_instructions": self.booking_parser.get_format_instructions()}
+    
+    def _parse_booking_details(self, response) -> Dict:
+        details = self._parse_json_content(response.content)
+        logger.info(f"Extracted booking details: {details}")
+        return details
+    
+    def _extraction_failed(self, error: Exception) -> Dict:
+        logger.error(f"Error extracting booking details: {str(error)}")
+        return {}
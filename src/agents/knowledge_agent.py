@@ -34,16 +34,12 @@ Available vehicles:
         model = entities.get('vehicle_model')
         max_price = entities.get('max_price')
         
-        if category:
-            vehicles = self.knowledge_service.get_vehicles_by_category(category)
-        else:
-            vehicles = self.knowledge_service.search_vehicles(
-                make=make,
-                model=model,
-                max_price=max_price
-            )
-        
-        response_text = self.knowledge_service.format_vehicle_list(vehicles)
+        vehicles, response_text = self.knowledge_service.list_vehicles(
+            category=category,
+            make=make,
+            model=model,
+            max_price=max_price
+        )
         
         return {
             'vehicles': vehicles,
@@ -62,17 +58,10 @@ Available vehicles:
         return vehicle
     
     def get_vehicle_recommendation(self, requirements: str) -> str:
-        all_vehicles = self.knowledge_service.get_all_vehicles()
-        available_vehicles = [v for v in all_vehicles if v.get('available', False)]
-        
-        if not available_vehicles:
+        vehicle_info = self._build_vehicle_info(requirements)
+        if not vehicle_info:
             return "I apologize, but we don't have any vehicles available at the moment."
         
-        vehicle_info = "\n".join([
-            f"- {self.knowledge_service.get_vehicle_summary(v)}"
-            for v in available_vehicles
-        ])
-        
         try:
             chain = self.recommendation_prompt | self.llm
             
@@ -85,8 +74,19 @@ Available vehicles:
             
         except Exception as e:
             logger.error(f"Error getting recommendations: {str(e)}")
-            categories = self.knowledge_service.get_available_categories()
-            return f"I can help you find the right vehicle. We have {', '.join(categories)} available. What interests you most?"
+            return self._recommendation_fallback()
+    
+    def _build_vehicle_info(self, requirements: str) -> str:
+        candidates = self.knowledge_service.find_relevant_vehicles(requirements)
+        
+        return "\n".join([
+            f"- {self.knowledge_service.get_vehicle_summary(v)}"
+            for v in candidates
+        ])
+    
+    def _recommendation_fallback(self) -> str:
+        categories = self.knowledge_service.get_available_categories()
+        return f"I can help you find the right vehicle. We have {', '.join(categories)} available. What interests you most?"
     
     def compare_vehicles(self, vehicle_ids: List[str]) -> str:
         vehicles = [
@@ -0,0 +1,137 @@
+from typing import Dict, Optional
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+TIER_PATTERN = "pattern"
+TIER_DIALOGUE_STATE = "dialogue_state"
+TIER_LLM = "llm"
+
+GREETING_PATTERN = re.compile(
+    r"^(?:hi|hello|hey|hiya|good (?:morning|afternoon|evening))(?: there)?[\s!.,]*$", re.IGNORECASE
+)
+CONFIRMATION_PATTERN = re.compile(
+    r"^(?:yes|yeah|yep|yup|sure|ok|okay|please|correct|book it|that's right|sounds good)"
+    r"(?: please| thanks| thank you)?[\s!.,]*$",
+    re.IGNORECASE
+)
+CANCELLATION_PATTERN = re.compile(
+    r"^(?:cancel|cancel (?:it|that)|never ?mind|forget it)[\s!.,]*$", re.IGNORECASE
+)
+PHONE_PATTERN = re.compile(r"^\(?(\d{3})\)?[-.\s]?(\d{3})[-.\s]?(\d{4})[.!]?$")
+# A name is only read off an explicit introduction or a lone capitalised word;
+# any other short reply ("sounds great", "next tuesday") goes to the LLM
+INTRODUCTION_PATTERN = re.compile(
+    r"^(?:my name is|my name's|name is|i'm|i am|this is)\s+"
+    r"([a-z][a-z'\-]+(?:\s+[a-z][a-z'\-]+){0,2})[.!]?$",
+    re.IGNORECASE
+)
+CAPITALISED_NAME_PATTERN = re.compile(r"^([A-Z][a-z'\-]+)[.!]?$")
+TIME_PATTERN = re.compile(
+    r"^(?:at\s+|around\s+|how about\s+)?(\d{1,2}(?::\d{2})?\s*(?:am|pm|a\.m\.|p\.m\.))[\s.!]*$", re.IGNORECASE
+)
+DATE_PATTERN = re.compile(
+    r"^(?:on\s+)?((?:today|tomorrow|(?:next\s+|this\s+)?"
+    r"(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)))[\s.!]*$",
+    re.IGNORECASE
+)
+
+# Words that fit a name pattern but are really answers, fillers or questions
+NON_NAME_WORDS = {
+    "yes", "yeah", "yep", "no", "nope", "not", "ok", "okay", "sure", "please", "thanks", "thank",
+    "hi", "hello", "hey", "what", "why", "how", "when", "where", "sorry", "cancel", "wait",
+    "hmm", "um", "uh", "actually", "maybe", "later", "again", "repeat", "the", "a", "an", "is",
+    "are", "do", "does", "can", "could", "would", "it", "that", "this", "you", "me", "my", "one",
+    "and", "or", "of", "to", "for", "today", "tomorrow", "sedan", "suv", "truck", "electric",
+    "car", "book", "booking", "test", "drive", "just", "looking", "interested", "fine", "good",
+    "great", "here", "there", "back", "done", "ready", "next", "monday", "tuesday", "wednesday",
+    "thursday", "friday", "saturday", "sunday"
+}
+
+
+class TurnClassifier:
+    """Tiered intent classifier that settles trivial turns without calling the LLM.
+
+    Tier 1 matches compiled patterns that mean the same thing in any state
+    ("hi", "yes", "cancel"). Tier 2 uses the dialogue state - the booking slot
+    the orchestrator is waiting for - to read bare answers like a name, a phone
+    number, a date or a time. Anything else is left to the LLM (tier 3).
+
+    Each result carries a confidence: fixed phrases and well-formed phone
+    numbers, dates and times score high; a name read off a lone word is a guess
+    and scores low.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {TIER_PATTERN: 0, TIER_DIALOGUE_STATE: 0, TIER_LLM: 0}
+
+    def classify(self, user_input: str, awaiting_slot: Optional[str] = None) -> Optional[Dict]:
+        """Returns intent data for locally settled turns, or None to defer to the LLM."""
+        text = " ".join(user_input.strip().split())
+
+        result = self._classify_pattern(text)
+        tier = TIER_PATTERN
+        if result is None and awaiting_slot:
+            result = self._classify_dialogue_state(text, awaiting_slot)
+            tier = TIER_DIALOGUE_STATE
+        if result is None:
+            tier = TIER_LLM
+
+        with self._lock:
+            self._counts[tier] += 1
+
+        if result is not None:
+            # An explicit (empty) 'booking_details' tells the orchestrator no extraction call is needed.
+            result.update({"booking_details": {}, "tier": tier})
+            logger.info(f"Fast-path intent ({tier}): {result}")
+        return result
+
+    def _classify_pattern(self, text: str) -> Optional[Dict]:
+        if GREETING_PATTERN.match(text):
+            return {"intent": "greeting", "entities": {}, "confidence": 0.9}
+        if CONFIRMATION_PATTERN.match(text):
+            return {"intent": "confirmation", "entities": {}, "confidence": 0.9}
+        if CANCELLATION_PATTERN.match(text):
+            return {"intent": "cancellation", "entities": {}, "confidence": 0.9}
+        return None
+
+    def _classify_dialogue_state(self, text: str, awaiting_slot: str) -> Optional[Dict]:
+        match = PHONE_PATTERN.match(text)
+        if match:
+            return {"intent": "booking", "entities": {"customer_phone": "".join(match.groups())}, "confidence": 0.9}
+
+        if awaiting_slot == "customer_name":
+            for pattern, confidence in ((INTRODUCTION_PATTERN, 0.8), (CAPITALISED_NAME_PATTERN, 0.6)):
+                match = pattern.match(text)
+                if match and not set(match.group(1).lower().split()) & NON_NAME_WORDS:
+                    return {"intent": "booking", "entities": {"customer_name": match.group(1).title()},
+                            "confidence": confidence}
+
+        elif awaiting_slot == "time":
+            match = TIME_PATTERN.match(text)
+            if match:
+                return {"intent": "booking", "entities": {"time": match.group(1).replace(".", "").upper()},
+                        "confidence": 0.9}
+
+        elif awaiting_slot == "date":
+            match = DATE_PATTERN.match(text)
+            if match:
+                return {"intent": "booking", "entities": {"date": match.group(1).lower()}, "confidence": 0.9}
+
+        return None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        local = counts[TIER_PATTERN] + counts[TIER_DIALOGUE_STATE]
+        return {
+            "turns": total,
+            "tiers": counts,
+            "local_ratio": round(local / total, 3) if total else 0.0,
+            # Each local turn skips at least one understanding round trip
+            "llm_calls_saved": local
+        }
@@ -1,6 +1,8 @@
 import os
 import sys
+import queue
 import logging
+import time
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).parent.parent
@@ -8,6 +10,9 @@ sys.path.insert(0, str(ROOT_DIR))
 
 from dotenv import load_dotenv
 from src.orchestrator.agent_orchestrator import AgentOrchestrator
+from src.orchestrator.turn_metrics import BARGE_IN
+from src.orchestrator.voice_channel import VoiceChannel
+from src.services.microphone import MicrophoneStream
 
 load_dotenv()
 
@@ -39,29 +44,46 @@ def print_banner():
 def run_voice_mode(orchestrator: AgentOrchestrator):
     print("\n🎤 VOICE MODE ACTIVATED")
     print("=" * 60)
-    print("The assistant will listen when you press Enter")
-    print("It will automatically stop when you finish speaking (1 sec silence)")
-    print("Type 'quit' to exit\n")
+    print("The assistant is always listening - just start talking")
+    print("Talk over the assistant to interrupt it (use headphones so it doesn't hear itself)")
+    print("Press Ctrl+C to exit\n")
     
-    while True:
-        user_input = input("\nPress Enter to speak (or type 'quit' to exit): ").strip().lower()
-        
-        if user_input == 'quit':
-            print("\n👋 Thank you for using our service. Goodbye!")
-            break
-        
-        try:
+    utterances = queue.Queue()
+    
+    def on_speech_start():
+        # Barge-in: stop the reply being spoken; the new utterance is already being recognized
+        if orchestrator.interrupt():
+            orchestrator.speech_service.stop_speaking()
+            orchestrator.services.turn_metrics.record(BARGE_IN, orchestrator.voice_channel.speech_started_at)
+    
+    orchestrator.voice_channel = VoiceChannel(
+        orchestrator.speech_service,
+        on_partial=lambda text: None,
+        on_final=lambda text: utterances.put((text, time.monotonic())),
+        on_speech_start=on_speech_start
+    )
+    microphone = MicrophoneStream(orchestrator.voice_channel.write)
+    microphone.start()
+    
+    try:
+        while True:
             print("\n🎤 Listening... (speak now)")
-            response = orchestrator.process_voice_input()
-            print(f"\n🤖 Assistant: {response}")
-            print("-" * 60)
+            user_input, heard_at = utterances.get()
+            print(f"\n👤 You: {user_input}")
             
-        except KeyboardInterrupt:
-            print("\n\n👋 Goodbye!")
-            break
-        except Exception as e:
-            logger.error(f"Error in voice mode: {str(e)}")
-            print(f"\n❌ Error: {str(e)}\n")
+            try:
+                response = orchestrator.speak_text_input(user_input, heard_at=heard_at)
+                print(f"\n🤖 Assistant: {response}")
+                print("-" * 60)
+            except Exception as e:
+                logger.error(f"Error in voice mode: {str(e)}")
+                print(f"\n❌ Error: {str(e)}\n")
+            
+    except KeyboardInterrupt:
+        print("\n\n👋 Goodbye!")
+    finally:
+        microphone.stop()
+        orchestrator.close()
 
 
 def run_text_mode(orchestrator: AgentOrchestrator):
@@ -108,6 +130,7 @@ def main():
     try:
         print("\n🔧 Initializing agents...")
         orchestrator = AgentOrchestrator()
+        orchestrator.speech_service.prewarm()
         print("✅ All agents initialized successfully!\n")
         
         print("Select mode:")
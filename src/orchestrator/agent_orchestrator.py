@@ -2,31 +2,98 @@ from langchain_openai import ChatOpenAI
 from src.agents.conversational_agent import ConversationalAgent
 from src.agents.knowledge_agent import KnowledgeAgent
 from src.agents.booking_agent import BookingAgent
+from src.agents.turn_classifier import TurnClassifier
 from src.services.knowledge_service import KnowledgeService
 from src.services.booking_service import BookingService
 from src.services.speech_service import SpeechService
+from src.services.sentence_splitter import SentenceStream
+from src.orchestrator.event_loop import LoopCall, run_sync
+from src.orchestrator.turn_metrics import TurnMetrics, TURN_GAP
 from config.settings import settings
-from typing import Dict, List
+from concurrent.futures import CancelledError
+from typing import Dict, Iterator, List, Optional, Tuple
+import asyncio
 import logging
 import re
+import threading
+import time
+import uuid
 
 logger = logging.getLogger(__name__)
 
+# Fixed assistant prompts; kept as constants so their audio can be pre-synthesized
+GREETING_PROMPT = "Hello! Welcome to Premium Auto Dealership. I can help you learn about our vehicles and schedule a test drive. What can I help you with today?"
+NOT_HEARD_PROMPT = "I'm sorry, I didn't catch that. Could you please repeat?"
+ASK_CATEGORY_PROMPT = "I'd be happy to help you with that. Which type of vehicle are you interested in? We currently have {categories} available."
+VEHICLE_NOT_FOUND_PROMPT = "I'm sorry, I couldn't find a vehicle matching those details. What other model are you interested in?"
+ASK_DATE_PROMPT = "What day would you like to come in for the test drive?"
+CANCELLATION_PROMPT = "No problem, I've cleared the request. What else can I do for you?"
 
-class AgentOrchestrator:
+
+class SharedServices:
+    """Heavy, stateless components shared by every conversation session."""
     
     def __init__(self):
         self.llm = ChatOpenAI(model=settings.OPENAI_MODEL, temperature=settings.OPENAI_TEMPERATURE)
         self.knowledge_service = KnowledgeService()
-        self.booking_service = BookingService()
+        # Slot rules follow the knowledge base, including reloads
+        self.booking_service = BookingService(slot_rules=lambda: self.knowledge_service.slot_engine)
         self.speech_service = SpeechService()
         
         self.conversational_agent = ConversationalAgent(self.llm)
         self.knowledge_agent = KnowledgeAgent(self.llm, self.knowledge_service)
         self.booking_agent = BookingAgent(self.llm, self.booking_service)
+        self.turn_classifier = TurnClassifier()
+        self.turn_metrics = TurnMetrics()
+        
+        logger.info("Shared services initialized")
+    
+    def known_prompts(self) -> List[str]:
+        """Assistant prompts whose exact wording is known ahead of time (for TTS cache warming)."""
+        available = self.knowledge_service.get_available_categories()
+        categories = ', '.join(available)
+        # Per-category listings are cached text, so their audio can be warmed too
+        listings = [self.knowledge_service.list_vehicles(category=category)[1] for category in available]
+        return [
+            GREETING_PROMPT,
+            NOT_HEARD_PROMPT,
+            ASK_CATEGORY_PROMPT.format(categories=categories),
+            VEHICLE_NOT_FOUND_PROMPT,
+            ASK_DATE_PROMPT,
+            CANCELLATION_PROMPT
+        ] + listings
+
+
+class AgentOrchestrator:
+    
+    def __init__(self, services: Optional[SharedServices] = None):
+        # Only the per-call dialogue state lives on the orchestrator; the LLM client,
+        # services and agents are borrowed from a (possibly shared) SharedServices.
+        self.services = services or SharedServices()
+        self.llm = self.services.llm
+        self.knowledge_service = self.services.knowledge_service
+        self.booking_service = self.services.booking_service
+        self.speech_service = self.services.speech_service
+        
+        self.conversational_agent = self.services.conversational_agent
+        self.knowledge_agent = self.services.knowledge_agent
+        self.booking_agent = self.services.booking_agent
+        self.turn_classifier = self.services.turn_classifier
         
         self.conversation_history = []
         self.booking_details = {}
+        # Identifies this call's hold on the slot it was told is free
+        self.slot_holder = uuid.uuid4().hex
+        
+        # Per-call transport state: the live microphone stream (if any), and a lock
+        # so overlapping events from one caller take turns one at a time
+        self.voice_channel = None
+        self.turn_lock = threading.Lock()
+        
+        # Barge-in: set when the caller talks over the reply of turn `turn_id`
+        self.turn_id = 0
+        self.turn_cancelled = threading.Event()
+        self._pending_call = None
         
         logger.info("Agent orchestrator initialized")
     
@@ -35,7 +102,7 @@ class AgentOrchestrator:
         user_input = self.speech_service.listen_and_transcribe()
         
         if not user_input:
-            response = "I'm sorry, I didn't catch that. Could you please repeat?"
+            response = NOT_HEARD_PROMPT
             self.speech_service.speak(response)
             return response
         
@@ -46,109 +113,198 @@ class AgentOrchestrator:
         
         return response
     
+    def speak_text_input(self, user_input: str, heard_at: Optional[float] = None) -> str:
+        """Answers out loud sentence by sentence, stopping as soon as the caller barges in.
+        
+        Returns the part of the reply that was spoken.
+        """
+        spoken = []
+        with self.turn_lock:
+            self.begin_turn()
+            splitter = SentenceStream()
+            pieces = self.stream_text_input(user_input)
+            try:
+                for piece in pieces:
+                    for sentence in splitter.feed(piece):
+                        if not self._speak_sentence(sentence, spoken, heard_at):
+                            return " ".join(spoken)
+                for sentence in splitter.flush():
+                    if not self._speak_sentence(sentence, spoken, heard_at):
+                        break
+            finally:
+                pieces.close()
+        return " ".join(spoken)
+    
+    def _speak_sentence(self, sentence: str, spoken: List[str], heard_at: Optional[float]) -> bool:
+        if self.turn_cancelled.is_set():
+            return False
+        if heard_at is not None and not spoken:
+            self.services.turn_metrics.record(TURN_GAP, heard_at)
+        spoken.append(sentence)
+        self.speech_service.speak(sentence)
+        return not self.turn_cancelled.is_set()
+    
+    def begin_turn(self) -> int:
+        """Starts a new reply; call with turn_lock held."""
+        self.turn_cancelled.clear()
+        self.turn_id += 1
+        return self.turn_id
+    
+    def interrupt(self) -> bool:
+        """Barge-in: abandons the reply in progress, cancelling its LLM call if still pending.
+        
+        Returns False when no reply was being produced.
+        """
+        if not self.turn_lock.locked():
+            return False
+        self.turn_cancelled.set()
+        pending = self._pending_call
+        if pending is not None:
+            pending.cancel()
+        logger.info(f"Turn {self.turn_id} interrupted by caller")
+        return True
+    
     def process_text_input(self, user_input: str) -> str:
         """Processes the user text input and routes it to the correct agent logic."""
-        self.conversation_history.append({'role': 'user', 'content': user_input})
+        return run_sync(self.aprocess_text_input(user_input))
+    
+    async def aprocess_text_input(self, user_input: str) -> str:
+        """Async variant of process_text_input; independent LLM stages run concurrently."""
+        understood = await self._aunderstand_input(user_input)
+        # Handlers hit SQLite, so keep them off the event loop thread
+        response = await asyncio.to_thread(self._route_turn, *understood)
+        if response is None:
+            response = await self.conversational_agent.agenerate_response(self._recent_context(), user_input)
         
-        # 1. Detect Intent
-        intent_data = self.conversational_agent.detect_intent(user_input)
-        intent = intent_data.get('intent', 'general')
-        entities = intent_data.get('entities', {})
+        self.conversation_history.append({'role': 'assistant', 'content': response})
+        return response
+    
+    def stream_text_input(self, user_input: str) -> Iterator[str]:
+        """Like process_text_input, but yields the reply in pieces as the LLM produces them.
         
-        # 2. State Check
-        is_booking_active = bool(self.booking_details.get('vehicle_id'))
+        Replies from the fixed handlers arrive as a single piece; only generated replies stream.
+        Stops early, recording only what was produced, once the turn is interrupted.
+        """
+        self._pending_call = LoopCall(self._aunderstand_input(user_input))
+        try:
+            understood = self._pending_call.result()
+        except CancelledError:
+            logger.info("Reply abandoned before it started")
+            return
+        finally:
+            self._pending_call = None
         
-        # GUARD: If booking is active and user gives info, force 'booking' intent
-        if is_booking_active and (entities.get('date') or entities.get('time') or entities.get('customer_name')):
-            intent = 'booking'
+        # The handler runs here, under the turn lock, and isn't interrupted: a barge-in
+        # may drop the reply, but not a half-applied booking update
+        response = self._route_turn(*understood)
+        if response is not None:
+            # Recorded even when the reply isn't heard, so the dialogue knows what was done
+            self.conversation_history.append({'role': 'assistant', 'content': response})
+            if not self.turn_cancelled.is_set():
+                yield response
+            return
+        if self.turn_cancelled.is_set():
+            return
+        
+        parts = []
+        try:
+            for token in self.conversational_agent.stream_response(self._recent_context(), user_input):
+                if self.turn_cancelled.is_set():
+                    break
+                parts.append(token)
+                yield token
+        finally:
+            # Record whatever was produced, even if the consumer stopped early
+            self.conversation_history.append({'role': 'assistant', 'content': "".join(parts).strip()})
+    
+    def _recent_context(self) -> str:
+        return "\n".join([f"{msg['role']}: {msg['content']}" for msg in self.conversation_history[-5:]])
+    
+    async def _aunderstand_input(self, user_input: str) -> Tuple[str, Dict, bool]:
+        """Understands the turn and merges any booking details into the dialogue state.
+        
+        Returns the arguments for _route_turn.
+        """
+        self.conversation_history.append({'role': 'user', 'content': user_input})
         
-        logger.info(f"Intent: {intent} | Active Booking: {is_booking_active}")
+        history_str = "\n".join([f"{m['role']}: {m['content']}" for m in self.conversation_history[-3:]])
+        is_booking_active = bool(self.booking_details.get('vehicle_id'))
+        extraction_task = None
+        
+        try:
+            # 1. Detect Intent: trivial turns are settled locally, the combined call
+            # also extracts the booking slots
+            started = time.perf_counter()
+            fast_path = None
+            if settings.FAST_PATH_CLASSIFIER:
+                fast_path = self.turn_classifier.classify(user_input, self.awaiting_slot)
+            
+            if fast_path is not None:
+                intent_data = fast_path
+            elif settings.COMBINED_TURN_UNDERSTANDING:
+                intent_data = await self.conversational_agent.aunderstand_turn(user_input, history_str)
+            else:
+                # Extraction doesn't depend on the intent, so it runs speculatively alongside
+                # detection and is cancelled below if routing doesn't need it.
+                extraction_task = asyncio.create_task(
+                    self.conversational_agent.aextract_booking_details(history_str)
+                )
+                intent_data = await self.conversational_agent.adetect_intent(user_input)
+            intent = intent_data.get('intent', 'general')
+            entities = intent_data.get('entities', {})
+            
+            # 2. State Check
+            # GUARD: If booking is active and user gives info, force 'booking' intent
+            if is_booking_active and (entities.get('date') or entities.get('time') or entities.get('customer_name')):
+                intent = 'booking'
+            
+            logger.info(f"Intent: {intent} | Active Booking: {is_booking_active}")
 
-        # 3. Context Extraction
-        if intent == 'booking' or is_booking_active:
-            history_str = "\n".join([f"{m['role']}: {m['content']}" for m in self.conversation_history[-3:]])
-            extracted = self.conversational_agent.extract_booking_details(history_str)
-            for key, value in extracted.items():
-                if value and value not in ["null", "None"]:
-                    # Don't let user slang overwrite the official vehicle selection
-                    if key in ['vehicle_id', 'vehicle_name'] and is_booking_active: continue
-                    self.booking_details[key] = value
+            # 3. Context Extraction
+            if intent == 'booking' or is_booking_active:
+                if 'booking_details' in intent_data:
+                    extracted = intent_data['booking_details']
+                elif extraction_task is not None:
+                    extracted = await extraction_task
+                else:
+                    extracted = await self.conversational_agent.aextract_booking_details(history_str)
+                for key, value in extracted.items():
+                    if value and value not in ["null", "None"]:
+                        # Don't let user slang overwrite the official vehicle selection
+                        if key in ['vehicle_id', 'vehicle_name'] and is_booking_active: continue
+                        self.booking_details[key] = value
+        finally:
+            if extraction_task is not None and not extraction_task.done():
+                extraction_task.cancel()
 
-        # 4. Routing Logic
+        logger.info(f"Understanding took {(time.perf_counter() - started) * 1000:.0f} ms "
+                    f"(tier={intent_data.get('tier', 'llm')}, combined={settings.COMBINED_TURN_UNDERSTANDING})")
+        return intent, intent_data, is_booking_active
+    
+    @property
+    def awaiting_slot(self) -> Optional[str]:
+        """The booking field _handle_booking will ask for next, if a booking is in progress."""
+        if not self.booking_details.get('vehicle_id'):
+            return None
+        for key in ['date', 'time', 'customer_name', 'customer_phone']:
+            if not self.booking_details.get(key) or self.booking_details.get(key) in ["null", "None", "Not provided"]:
+                return key
+        return None
+    
+    def _route_turn(self, intent: str, intent_data: Dict, is_booking_active: bool) -> Optional[str]:
+        """Returns the handler response, or None when the turn needs a generated reply."""
         if intent == 'greeting' and not is_booking_active:
-            response = self._handle_greeting()
+            return self._handle_greeting()
         elif intent == 'inquiry' and not is_booking_active:
-            response = self._handle_inquiry(intent_data)
+            return self._handle_inquiry(intent_data)
         elif intent in ['booking', 'confirmation', 'modification'] or is_booking_active:
-            response = self._handle_booking(intent_data)
+            return self._handle_booking(intent_data)
         elif intent == 'cancellation':
-            response = self._handle_cancellation()
-        else:
-            context = "\n".join([f"{msg['role']}: {msg['content']}" for msg in self.conversation_history[-5:]])
-            response = self.conversational_agent.generate_response(context, user_input)
-        
-        self.conversation_history.append({'role': 'assistant', 'content': response})
-        return response
-
-    def _handle_booking(self, intent_data: Dict) -> str:
-        entities = intent_data.get('entities', {})
-        
-        # 1. VEHICLE SELECTION
-        if 'vehicle_id' not in self.booking_details:
-            make, model, cat = entities.get('vehicle_make'), entities.get('vehicle_model'), entities.get('vehicle_category')
-            if not any([make, model, cat]):
-                cats = self.knowledge_service.get_available_categories()
-                return f"I'd be happy to help. Which type of vehicle interests you? We have {', '.join(cats)}."
-
-            res = self.knowledge_service.search_vehicles(make=make, model=model, category=cat)
-            if len(res) == 1:
-                v = res[0]
-                self.booking_details['vehicle_id'] = v['id']
-                self.booking_details['vehicle_name'] = f"{v['year']} {v['make']} {v['model']}"
-            elif len(res) > 1:
-                options = " or the ".join([f"{v['year']} {v['model']}" for v in res[:2]])
-                return f"We have a few models matching that. Did you mean the {options}?"
-            else:
-                return "I couldn't find that model. Which other vehicle would you like to try?"
-
-        # 2. UPDATE INFO
-        for key in ['date', 'time', 'customer_name', 'customer_phone']:
-            if key in entities and entities[key]: self.booking_details[key] = entities[key]
-
-        # 3. IMMEDIATE AVAILABILITY CHECK
-        if self.booking_details.get('date') and self.booking_details.get('time') and not self.booking_details.get('customer_name'):
-            d_obj = self.booking_agent.parse_date(self.booking_details['date'])
-            t_tup = self.booking_agent.parse_time(self.booking_details['time'])
-            if d_obj and t_tup:
-                dt_check = d_obj.replace(hour=t_tup[0], minute=t_tup[1], second=0, microsecond=0)
-                avail = self.booking_agent.check_availability(dt_check)
-                if not avail.get('available', True):
-                    self.booking_details['time'] = None
-                    return avail['message']
-
-        # 4. VALIDATION
-        val = self.booking_agent.validate_booking_details(self.booking_details)
-        if not val['valid']:
-            if 'invalid_fields' in val: # Handle 10-digit phone error
-                self.booking_details['customer_phone'] = None
-                return val['message']
-            
-            missing = val.get('missing_fields', [])
-            if 'date' in missing: return "What day works for the test drive?"
-            if 'time' in missing: return f"What time works best for the {self.booking_details['vehicle_name']}?"
-            if 'customer_name' in missing: return f"Perfect, the {self.booking_details['time']} slot is free. May I have your name?"
-            if 'customer_phone' in missing: return f"Thanks {self.booking_details['customer_name']}. And your 10-digit phone number?"
-
-        # 5. FINALIZATION
-        logger.info(f"Finalizing booking: {self.booking_details}")
-        result = self.booking_agent.create_booking(self.booking_details)
-        if result['success']:
-            self.booking_details = {} 
-            return result['message'] + " Is there anything else I can help with?"
-        return result['message']
+            return self._handle_cancellation()
+        return None
 
     def _handle_greeting(self) -> str:
-        return "Hello! Welcome to Premium Auto Dealership. I can help you learn about our vehicles and schedule a test drive. What can I help you with today?"
+        return GREETING_PROMPT
     
     def _handle_inquiry(self, intent_data: Dict) -> str:
         res = self.knowledge_agent.query_vehicles(intent_data)
@@ -169,7 +325,7 @@ class AgentOrchestrator:
             
             if not any([make, model, cat]):
                 categories = self.knowledge_service.get_available_categories()
-                return f"I'd be happy to help you with that. Which type of vehicle are you interested in? We currently have {', '.join(categories)} available."
+                return ASK_CATEGORY_PROMPT.format(categories=', '.join(categories))
 
             search_results = self.knowledge_service.search_vehicles(make=make, model=model, category=cat)
             
@@ -184,7 +340,7 @@ class AgentOrchestrator:
                 options = " or the ".join([f"{v['year']} {v['model']}" for v in search_results[:2]])
                 return f"We have a few models matching that description. Did you mean the {options}?"
             else:
-                return "I'm sorry, I couldn't find a vehicle matching those details. What other model are you interested in?"
+                return VEHICLE_NOT_FOUND_PROMPT
 
         # UPDATE REMAINING ENTITIES
         for key in ['date', 'time', 'customer_name', 'customer_phone']:
@@ -197,9 +353,9 @@ class AgentOrchestrator:
             t_tup = self.booking_agent.parse_time(self.booking_details['time'])
             if d_obj and t_tup:
                 dt_check = d_obj.replace(hour=t_tup[0], minute=t_tup[1], second=0, microsecond=0)
-                avail = self.booking_agent.check_availability(dt_check)
+                avail = self.booking_agent.check_availability(dt_check, self.booking_details.get('vehicle_id'), self.slot_holder)
                 if not avail['available']:
-                    self.booking_details['time'] = None # Reset time so it asks again
+                    self._drop_time() # Reset time so it asks again
                     return avail['message']
 
         # VALIDATION & PROGRESSION
@@ -211,7 +367,7 @@ class AgentOrchestrator:
             
             missing = val.get('missing_fields', [])
             if 'date' in missing:
-                return "What day would you like to come in for the test drive?"
+                return ASK_DATE_PROMPT
             elif 'time' in missing:
                 return f"Great, I have you down for the {self.booking_details.get('vehicle_name')}. What time works best for you?"
             elif 'customer_name' in missing:
@@ -221,30 +377,40 @@ class AgentOrchestrator:
 
         # FINALIZATION
         logger.info(f"Finalizing booking: {self.booking_details}")
-        result = self.booking_agent.create_booking(self.booking_details)
+        result = self.booking_agent.create_booking(self.booking_details, self.slot_holder)
         
         if result['success']:
             self.booking_details = {} 
             return result['message'] + " Is there anything else I can help you with today?"
         else:
+            if result.get('slot_taken'):
+                self._drop_time()
             return result['message']
         
 
     def _handle_confirmation(self) -> str:
         if self.booking_details and 'vehicle_id' in self.booking_details:
-            result = self.booking_agent.create_booking(self.booking_details)
+            result = self.booking_agent.create_booking(self.booking_details, self.slot_holder)
             
             if result['success']:
                 self.booking_details = {}
                 return result['message']
             else:
+                if result.get('slot_taken'):
+                    self._drop_time()
                 return result['message']
         
         return "What would you like to confirm?"
     
+    def _drop_time(self):
+        """Forgets the requested time so it's asked for again, and lets go of any slot held for it."""
+        self.booking_details['time'] = None
+        self.booking_service.release_hold(self.slot_holder)
+    
     def _handle_cancellation(self) -> str:
         self.booking_details = {}
-        return "No problem, I've cleared the request. What else can I do for you?"
+        self.booking_service.release_hold(self.slot_holder)
+        return CANCELLATION_PROMPT
     
     def _handle_general(self, user_input: str) -> str:
         if self.booking_details:
@@ -289,10 +455,22 @@ class AgentOrchestrator:
         
         return self.conversational_agent.generate_response(context, user_input)
     
+    def close_voice_channel(self):
+        """Stops the microphone stream, if any; the conversation (and its slot hold) carries on."""
+        if self.voice_channel is not None:
+            self.voice_channel.close()
+            self.voice_channel = None
+    
+    def close(self):
+        """Releases per-call resources when the session ends."""
+        self.booking_service.release_hold(self.slot_holder)
+        self.close_voice_channel()
+    
     def reset_conversation(self):
         self.conversation_history = []
         self.current_intent = None
         self.booking_details = {}
+        self.booking_service.release_hold(self.slot_holder)
         logger.info("Conversation reset")
     
     def get_conversation_summary(self) -> str:
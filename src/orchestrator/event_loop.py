@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_loop = None
+_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Returns the process-wide event loop, starting its thread on first use.
+
+    The async OpenAI client pools connections per event loop, so every sync caller
+    (Socket.IO worker threads, the CLI) submits onto this one long-lived loop instead
+    of spinning up a fresh loop per turn with asyncio.run().
+    """
+    global _loop
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="agent-event-loop", daemon=True)
+                thread.start()
+                _loop = loop
+                logger.info("Agent event loop started")
+    return _loop
+
+
+def submit(coro: Awaitable[T]) -> "Future[T]":
+    """Schedules a coroutine on the shared loop; cancelling the future cancels the task."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Runs a coroutine on the shared loop and blocks until it completes."""
+    return submit(coro).result()
+
+
+class LoopCall(Generic[T]):
+    """A coroutine on the shared loop that a sync thread waits for and may cancel.
+
+    The future from run_coroutine_threadsafe reports itself cancelled the moment
+    cancel() is called, while its task may still be running. Here result() only
+    returns, or raises CancelledError, once the coroutine has actually stopped.
+    """
+
+    def __init__(self, coro: Awaitable[T]):
+        self._loop = get_event_loop()
+        self._done: "Future[T]" = Future()
+        self._task = None
+        # Callbacks run in the order they were scheduled, so the task exists before any cancel
+        self._loop.call_soon_threadsafe(self._start, coro)
+
+    def _start(self, coro: Awaitable[T]):
+        self._task = self._loop.create_task(coro)
+        self._task.add_done_callback(self._finish)
+
+    def _finish(self, task: asyncio.Task):
+        if task.cancelled():
+            self._done.cancel()
+        elif task.exception() is not None:
+            self._done.set_exception(task.exception())
+        else:
+            self._done.set_result(task.result())
+
+    def cancel(self):
+        self._loop.call_soon_threadsafe(lambda: self._task.cancel())
+
+    def result(self) -> T:
+        return self._done.result()
@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from src.orchestrator.agent_orchestrator import AgentOrchestrator, SharedServices
+from config.settings import settings
+from typing import Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRegistry:
+    """Maps Socket.IO session ids to their own AgentOrchestrator.
+
+    Sessions are kept in least-recently-used order, so idle-TTL expiry only ever
+    has to look at the front of the map and the max-sessions cap evicts the
+    caller that has been quiet the longest.
+    """
+
+    def __init__(self,
+                 services: Optional[SharedServices] = None,
+                 max_sessions: Optional[int] = None,
+                 idle_ttl_seconds: Optional[float] = None):
+        self._services = services
+        self.max_sessions = max_sessions or settings.SESSION_MAX_COUNT
+        self.idle_ttl_seconds = idle_ttl_seconds or settings.SESSION_IDLE_TTL_SECONDS
+
+        self._sessions: "OrderedDict[str, AgentOrchestrator]" = OrderedDict()
+        self._last_seen = {}
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    @property
+    def services(self) -> SharedServices:
+        # Built on first use so importing the app doesn't pay for the LLM/speech clients.
+        if self._services is None:
+            with self._lock:
+                if self._services is None:
+                    logger.info("Initializing shared services...")
+                    self._services = SharedServices()
+        return self._services
+
+    def get(self, session_id: str) -> AgentOrchestrator:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+
+            orchestrator = self._sessions.get(session_id)
+            if orchestrator is None:
+                orchestrator = AgentOrchestrator(self.services)
+                self._sessions[session_id] = orchestrator
+                logger.info(f"Session opened: {session_id} ({len(self._sessions)} active)")
+                self._evict_overflow()
+            else:
+                self._sessions.move_to_end(session_id)
+
+            self._last_seen[session_id] = now
+            return orchestrator
+
+    def find(self, session_id: str) -> Optional[AgentOrchestrator]:
+        """Returns the session's orchestrator without creating or touching it."""
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def touch(self, session_id: str) -> Optional[AgentOrchestrator]:
+        """Like find, but counts as activity: the session's idle timer restarts.
+
+        For events from a live call (microphone frames, utterances) that must
+        keep it from being evicted, but shouldn't open a session if it's gone.
+        """
+        with self._lock:
+            orchestrator = self._sessions.get(session_id)
+            if orchestrator is not None:
+                self._sessions.move_to_end(session_id)
+                self._last_seen[session_id] = time.monotonic()
+            return orchestrator
+
+    def remove(self, session_id: str) -> bool:
+        with self._lock:
+            self._last_seen.pop(session_id, None)
+            orchestrator = self._sessions.pop(session_id, None)
+        if orchestrator is None:
+            return False
+        orchestrator.close()
+        logger.info(f"Session closed: {session_id} ({len(self._sessions)} active)")
+        return True
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            return self._evict_expired(time.monotonic())
+
+    def _evict_expired(self, now: float) -> int:
+        evicted = 0
+        while self._sessions:
+            session_id = next(iter(self._sessions))
+            if now - self._last_seen[session_id] < self.idle_ttl_seconds:
+                break
+            self._drop_oldest("idle")
+            evicted += 1
+        return evicted
+
+    def _evict_overflow(self):
+        while len(self._sessions) > self.max_sessions:
+            self._drop_oldest("capacity")
+
+    def _drop_oldest(self, reason: str):
+        session_id, orchestrator = self._sessions.popitem(last=False)
+        self._last_seen.pop(session_id, None)
+        orchestrator.close()
+        self.evictions += 1
+        logger.info(f"Session evicted ({reason}): {session_id}")
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
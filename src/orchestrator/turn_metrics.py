@@ -0,0 +1,47 @@
+from collections import deque
+from typing import Dict
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+TURN_GAP = "turn_gap"
+BARGE_IN = "barge_in"
+
+
+class TurnMetrics:
+    """Rolling turn-taking latencies, shared by all sessions and reported on /stats.
+
+    turn_gap: caller's utterance finalized by the recognizer -> first reply audio sent
+    barge_in: caller speech onset detected by the VAD -> assistant playback stopped
+    """
+
+    def __init__(self, window: int = 500):
+        self._samples = {TURN_GAP: deque(maxlen=window), BARGE_IN: deque(maxlen=window)}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, started_at: float) -> float:
+        """Records the time elapsed since `started_at` (time.monotonic()) in milliseconds."""
+        elapsed_ms = (time.monotonic() - started_at) * 1000
+        with self._lock:
+            self._samples[name].append(elapsed_ms)
+        logger.info(f"{name}: {elapsed_ms:.0f} ms")
+        return elapsed_ms
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+
+        stats = {}
+        for name, values in samples.items():
+            if not values:
+                stats[name] = {"count": 0}
+                continue
+            stats[name] = {
+                "count": len(values),
+                "p50_ms": round(values[len(values) // 2], 1),
+                "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 1),
+                "max_ms": round(values[-1], 1)
+            }
+        return stats
@@ -0,0 +1,54 @@
+from src.services.speech_service import SpeechService
+from src.services.voice_activity import EnergyVAD, SPEECH_START
+from config.settings import settings
+from typing import Callable, Optional
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceChannel:
+    """A caller's live microphone: browser PCM frames in, partial and final transcripts out.
+
+    Each Socket.IO session owns at most one channel, backed by a push-stream
+    recognizer, so no server worker is held for the length of an utterance.
+    With barge-in enabled the frames also go through an energy VAD, and
+    on_speech_start fires as soon as the caller starts talking, well before the
+    recognizer has anything to say.
+    """
+
+    def __init__(self,
+                 speech_service: SpeechService,
+                 on_partial: Callable[[str], None],
+                 on_final: Callable[[str], None],
+                 on_speech_start: Optional[Callable[[], None]] = None):
+        self.recognizer = speech_service.open_stream(on_partial, on_final)
+        self.on_speech_start = on_speech_start
+        self.vad = EnergyVAD() if on_speech_start and settings.BARGE_IN_ENABLED else None
+        self.speech_started_at = None
+        self.bytes_received = 0
+        self.closed = False
+
+    def write(self, frame: bytes):
+        if self.closed or not frame:
+            return
+        self.bytes_received += len(frame)
+        self.recognizer.write(frame)
+
+        if self.vad and SPEECH_START in self.vad.feed(frame):
+            self.speech_started_at = time.monotonic()
+            try:
+                self.on_speech_start()
+            except Exception as e:
+                logger.error(f"Barge-in handler failed: {str(e)}")
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.recognizer.close()
+        except Exception as e:
+            logger.error(f"Error closing voice channel: {str(e)}")
+        logger.info(f"Voice channel closed after {self.bytes_received / 1024:.0f} KB of audio")
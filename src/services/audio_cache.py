@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from config.settings import settings
+from pathlib import Path
+from typing import Dict, Optional
+import hashlib
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class AudioCache:
+    """Size-bounded on-disk LRU of synthesized audio, keyed by a hash of the synthesis inputs.
+
+    The LRU order lives in memory and is rebuilt from file mtimes at startup, so a
+    cache hit is one dictionary lookup plus one file read - no network call.
+    """
+
+    FILE_SUFFIX = ".audio"
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = Path(cache_dir or settings.TTS_CACHE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.TTS_CACHE_MAX_MB * 1024 * 1024
+
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._load_index()
+
+    @staticmethod
+    def make_key(text: str, voice: str, rate: str, pitch: str, output_format: str) -> str:
+        raw = "\x1f".join([text.strip(), voice, str(rate), str(pitch), output_format])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.FILE_SUFFIX}"
+
+    def _load_index(self):
+        files = []
+        for path in self.cache_dir.glob(f"*{self.FILE_SUFFIX}"):
+            stat = path.stat()
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+
+        self._evict()
+        logger.info(f"Audio cache loaded: {len(self._entries)} entries, {self._total_bytes / 1024:.0f} KB")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        try:
+            path = self._path(key)
+            audio = path.read_bytes()
+            os.utime(path)  # keep the on-disk order in step for the next restart
+            return audio
+        except OSError as e:
+            logger.warning(f"Audio cache entry unreadable, dropping {key}: {str(e)}")
+            with self._lock:
+                size = self._entries.pop(key, None)
+                if size is not None:
+                    self._total_bytes -= size
+            return None
+
+    def put(self, key: str, audio: bytes):
+        if not audio or len(audio) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            tmp_path.write_bytes(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write audio cache entry {key}: {str(e)}")
+            return
+
+        with self._lock:
+            old_size = self._entries.pop(key, None)
+            if old_size is not None:
+                self._total_bytes -= old_size
+            self._entries[key] = len(audio)
+            self._total_bytes += len(audio)
+            self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0
+            }
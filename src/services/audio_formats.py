@@ -0,0 +1,52 @@
+from typing import Dict
+
+
+class AudioFormat:
+    """A TTS output format: the Speech SDK enum member to request and how the browser should play it."""
+
+    def __init__(self, name: str, sdk_format: str, mime: str, sample_rate: int, kbps: int):
+        self.name = name
+        self.sdk_format = sdk_format
+        self.mime = mime
+        self.sample_rate = sample_rate
+        self.kbps = kbps
+
+    @property
+    def is_raw_pcm(self) -> bool:
+        """Headerless 16-bit little-endian mono samples; the client builds the AudioBuffer itself."""
+        return self.mime == "audio/pcm"
+
+    @property
+    def is_wav(self) -> bool:
+        return self.mime == "audio/wav"
+
+    def describe(self) -> Dict:
+        """What the client needs to play a payload in this format."""
+        return {"format": self.name, "mime": self.mime, "sample_rate": self.sample_rate}
+
+
+AUDIO_FORMATS = {fmt.name: fmt for fmt in [
+    # Uncompressed (what the SDK returns by default)
+    AudioFormat("wav-16khz", "Riff16Khz16BitMonoPcm", "audio/wav", 16000, 256),
+    AudioFormat("wav-24khz", "Riff24Khz16BitMonoPcm", "audio/wav", 24000, 384),
+    # Raw PCM: no per-chunk header, so streamed sentences join without decoder gaps
+    AudioFormat("pcm-16khz", "Raw16Khz16BitMonoPcm", "audio/pcm", 16000, 256),
+    AudioFormat("pcm-24khz", "Raw24Khz16BitMonoPcm", "audio/pcm", 24000, 384),
+    # MP3: decodable by every browser
+    AudioFormat("mp3-16khz-32kbps", "Audio16Khz32KBitRateMonoMp3", "audio/mpeg", 16000, 32),
+    AudioFormat("mp3-24khz-48kbps", "Audio24Khz48KBitRateMonoMp3", "audio/mpeg", 24000, 48),
+    AudioFormat("mp3-24khz-96kbps", "Audio24Khz96KBitRateMonoMp3", "audio/mpeg", 24000, 96),
+    AudioFormat("mp3-48khz-192kbps", "Audio48Khz192KBitRateMonoMp3", "audio/mpeg", 48000, 192),
+    # Opus: smallest for speech; WebM for Chromium/Firefox, Ogg for Firefox/Safari
+    AudioFormat("webm-opus-16khz", "Webm16Khz16BitMonoOpus", "audio/webm;codecs=opus", 16000, 32),
+    AudioFormat("webm-opus-24khz-24kbps", "Webm24Khz16Bit24KbpsMonoOpus", "audio/webm;codecs=opus", 24000, 24),
+    AudioFormat("ogg-opus-16khz", "Ogg16Khz16BitMonoOpus", "audio/ogg;codecs=opus", 16000, 32),
+    AudioFormat("ogg-opus-24khz", "Ogg24Khz16BitMonoOpus", "audio/ogg;codecs=opus", 24000, 48),
+]}
+
+
+def get_audio_format(name: str) -> AudioFormat:
+    try:
+        return AUDIO_FORMATS[name]
+    except KeyError:
+        raise ValueError(f"Unknown TTS output format '{name}'. Choose one of: {', '.join(AUDIO_FORMATS)}")
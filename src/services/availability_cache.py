@@ -0,0 +1,151 @@
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+import threading
+import time
+
+import numpy as np
+
+# (booking_date, booking id, vehicle id) of a confirmed booking
+Entry = Tuple[datetime, int, Optional[str]]
+
+
+def day_range(first_day: date, last_day: date) -> List[date]:
+    return [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+
+
+class CachedDay:
+    """One day's bookings, plus their times and vehicles as arrays for the slot engine.
+
+    The arrays are built on first use and dropped on every write-through;
+    turning datetimes into datetime64 is the expensive part of a check.
+    """
+
+    __slots__ = ("loaded_at", "entries", "_arrays")
+
+    def __init__(self, loaded_at: float, entries: List[Entry]):
+        self.loaded_at = loaded_at
+        self.entries = entries
+        self._arrays = None
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._arrays is None:
+            self._arrays = (np.array([e[0] for e in self.entries], dtype="datetime64[s]"),
+                            np.array([e[2] for e in self.entries], dtype=object))
+        return self._arrays
+
+    def add(self, entry: Entry):
+        insort(self.entries, entry)
+        self._arrays = None
+
+    def remove(self, booking_date: datetime, booking_id: int):
+        i = bisect_left(self.entries, (booking_date, booking_id))
+        if i < len(self.entries) and self.entries[i][:2] == (booking_date, booking_id):
+            del self.entries[i]
+            self._arrays = None
+
+
+class AvailabilityCache:
+    """In-process copy of the confirmed bookings of recently asked-about days.
+
+    Each cached day holds its bookings sorted by time. BookingService writes
+    through on create/cancel, so a cached day stays exact for this process; the
+    TTL is only a safety net for writes made elsewhere (another worker, a manual
+    fix in the database). Days are evicted least recently used.
+
+    Entries carry the vehicle, so one cached day answers for any vehicle.
+    """
+
+    def __init__(self, ttl_seconds: float, max_days: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_days = max_days
+        self._days: "OrderedDict[date, CachedDay]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every write-through, so a load that raced a write isn't cached
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.days_loaded = 0
+        self.write_throughs = 0
+
+    def bookings(self, first_day: date, last_day: date,
+                 load: Callable[[date, date], List[Entry]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Times (datetime64[s]) and vehicle ids of the confirmed bookings from
+        `first_day` to `last_day` inclusive, sorted by time.
+
+        Days missing from the cache (or past their TTL) are fetched with a single
+        `load(first, last)` call spanning all of them.
+        """
+        days = day_range(first_day, last_day)
+        now = time.monotonic()
+        with self._lock:
+            missing = [day for day in days if not self._fresh(day, now)]
+            if not missing:
+                self.hits += 1
+                for day in days:
+                    self._days.move_to_end(day)
+                return self._concatenate([self._days[day] for day in days])
+            self.misses += 1
+            writes_before = self._writes
+            held = {day: self._days[day] for day in days if day not in missing}
+
+        loaded = {day: CachedDay(now, []) for day in day_range(missing[0], missing[-1])}
+        for entry in sorted(load(missing[0], missing[-1])):
+            loaded[entry[0].date()].entries.append(entry)
+
+        with self._lock:
+            # A booking made or cancelled while we were loading may or may not be in
+            # what we read, so only keep the result if nothing was written meanwhile
+            if self._writes == writes_before:
+                for day, cached in loaded.items():
+                    self._days[day] = cached
+                    self._days.move_to_end(day)
+                self.days_loaded += len(loaded)
+                while len(self._days) > self.max_days:
+                    self._days.popitem(last=False)
+            return self._concatenate([loaded[day] if day in loaded else held[day] for day in days])
+
+    def _fresh(self, day: date, now: float) -> bool:
+        cached = self._days.get(day)
+        return cached is not None and now - cached.loaded_at < self.ttl_seconds
+
+    @staticmethod
+    def _concatenate(days: List[CachedDay]) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = [day.arrays() for day in days]
+        return np.concatenate([a[0] for a in arrays]), np.concatenate([a[1] for a in arrays])
+
+    def add(self, booking_date: datetime, booking_id: int, vehicle_id: Optional[str]):
+        """Write-through for a new confirmed booking."""
+        with self._lock:
+            self._writes += 1
+            self.write_throughs += 1
+            cached = self._days.get(booking_date.date())
+            if cached is not None:
+                cached.add((booking_date, booking_id, vehicle_id))
+
+    def remove(self, booking_date: datetime, booking_id: int):
+        """Write-through for a booking that is no longer confirmed."""
+        with self._lock:
+            self._writes += 1
+            self.write_throughs += 1
+            cached = self._days.get(booking_date.date())
+            if cached is not None:
+                cached.remove(booking_date, booking_id)
+
+    def clear(self):
+        with self._lock:
+            self._writes += 1
+            self._days.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "cached_days": len(self._days),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "days_loaded": self.days_loaded,
+                "write_throughs": self.write_throughs
+            }
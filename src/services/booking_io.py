@@ -0,0 +1,125 @@
+"""Bulk booking import and export (CSV or JSON Lines).
+
+    python -m src.services.booking_io import walk_ins.csv
+    python -m src.services.booking_io export schedule.jsonl --start 2025-06-07 --end 2025-06-08
+
+The format follows the file extension. Imports are streamed into
+BookingService.create_bookings, one transaction for the whole file; exports
+stream out of BookingService.iter_bookings without loading the table.
+"""
+from src.services.booking_service import REQUIRED_BOOKING_FIELDS, BookingService, InvalidBookingError
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Optional, TextIO
+import argparse
+import csv
+import json
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FIELDS = ["id", "customer_name", "customer_phone", "vehicle_id", "vehicle_name",
+                 "booking_date", "created_at", "status"]
+# An export imports back as new bookings: everything but the id is kept
+IMPORT_FIELDS = ["customer_name", "customer_phone", "vehicle_id", "vehicle_name", "booking_date", "created_at", "status"]
+
+
+class BookingFormatError(ValueError):
+    """A row in an import file is missing a required field or has an unreadable date."""
+
+
+def file_format(path: str) -> str:
+    return "jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def parse_row(raw: Dict, line: int) -> Dict:
+    """A booking row for create_bookings from one record of an import file."""
+    missing = [field for field in REQUIRED_BOOKING_FIELDS if not raw.get(field)]
+    if missing:
+        raise BookingFormatError(f"Line {line}: missing {', '.join(missing)}")
+    row = {field: raw.get(field) or None for field in IMPORT_FIELDS}
+    for field in ("booking_date", "created_at"):
+        if row[field] is not None:
+            try:
+                row[field] = datetime.fromisoformat(str(row[field]))
+            except ValueError:
+                raise BookingFormatError(f"Line {line}: unreadable {field} '{row[field]}'")
+    row["status"] = row["status"] or "confirmed"
+    return row
+
+
+def read_bookings(source: TextIO, fmt: str) -> Iterator[Dict]:
+    """Booking rows from an open CSV (with a header) or JSON Lines file, one at a time."""
+    if fmt == "jsonl":
+        for line, text in enumerate(source, start=1):
+            if text.strip():
+                try:
+                    raw = json.loads(text)
+                except ValueError:
+                    raise BookingFormatError(f"Line {line}: not a JSON object")
+                yield parse_row(raw, line)
+    else:
+        # Line 1 is the header
+        for line, raw in enumerate(csv.DictReader(source), start=2):
+            yield parse_row(raw, line)
+
+
+def write_bookings(rows: Iterable[Dict], target: TextIO, fmt: str) -> int:
+    """Writes rows as they come; returns how many were written."""
+    count = 0
+    if fmt == "jsonl":
+        for row in rows:
+            target.write(json.dumps(row, default=datetime.isoformat) + "\n")
+            count += 1
+    else:
+        writer = csv.DictWriter(target, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({field: value.isoformat(sep=" ") if isinstance(value, datetime) else value
+                             for field, value in row.items()})
+            count += 1
+    return count
+
+
+def import_file(service: BookingService, path: str) -> int:
+    with open(path, newline="", encoding="utf-8") as source:
+        return service.create_bookings(read_bookings(source, file_format(path)))
+
+
+def export_file(service: BookingService, path: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                status: Optional[str] = None) -> int:
+    rows = service.iter_bookings(start, end, status)
+    if path == "-":
+        return write_bookings(rows, sys.stdout, "csv")
+    with open(path, "w", newline="", encoding="utf-8") as target:
+        return write_bookings(rows, target, file_format(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.services.booking_io", description=__doc__.splitlines()[0])
+    parser.add_argument("--database", help="database URL (defaults to DATABASE_URL)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    load = commands.add_parser("import", help="add every booking in a .csv or .jsonl file, all or nothing")
+    load.add_argument("path")
+    dump = commands.add_parser("export", help="write bookings to a .csv or .jsonl file ('-' for CSV on stdout)")
+    dump.add_argument("path")
+    dump.add_argument("--start", type=datetime.fromisoformat, help="first booking_date included (ISO date/time)")
+    dump.add_argument("--end", type=datetime.fromisoformat, help="booking_date to stop before (ISO date/time)")
+    dump.add_argument("--status", help="only bookings with this status, e.g. confirmed")
+    args = parser.parse_args(argv)
+
+    service = BookingService(args.database)
+    if args.command == "import":
+        try:
+            count = import_file(service, args.path)
+        except (BookingFormatError, InvalidBookingError) as e:
+            parser.exit(1, f"Nothing imported: {e}\n")
+        logger.info(f"Imported {count} bookings from {args.path}")
+    else:
+        count = export_file(service, args.path, args.start, args.end, args.status)
+        logger.info(f"Exported {count} bookings to {args.path}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+    main()
@@ -0,0 +1,55 @@
+"""Versioned, in-place upgrades of the bookings database.
+
+Each migration is a version number and the statements that take the schema from
+the previous version to it. `migrate` applies the ones newer than the version
+stored in the `schema_version` table, each in its own transaction together with
+its version bump, so an interrupted upgrade picks up where it stopped.
+
+A fresh database is created by create_all at the latest schema and then runs
+every migration, so statements have to be no-ops there (IF NOT EXISTS).
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from typing import List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS: List[Tuple[int, str, List[str]]] = [
+    (1, "Index bookings by (status, booking_date) and by vehicle_id", [
+        "CREATE INDEX IF NOT EXISTS ix_bookings_status_booking_date ON bookings (status, booking_date)",
+        "CREATE INDEX IF NOT EXISTS ix_bookings_vehicle_id ON bookings (vehicle_id)",
+    ]),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(connection: Connection) -> int:
+    connection.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+    version = connection.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+    if version is None:
+        connection.execute(text("INSERT INTO schema_version (version) VALUES (0)"))
+        return 0
+    return version
+
+
+def migrate(engine: Engine) -> int:
+    """Brings the database up to LATEST_VERSION; returns the version it's at."""
+    with engine.begin() as connection:
+        version = current_version(connection)
+
+    for target, description, statements in MIGRATIONS:
+        if target <= version:
+            continue
+        with engine.begin() as connection:
+            # Re-read inside the transaction in case another process got here first
+            if current_version(connection) >= target:
+                version = target
+                continue
+            logger.info(f"Migrating bookings database to version {target}: {description}")
+            for statement in statements:
+                connection.execute(text(statement))
+            connection.execute(text("UPDATE schema_version SET version = :version"), {"version": target})
+        version = target
+
+    return version
@@ -1,15 +1,51 @@
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-from sqlalchemy import create_engine, Column, Integer, String, DateTime
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+from sqlalchemy import bindparam, create_engine, event, func, insert, select, Column, Index, Integer, String, DateTime
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from src.services.availability_cache import AvailabilityCache
+from src.services.booking_migrations import migrate
+from src.services.occupancy import OccupancyMap
+from src.services.slot_engine import SlotEngine
+from src.services.slot_holds import SlotHolds
 from config.settings import settings
+from itertools import islice
 import logging
+import threading
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+# Slot rules for services built without a knowledge base
+DEFAULT_SLOT_ENGINE = SlotEngine()
+# Free slots offered when a booking loses its slot
+ALTERNATIVES_OFFERED = 3
+BOOKING_STATUSES = ("confirmed", "cancelled")
+# Fields a bulk-created booking can't do without
+REQUIRED_BOOKING_FIELDS = ("customer_name", "vehicle_id", "booking_date")
+
+
+class SlotUnavailableError(Exception):
+    """The slot was taken (or held by another caller) by the time the booking was saved."""
+    
+    def __init__(self, slot: datetime, alternatives: List[datetime]):
+        super().__init__(f"Slot {slot} is no longer available")
+        self.slot = slot
+        self.alternatives = alternatives
+
+
+class InvalidBookingError(ValueError):
+    """A row given to create_bookings is missing a required field or has a bad value."""
+    
+    def __init__(self, index: int, problem: str):
+        super().__init__(f"Row {index}: {problem}")
+        self.index = index
+
 
 class Booking(Base):
     __tablename__ = 'bookings'
@@ -22,100 +58,427 @@ class Booking(Base):
     booking_date = Column(DateTime)
     created_at = Column(DateTime, default=datetime.now)
     status = Column(String, default='confirmed')
+    
+    # Availability checks filter on status and a booking_date range. Existing
+    # databases get these from booking_migrations, so keep the names in step
+    __table_args__ = (
+        Index('ix_bookings_status_booking_date', 'status', 'booking_date'),
+        Index('ix_bookings_vehicle_id', 'vehicle_id'),
+    )
+
+
+def conditional_insert(by_vehicle: bool):
+    """INSERT ... SELECT of one booking that only adds it while fewer than
+    :clash_limit confirmed bookings (of :clash_vehicle, if `by_vehicle`) start
+    inside (:clash_low, :clash_high).
+    
+    Checking and inserting in one statement makes it atomic: SQLite takes the
+    write lock before the statement reads, so a concurrent booking either
+    committed first and is counted, or waits for this one.
+    """
+    table = Booking.__table__
+    names = ["customer_name", "customer_phone", "vehicle_id", "vehicle_name", "booking_date", "created_at", "status"]
+    clashes = select(func.count()).select_from(Booking).where(
+        Booking.status == 'confirmed',
+        Booking.booking_date > bindparam("clash_low"),
+        Booking.booking_date < bindparam("clash_high"),
+        *([Booking.vehicle_id == bindparam("clash_vehicle")] if by_vehicle else [])
+    ).scalar_subquery()
+    row = select(*[bindparam(name, type_=table.c[name].type) for name in names]).where(clashes < bindparam("clash_limit"))
+    # On the Table rather than the mapped class, which would take a parameter dict as a bulk insert
+    return insert(table).from_select(names, row).returning(table.c.id)
+
+
+# Built once; keyed by whether clashes are counted per vehicle
+CONDITIONAL_INSERTS = {by_vehicle: conditional_insert(by_vehicle) for by_vehicle in (False, True)}
+
+
+def create_booking_engine(url: Optional[str] = None) -> Engine:
+    """Engine with a pool sized for concurrent callers; SQLite is put in WAL mode.
+
+    WAL lets readers carry on while a booking is being written, busy_timeout makes
+    a second writer wait for the lock instead of failing at once, and
+    synchronous=NORMAL is durable in WAL mode while skipping a sync per commit.
+    """
+    url = url or settings.DATABASE_URL
+    is_sqlite = url.startswith("sqlite")
+    engine = create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        # Pooled connections move between threads; each is only used by one at a time
+        connect_args={"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000} if is_sqlite else {}
+    )
+    
+    if is_sqlite:
+        @event.listens_for(engine, "connect")
+        def configure_sqlite(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+            cursor.close()
+    
+    return engine
 
 
 class BookingService:
+    """Booking storage shared by every session.
+    
+    Nothing here holds a long-lived Session: each public method is one unit of
+    work on the calling thread's session (see `unit_of_work`), so concurrent
+    callers get their own connection from the pool.
+    
+    Slot rules come from `slot_rules`, called on every availability question
+    so that knowledge base reloads apply straight away.
     
-    def __init__(self):
-        self.engine = create_engine(settings.DATABASE_URL)
+    A caller who has been told a slot is free holds it (`hold_slot`) until they
+    book or the hold expires, and everyone else sees it as taken. The booking
+    itself is a conditional insert that only goes through if the slot is still
+    free, so two callers can never both get it.
+    """
+    
+    def __init__(self, database_url: Optional[str] = None, slot_rules: Optional[Callable[[], SlotEngine]] = None):
+        self.engine = create_booking_engine(database_url)
         Base.metadata.create_all(self.engine)
-        Session = sessionmaker(bind=self.engine)
-        self.session = Session()
+        self.schema_version = migrate(self.engine)
+        # Loaded attributes stay readable after commit, so returned bookings can be
+        # used once their session is gone
+        self.Session = scoped_session(sessionmaker(bind=self.engine, expire_on_commit=False))
+        self._depth = threading.local()
+        self._slot_rules = slot_rules or (lambda: DEFAULT_SLOT_ENGINE)
+        self.availability_cache = AvailabilityCache(
+            settings.AVAILABILITY_CACHE_TTL_SECONDS,
+            settings.AVAILABILITY_CACHE_MAX_DAYS
+        ) if settings.AVAILABILITY_CACHE_ENABLED else None
+        self.slot_holds = SlotHolds(settings.SLOT_HOLD_SECONDS)
         logger.info("Booking service initialized")
     
+    @contextmanager
+    def unit_of_work(self) -> Iterator[Session]:
+        """The thread's session for one unit of work: committed on success, rolled back on error.
+        
+        Nested units join the outermost one, which is the only one that commits
+        and releases the session.
+        """
+        session = self.Session()
+        depth = getattr(self._depth, "value", 0)
+        self._depth.value = depth + 1
+        try:
+            yield session
+            if depth == 0:
+                session.commit()
+                for callback in session.info.pop("after_commit", []):
+                    callback()
+        except Exception:
+            if depth == 0:
+                session.info.pop("after_commit", None)
+                session.rollback()
+            raise
+        finally:
+            self._depth.value = depth
+            if depth == 0:
+                self.Session.remove()
+    
+    @property
+    def slot_engine(self) -> SlotEngine:
+        return self._slot_rules()
+    
+    @staticmethod
+    def after_commit(session: Session, callback: Callable[[], None]):
+        """Run `callback` once the unit of work holding `session` commits; dropped on rollback."""
+        session.info.setdefault("after_commit", []).append(callback)
+    
     def create_booking(
         self,
         customer_name: str,
         customer_phone: str,
         vehicle_id: str,
         vehicle_name: str,
-        booking_date: datetime
+        booking_date: datetime,
+        holder: Optional[str] = None
     ) -> Booking:
+        """Books the slot if it's still free, else raises SlotUnavailableError.
+        
+        `holder` is the caller's hold on the slot, if any; it's released once
+        the booking is saved. Other callers' holds count as taken.
+        """
         try:
-            booking = Booking(
-                customer_name=customer_name,
-                customer_phone=customer_phone,
-                vehicle_id=vehicle_id,
-                vehicle_name=vehicle_name,
-                booking_date=booking_date
-            )
+            engine = self.slot_engine
+            if not engine.is_bookable(booking_date):
+                raise SlotUnavailableError(booking_date, self._alternatives(booking_date, vehicle_id, holder))
             
-            self.session.add(booking)
-            self.session.commit()
+            capacity = engine.capacity if vehicle_id is not None else 1
+            held = len(self.slot_holds.times(booking_date - engine.window, booking_date + engine.window,
+                                             vehicle_id, exclude=holder))
+            values = {
+                "customer_name": customer_name,
+                "customer_phone": customer_phone,
+                "vehicle_id": vehicle_id,
+                "vehicle_name": vehicle_name,
+                "booking_date": booking_date,
+                "created_at": datetime.now(),
+                "status": "confirmed"
+            }
             
+            with self.unit_of_work() as session:
+                booking_id = self._insert_if_free(session, values, engine.window, capacity - held)
+                # Built from what was inserted rather than read back
+                booking = Booking(id=booking_id, **values) if booking_id is not None else None
+                if booking is not None and self.availability_cache is not None:
+                    self.after_commit(session, lambda: self.availability_cache.add(booking.booking_date, booking.id,
+                                                                               booking.vehicle_id))
+            
+            if booking is None:
+                # Outside the unit of work, so the write lock isn't held while we look
+                raise SlotUnavailableError(booking_date, self._alternatives(booking_date, vehicle_id, holder))
+            if holder is not None:
+                self.slot_holds.release(holder, converted=True)
             logger.info(f"Booking created: {booking.id} for {customer_name}")
             return booking
             
+        except SlotUnavailableError:
+            logger.info(f"Slot {booking_date} for {vehicle_id} was taken before {customer_name} could book it")
+            raise
         except Exception as e:
-            self.session.rollback()
             logger.error(f"Error creating booking: {str(e)}")
             raise
     
+    def create_bookings(self, rows: Iterable[Dict], batch_size: Optional[int] = None) -> int:
+        """Inserts every row (Booking column names) in one transaction, all or nothing;
+        returns how many.
+        
+        For bookings already confirmed elsewhere, like walk-ins from the showroom
+        system, so rows go in as they are without a slot check. `rows` is consumed
+        `batch_size` at a time, each batch one executemany.
+        
+        Every row is checked before it's inserted; the first bad one raises
+        InvalidBookingError (with its 0-based index) and nothing is saved.
+        """
+        batch_size = batch_size or settings.BULK_INSERT_BATCH_SIZE
+        table = Booking.__table__
+        now = datetime.now()
+        rows = enumerate(rows)
+        count = 0
+        with self.unit_of_work() as session:
+            connection = session.connection()
+            while True:
+                batch = [self._bulk_values(index, row, now) for index, row in islice(rows, batch_size)]
+                if not batch:
+                    break
+                connection.execute(insert(table), batch)
+                count += len(batch)
+            # Too many days touched to patch one by one
+            if count and self.availability_cache is not None:
+                self.after_commit(session, self.availability_cache.clear)
+        
+        logger.info(f"Bulk inserted {count} bookings")
+        return count
+    
+    @staticmethod
+    def _bulk_values(index: int, row: Dict, now: datetime) -> Dict:
+        """The column values for one create_bookings row, or InvalidBookingError."""
+        missing = [field for field in REQUIRED_BOOKING_FIELDS if not row.get(field)]
+        if missing:
+            raise InvalidBookingError(index, f"missing {', '.join(missing)}")
+        values = {
+            "customer_name": row.get("customer_name"),
+            "customer_phone": row.get("customer_phone"),
+            "vehicle_id": row.get("vehicle_id"),
+            "vehicle_name": row.get("vehicle_name"),
+            "booking_date": row["booking_date"],
+            "created_at": row.get("created_at") or now,
+            "status": row.get("status") or "confirmed"
+        }
+        for field in ("customer_name", "customer_phone", "vehicle_id", "vehicle_name"):
+            if values[field] is not None and not isinstance(values[field], str):
+                raise InvalidBookingError(index, f"{field} must be a string, not {type(values[field]).__name__}")
+        for field in ("booking_date", "created_at"):
+            if not isinstance(values[field], datetime):
+                raise InvalidBookingError(index, f"{field} must be a datetime, not {type(values[field]).__name__}")
+        if values["status"] not in BOOKING_STATUSES:
+            raise InvalidBookingError(index, f"unknown status '{values['status']}'")
+        return values
+    
+    def iter_bookings(self,
+                      start: Optional[datetime] = None,
+                      end: Optional[datetime] = None,
+                      status: Optional[str] = None) -> Iterator[Dict]:
+        """Bookings with booking_date in [start, end), ordered by it, as dicts.
+        
+        Rows are streamed `EXPORT_FETCH_SIZE` at a time on a connection of their
+        own, so the table is never loaded whole and the caller's unit of work
+        isn't held open between rows.
+        """
+        table = Booking.__table__
+        query = select(table).order_by(table.c.booking_date, table.c.id)
+        if start is not None:
+            query = query.where(table.c.booking_date >= start)
+        if end is not None:
+            query = query.where(table.c.booking_date < end)
+        if status is not None:
+            query = query.where(table.c.status == status)
+        
+        with self.engine.connect() as connection:
+            result = connection.execution_options(yield_per=settings.EXPORT_FETCH_SIZE).execute(query)
+            for row in result:
+                yield dict(row._mapping)
+    
+    @staticmethod
+    def _insert_if_free(session: Session, values: Dict, window: timedelta, limit: int) -> Optional[int]:
+        """Adds the row only while fewer than `limit` confirmed bookings clash with
+        it; the new id, or None if it wasn't added (see `conditional_insert`)."""
+        slot, vehicle_id = values["booking_date"], values["vehicle_id"]
+        statement = CONDITIONAL_INSERTS[vehicle_id is not None]
+        return session.execute(statement, {**values, "clash_low": slot - window, "clash_high": slot + window,
+                                           "clash_vehicle": vehicle_id, "clash_limit": limit}).scalar()
+    
+    def _alternatives(self, slot: datetime, vehicle_id: Optional[str], holder: Optional[str]) -> List[datetime]:
+        start_of_day = slot.replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.find_available_slots(max(start_of_day, datetime.now()), 1, limit=ALTERNATIVES_OFFERED,
+                                         vehicle_id=vehicle_id, holder=holder)
+    
+    def hold_slot(self, slot: datetime, vehicle_id: Optional[str], holder: str) -> bool:
+        """Holds the slot for `holder` if it's free (their own hold aside); False if not.
+        
+        Either way the holder's earlier hold goes: they've asked for another time,
+        so the one they held is no longer kept from everyone else.
+        """
+        engine = self.slot_engine
+        with self.slot_holds.lock:
+            if not engine.is_bookable(slot) or \
+                    not self.get_occupancy(slot, slot, vehicle_id, engine, holder).is_free(slot):
+                self.slot_holds.refused += 1
+                self.slot_holds.release(holder)
+                return False
+            self.slot_holds.place(holder, slot, vehicle_id)
+        return True
+    
+    def release_hold(self, holder: str):
+        self.slot_holds.release(holder)
+    
     def get_bookings_by_date(self, date: datetime) -> List[Booking]:
         start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
         end_of_day = start_of_day + timedelta(days=1)
         
-        bookings = self.session.query(Booking).filter(
-            Booking.booking_date >= start_of_day,
-            Booking.booking_date < end_of_day,
-            Booking.status == 'confirmed'
-        ).all()
+        with self.unit_of_work() as session:
+            bookings = session.query(Booking).filter(
+                Booking.booking_date >= start_of_day,
+                Booking.booking_date < end_of_day,
+                Booking.status == 'confirmed'
+            ).all()
         
         return bookings
     
-    def is_slot_available(self, booking_date: datetime) -> bool:
-        hour = booking_date.hour
-        if hour < 9 or hour >= 18:
+    def is_slot_available(self,
+                          booking_date: datetime,
+                          vehicle_id: Optional[str] = None,
+                          holder: Optional[str] = None) -> bool:
+        engine = self.slot_engine
+        if not engine.is_bookable(booking_date):
             return False
         
-        buffer = timedelta(minutes=15)
-        start_window = booking_date - buffer
-        end_window = booking_date + buffer
+        return self.get_occupancy(booking_date, booking_date, vehicle_id, engine, holder).is_free(booking_date)
+    
+    def get_occupancy(self,
+                      start: datetime,
+                      end: datetime,
+                      vehicle_id: Optional[str] = None,
+                      engine: Optional[SlotEngine] = None,
+                      holder: Optional[str] = None) -> OccupancyMap:
+        """Every confirmed booking and hold (other than `holder`'s) that can clash
+        with a slot in [start, end).
         
-        conflicting_bookings = self.session.query(Booking).filter(
-            Booking.booking_date >= start_window,
-            Booking.booking_date <= end_window,
-            Booking.status == 'confirmed'
-        ).count()
+        With a vehicle, only its bookings count, against its capacity. Without
+        one every booking counts and any of them takes the slot.
         
-        return conflicting_bookings == 0
+        Bookings are served from the availability cache when it holds those days,
+        otherwise from one range query.
+        """
+        engine = engine or self.slot_engine
+        low, high = start - engine.window, end + engine.window
+        if self.availability_cache is not None:
+            times, vehicles = self.availability_cache.bookings(low.date(), high.date(), self._load_confirmed)
+        else:
+            entries = self._confirmed_between(low, high + timedelta(seconds=1), vehicle_id)
+            times = np.array([entry[0] for entry in entries], dtype="datetime64[s]")
+            vehicles = np.array([entry[2] for entry in entries], dtype=object)
+        
+        held = np.array(self.slot_holds.times(low, high, vehicle_id, exclude=holder), dtype="datetime64[s]")
+        if vehicle_id is None:
+            return OccupancyMap(start, end, np.concatenate([times, held]), engine.window)
+        return OccupancyMap(start, end, np.concatenate([times[vehicles == vehicle_id], held]),
+                            engine.window, engine.capacity)
+    
+    def _load_confirmed(self, first_day: date, last_day: date) -> List[Tuple[datetime, int, Optional[str]]]:
+        """(booking_date, id, vehicle_id) of the confirmed bookings on `first_day` through `last_day`."""
+        return self._confirmed_between(datetime.combine(first_day, datetime.min.time()),
+                                       datetime.combine(last_day + timedelta(days=1), datetime.min.time()))
     
-    def get_available_slots(self, date: datetime, available_hours: List[str]) -> List[str]:
-        available_slots = []
+    def _confirmed_between(self,
+                           low: datetime,
+                           high: datetime,
+                           vehicle_id: Optional[str] = None) -> List[Tuple[datetime, int, Optional[str]]]:
+        with self.unit_of_work() as session:
+            query = session.query(Booking.booking_date, Booking.id, Booking.vehicle_id).filter(
+                Booking.status == 'confirmed',
+                Booking.booking_date >= low,
+                Booking.booking_date < high
+            )
+            if vehicle_id is not None:
+                query = query.filter(Booking.vehicle_id == vehicle_id)
+            rows = query.all()
         
-        for hour_str in available_hours:
-            hour, minute = map(int, hour_str.split(':'))
-            slot_time = date.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            
-            if self.is_slot_available(slot_time):
-                available_slots.append(hour_str)
+        return [(row[0], row[1], row[2]) for row in rows]
+    
+    def get_available_slots(self,
+                            date: datetime,
+                            available_hours: Optional[List[str]] = None,
+                            vehicle_id: Optional[str] = None,
+                            holder: Optional[str] = None) -> List[str]:
+        """Free offered slots on `date` as "HH:MM", from the slot rules' hours unless `available_hours` is given."""
+        return [slot.strftime("%H:%M") for slot in
+                self.find_available_slots(date.replace(hour=0, minute=0, second=0, microsecond=0), 1,
+                                          available_hours, vehicle_id=vehicle_id, holder=holder)]
+    
+    def find_available_slots(self,
+                             start: datetime,
+                             days: int,
+                             available_hours: Optional[List[str]] = None,
+                             limit: Optional[int] = None,
+                             vehicle_id: Optional[str] = None,
+                             holder: Optional[str] = None) -> List[datetime]:
+        """Free slots at or after `start` over the next `days` days, earliest first.
         
-        return available_slots
+        Candidates for the whole range come from the slot engine in one go and are
+        checked against one load of the bookings, so "the next opening this week"
+        costs the same as checking a single day.
+        """
+        engine = self.slot_engine
+        start_of_day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        candidates = engine.candidates(start, days, available_hours)
+        occupancy = self.get_occupancy(start_of_day, start_of_day + timedelta(days=days), vehicle_id, engine, holder)
+        
+        free = candidates[occupancy.free_mask(candidates)]
+        return (free[:limit] if limit is not None else free).tolist()
     
     def cancel_booking(self, booking_id: int) -> bool:
         try:
-            booking = self.session.query(Booking).filter_by(id=booking_id).first()
+            with self.unit_of_work() as session:
+                booking = session.query(Booking).filter_by(id=booking_id).first()
+                if booking:
+                    if booking.status == 'confirmed' and self.availability_cache is not None:
+                        self.after_commit(session, lambda: self.availability_cache.remove(booking.booking_date, booking.id))
+                    booking.status = 'cancelled'
             
             if booking:
-                booking.status = 'cancelled'
-                self.session.commit()
                 logger.info(f"Booking {booking_id} cancelled")
                 return True
             
             return False
             
         except Exception as e:
-            self.session.rollback()
             logger.error(f"Error cancelling booking: {str(e)}")
             return False
     
@@ -128,3 +491,11 @@ class BookingService:
         summary += f"Booking reference: {booking.id}"
         
         return summary
+    
+    def get_availability_stats(self) -> Dict:
+        if self.availability_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.availability_cache.get_stats()}
+    
+    def get_hold_stats(self) -> Dict:
+        return self.slot_holds.get_stats()
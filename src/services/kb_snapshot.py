@@ -0,0 +1,274 @@
+"""Compiled, memory-mappable form of knowledge_base.json.
+
+Parsing a large inventory with json.load means building every vehicle dict
+up front. A snapshot instead stores vehicles column by column: numeric fields
+as plain .npy arrays (memory-mapped on load), string fields and string lists
+(features, colors) as int32 codes into one interned string table. Loading
+costs one split of the string table; a vehicle dict is only built the first
+time something reads that row, and the catalog indexes read columns directly.
+
+Build it with:  python -m src.services.kb_snapshot [knowledge_base.json] [snapshot_dir]
+"""
+from collections.abc import Sequence
+from pathlib import Path
+from config.settings import settings
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+STRING_FIELDS = ("id", "make", "model", "variant", "category", "fuel_type", "transmission")
+NUMERIC_FIELDS = ("year", "price", "range_miles")
+BOOL_FIELDS = ("available",)
+LIST_FIELDS = ("features", "colors")
+SEPARATOR = "\x00"
+INT64_RANGE = (-2 ** 63, 2 ** 63 - 1)
+
+_MISSING = object()
+
+
+def column(vehicles, field: str, default: Any = None) -> List:
+    """One field of every vehicle as a list, without building rows for a VehicleTable."""
+    if isinstance(vehicles, VehicleTable):
+        return vehicles.column(field, default)
+    return [vehicle.get(field, default) for vehicle in vehicles]
+
+
+class VehicleTable(Sequence):
+    """Read-only list of vehicle dicts backed by snapshot columns.
+
+    Rows are built on first access and then reused, so the same index returns
+    the same dict, like a list from json.load would.
+    """
+
+    def __init__(self, rows: int, strings: List[str], arrays: Dict[str, np.ndarray],
+                 fields: Dict[str, str], extras: Dict[int, Dict]):
+        self._rows = rows
+        self._strings = strings
+        self._arrays = arrays
+        self._fields = fields  # field -> "string" | "int" | "float" | "bool" | "list", in original key order
+        self._extras = extras
+        self._cache: List[Optional[Dict]] = [None] * rows
+        self._columns: Dict[str, List] = {}
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._rows))]
+        if index < 0:
+            index += self._rows
+        if not 0 <= index < self._rows:
+            raise IndexError("vehicle index out of range")
+        row = self._cache[index]
+        if row is None:
+            row = self._build_row(index)
+            self._cache[index] = row
+        return row
+
+    def _build_row(self, index: int) -> Dict:
+        # Straight from the arrays, so reading a few rows never decodes whole columns
+        row = {}
+        arrays = self._arrays
+        strings = self._strings
+        for field, kind in self._fields.items():
+            present = arrays.get(f"{field}.present")
+            if present is not None and not present[index]:
+                continue
+            if kind == "string":
+                code = int(arrays[field][index])
+                if code >= 0:
+                    row[field] = strings[code]
+            elif kind == "list":
+                offsets = arrays[f"{field}.offsets"]
+                codes = arrays[f"{field}.codes"][int(offsets[index]):int(offsets[index + 1])]
+                row[field] = [strings[code] for code in codes.tolist()]
+            else:
+                row[field] = arrays[field][index].item()
+        row.update(self._extras.get(index, {}))
+        return row
+
+    def column(self, field: str, default: Any = None) -> List:
+        # A field is either a column or, for every row that has it, kept in extras
+        if field not in self._fields:
+            return [self._extras.get(i, {}).get(field, default) for i in range(self._rows)]
+        values = self._decoded(field)
+        if f"{field}.present" not in self._arrays:
+            return values  # shared with the table; callers only read it
+        return [default if value is _MISSING else value for value in values]
+
+    def _decoded(self, field: str) -> List:
+        """The field as Python values, _MISSING where the row didn't have it; decoded once."""
+        values = self._columns.get(field)
+        if values is not None:
+            return values
+
+        kind = self._fields[field]
+        arrays = self._arrays
+        if kind == "string":
+            strings = self._strings
+            values = [strings[code] if code >= 0 else _MISSING for code in arrays[field].tolist()]
+        elif kind == "list":
+            strings = self._strings
+            codes = [strings[code] for code in arrays[f"{field}.codes"].tolist()]
+            offsets = arrays[f"{field}.offsets"].tolist()
+            values = [codes[start:end] for start, end in zip(offsets, offsets[1:])]
+        else:
+            values = arrays[field].tolist()
+            if kind == "bool":
+                values = [bool(value) for value in values]
+        present = arrays.get(f"{field}.present")
+        if present is not None:
+            values = [value if flag else _MISSING for value, flag in zip(values, present.tolist())]
+        self._columns[field] = values
+        return values
+
+
+def compile_snapshot(json_path: str, snapshot_dir: str) -> Path:
+    """Compiles the knowledge base JSON into `snapshot_dir`, replacing any previous snapshot."""
+    source = Path(json_path)
+    # Stat before reading: an edit racing the compile then shows up as stale
+    stat = source.stat()
+    raw = source.read_bytes()
+    data = json.loads(raw)
+    vehicles = data.get('vehicles', [])
+
+    strings: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if SEPARATOR in value:
+            raise ValueError(f"Strings containing NUL can't be stored in a snapshot: {value!r}")
+        return strings.setdefault(value, len(strings))
+
+    fields: Dict[str, str] = {}
+    for vehicle in vehicles:
+        for field in vehicle:
+            fields.setdefault(field, "")
+
+    # A field gets a column if every present value fits its type; anything else
+    # (unknown fields, odd values) is kept per row as JSON in `extras`
+    extras: Dict[int, Dict] = {}
+    arrays: Dict[str, np.ndarray] = {}
+    for field in list(fields):
+        values = [vehicle.get(field, _MISSING) for vehicle in vehicles]
+        present = [value is not _MISSING for value in values]
+        kind = _column_kind(field, [value for value in values if value is not _MISSING])
+        if kind is None:
+            del fields[field]
+            for i, value in enumerate(values):
+                if value is not _MISSING:
+                    extras.setdefault(i, {})[field] = value
+            continue
+        fields[field] = kind
+
+        if kind == "string":
+            arrays[field] = np.array([intern(v) if v is not _MISSING else -1 for v in values], dtype=np.int32)
+        elif kind == "list":
+            lists = [v if v is not _MISSING else [] for v in values]
+            arrays[f"{field}.offsets"] = np.cumsum([0] + [len(v) for v in lists], dtype=np.int64)
+            arrays[f"{field}.codes"] = np.array([intern(s) for v in lists for s in v], dtype=np.int32)
+        else:
+            dtype = {"int": np.int64, "float": np.float64, "bool": np.bool_}[kind]
+            arrays[field] = np.array([v if v is not _MISSING else 0 for v in values], dtype=dtype)
+        if not all(present):
+            arrays[f"{field}.present"] = np.array(present, dtype=np.bool_)
+
+    target = Path(snapshot_dir)
+    tmp = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for name, array in arrays.items():
+        np.save(tmp / f"{name}.npy", array)
+    (tmp / "strings.bin").write_bytes(SEPARATOR.join(strings).encode("utf-8"))
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "source": {"size": len(raw), "mtime_ns": stat.st_mtime_ns,
+                   "sha256": hashlib.sha256(raw).hexdigest()},
+        "rows": len(vehicles),
+        "strings": len(strings),
+        "fields": fields,
+        "extras": {str(i): row for i, row in extras.items()},
+        "document": {key: value for key, value in data.items() if key != 'vehicles'},
+        "has_vehicles": 'vehicles' in data,
+    }
+    (tmp / "meta.json").write_text(json.dumps(meta))
+
+    # Swap the directory in; readers of the old one keep their mapped files
+    old = target.with_name(f"{target.name}.old-{os.getpid()}")
+    if target.exists():
+        target.rename(old)
+    tmp.rename(target)
+    shutil.rmtree(old, ignore_errors=True)
+
+    logger.info(f"Compiled knowledge base snapshot: {len(vehicles)} vehicles, {len(strings)} strings -> {target}")
+    return target
+
+
+def _column_kind(field: str, values: List) -> Optional[str]:
+    if field in STRING_FIELDS and all(isinstance(v, str) for v in values):
+        return "string"
+    if field in LIST_FIELDS and all(isinstance(v, list) and all(isinstance(s, str) for s in v) for v in values):
+        return "list"
+    if field in BOOL_FIELDS and all(isinstance(v, bool) for v in values):
+        return "bool"
+    if field in NUMERIC_FIELDS:
+        # Mixed ints and floats stay in extras so they round-trip exactly
+        if all(type(v) is int and INT64_RANGE[0] <= v <= INT64_RANGE[1] for v in values):
+            return "int"
+        if all(type(v) is float for v in values):
+            return "float"
+    return None
+
+
+def load_snapshot(snapshot_dir: str, json_path: str) -> Optional[Tuple[Dict, str]]:
+    """(knowledge base dict, source sha256) from the snapshot, or None if it's missing or stale.
+
+    The snapshot is current if the JSON it was compiled from has the same size
+    and mtime, or failing that the same content hash; with no JSON file at all,
+    the snapshot is used as is.
+    """
+    directory = Path(snapshot_dir)
+    try:
+        meta = json.loads((directory / "meta.json").read_text())
+    except FileNotFoundError:
+        return None
+    if meta.get("version") != SNAPSHOT_VERSION:
+        logger.info("Knowledge base snapshot has an old format, using the JSON")
+        return None
+
+    source = meta["source"]
+    try:
+        stat = os.stat(json_path)
+        if (stat.st_size, stat.st_mtime_ns) != (source["size"], source["mtime_ns"]):
+            with open(json_path, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() != source["sha256"]:
+                    logger.warning(f"Knowledge base snapshot {directory} is stale, using the JSON "
+                                   f"(rebuild it with: python -m src.services.kb_snapshot)")
+                    return None
+    except FileNotFoundError:
+        pass
+
+    strings = (directory / "strings.bin").read_bytes().decode("utf-8").split(SEPARATOR) if meta["strings"] else []
+    arrays = {path.name[:-len(".npy")]: np.load(path, mmap_mode="r") for path in directory.glob("*.npy")}
+    extras = {int(i): row for i, row in meta["extras"].items()}
+    vehicles = VehicleTable(meta["rows"], strings, arrays, meta["fields"], extras)
+
+    data = dict(meta["document"])
+    if meta["has_vehicles"]:
+        data['vehicles'] = vehicles
+    return data, source["sha256"]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    json_path = sys.argv[1] if len(sys.argv) > 1 else settings.KNOWLEDGE_BASE_PATH
+    snapshot_dir = sys.argv[2] if len(sys.argv) > 2 else settings.KNOWLEDGE_BASE_SNAPSHOT_PATH
+    compile_snapshot(json_path, snapshot_dir)
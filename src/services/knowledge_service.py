@@ -1,43 +1,178 @@
+from collections import OrderedDict
+import hashlib
 import json
-from typing import List, Dict, Optional
+import os
+import threading
+from typing import List, Dict, Optional, Tuple
+from src.services.kb_snapshot import load_snapshot
+from src.services.slot_engine import SlotEngine
+from src.services.vehicle_catalog import VehicleCatalog
+from src.services.vehicle_retriever import VehicleRetriever
 from config.settings import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class KnowledgeSnapshot:
+    """One loaded knowledge base and every index built from it.
+
+    Never modified after construction: a reload builds a whole new snapshot and
+    swaps it in, so a request that grabbed the old one keeps a consistent view.
+    `version` goes up by one per swap; caches derived from the catalog key on it.
+    """
+    
+    def __init__(self, data: Dict, fingerprint: str, aliases: Dict, version: int):
+        self.data = data
+        self.fingerprint = fingerprint
+        self.version = version
+        
+        vehicles = self.data.get('vehicles', [])
+        self.catalog = VehicleCatalog(vehicles, aliases)
+        self.retriever = VehicleRetriever.load_or_build(vehicles, settings.RETRIEVAL_INDEX_PATH,
+                                                        self.fingerprint, settings.RETRIEVAL_DIMENSIONS)
+        self.slot_engine = SlotEngine.from_knowledge_base(self.data)
+
+
 class KnowledgeService:
     
     def __init__(self):
-        self.knowledge_base = self._load_knowledge_base()
+        self._reload_lock = threading.Lock()
+        self._file_stat = self._stat()
+        self._snapshot = self._load_knowledge_base(version=1)
+        
+        # Formatted listings for repeated queries, dropped whenever the catalog version changes
+        self._listings: "OrderedDict[tuple, Tuple[List[Dict], str]]" = OrderedDict()
+        self._listings_version = None
+        self._listings_lock = threading.Lock()
+        self.listing_hits = 0
+        self.listing_misses = 0
         
-    def _load_knowledge_base(self) -> Dict:
+        self._stop_watching = threading.Event()
+        self._watcher = None
+        if settings.KNOWLEDGE_BASE_RELOAD_ENABLED:
+            self.start_watching()
+    
+    # Readers go through these, and methods that need more than one of them take
+    # a single snapshot first so a concurrent swap can't mix old and new data.
+    @property
+    def knowledge_base(self) -> Dict:
+        return self._snapshot.data
+    
+    @property
+    def catalog(self) -> VehicleCatalog:
+        return self._snapshot.catalog
+    
+    @property
+    def retriever(self) -> VehicleRetriever:
+        return self._snapshot.retriever
+    
+    @property
+    def slot_engine(self) -> SlotEngine:
+        return self._snapshot.slot_engine
+    
+    @property
+    def catalog_version(self) -> int:
+        return self._snapshot.version
+    
+    def _load_knowledge_base(self, version: int) -> KnowledgeSnapshot:
         try:
-            with open(settings.KNOWLEDGE_BASE_PATH, 'r') as f:
-                data = json.load(f)
-            logger.info("Knowledge base loaded successfully")
-            return data
+            data, fingerprint = self._read_knowledge_base()
+            snapshot = KnowledgeSnapshot(data, fingerprint, self._load_aliases(), version)
+            logger.info(f"Knowledge base loaded successfully (version {version})")
+            return snapshot
         except Exception as e:
             logger.error(f"Error loading knowledge base: {str(e)}")
             raise
     
+    def _read_knowledge_base(self, unless_fingerprint: Optional[str] = None) -> Optional[Tuple[Dict, str]]:
+        """(data, sha256 of the JSON), or None if the content's fingerprint is `unless_fingerprint`.
+        
+        Prefers the compiled snapshot (see kb_snapshot) when one is current for the JSON.
+        """
+        if settings.KNOWLEDGE_BASE_SNAPSHOT_PATH:
+            compiled = load_snapshot(settings.KNOWLEDGE_BASE_SNAPSHOT_PATH, settings.KNOWLEDGE_BASE_PATH)
+            if compiled is not None:
+                return None if compiled[1] == unless_fingerprint else compiled
+        
+        with open(settings.KNOWLEDGE_BASE_PATH, 'rb') as f:
+            raw = f.read()
+        fingerprint = hashlib.sha256(raw).hexdigest()
+        if fingerprint == unless_fingerprint:
+            return None
+        return json.loads(raw), fingerprint
+    
+    def _stat(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(settings.KNOWLEDGE_BASE_PATH)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def reload(self) -> bool:
+        """Re-reads the knowledge base and swaps it in if its content changed; returns whether it did.
+        
+        A file that fails to parse (e.g. caught half-written) leaves the current
+        snapshot in place; the next change to the file is tried again.
+        """
+        with self._reload_lock:
+            self._file_stat = self._stat()
+            current = self._snapshot
+            try:
+                loaded = self._read_knowledge_base(unless_fingerprint=current.fingerprint)
+                if loaded is None:
+                    return False
+                snapshot = KnowledgeSnapshot(*loaded, self._load_aliases(), current.version + 1)
+            except Exception as e:
+                logger.error(f"Knowledge base reload failed, keeping version {current.version}: {str(e)}")
+                return False
+            
+            self._snapshot = snapshot
+            logger.info(f"Knowledge base reloaded: version {snapshot.version}, "
+                        f"{len(snapshot.catalog)} vehicles")
+            return True
+    
+    def start_watching(self, interval: Optional[float] = None):
+        """Polls the knowledge base file in a daemon thread and reloads it when it changes."""
+        if self._watcher is not None:
+            return
+        interval = interval or settings.KNOWLEDGE_BASE_POLL_SECONDS
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,),
+                                         name="knowledge-base-watcher", daemon=True)
+        self._watcher.start()
+    
+    def stop_watching(self):
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+    
+    def _watch(self, interval: float):
+        while not self._stop_watching.wait(interval):
+            stat = self._stat()
+            if stat is not None and stat != self._file_stat:
+                self.reload()
+    
+    def _load_aliases(self) -> Dict:
+        """Spoken/slang names per field, e.g. {"make": {"chevy": "Chevrolet"}}; optional."""
+        try:
+            with open(settings.VEHICLE_ALIASES_PATH, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            logger.warning(f"No vehicle alias table at {settings.VEHICLE_ALIASES_PATH}")
+            return {}
+    
     def get_all_vehicles(self) -> List[Dict]:
         return self.knowledge_base.get('vehicles', [])
     
     def get_vehicles_by_category(self, category: str) -> List[Dict]:
-        category_lower = category.lower()
-        vehicles = [
-            v for v in self.get_all_vehicles()
-            if v.get('category', '').lower() == category_lower and v.get('available', False)
-        ]
+        vehicles = self.catalog.search(category=category)
         logger.info(f"Found {len(vehicles)} {category} vehicles")
         return vehicles
     
     def get_vehicle_by_id(self, vehicle_id: str) -> Optional[Dict]:
-        for vehicle in self.get_all_vehicles():
-            if vehicle.get('id') == vehicle_id:
-                return vehicle
-        return None
+        return self.catalog.get(vehicle_id)
     
     def search_vehicles(self, 
                         make: Optional[str] = None, 
@@ -45,41 +180,38 @@ class KnowledgeService:
                         category: Optional[str] = None,
                         max_price: Optional[float] = None) -> List[Dict]:
         
-        results = self.get_all_vehicles()
-        
-        if make:
-            results = [v for v in results if v.get('make', '').lower() == make.lower()]
-        
-        if model:
-            results = [v for v in results if v.get('model', '').lower() == model.lower()]
-        
-        if category:
-            results = [v for v in results if v.get('category', '').lower() == category.lower()]
+        catalog = self.catalog
+        results = catalog.search(make=make, model=model, category=category, max_price=max_price)
         
-        if max_price:
-            results = [v for v in results if v.get('price', float('inf')) <= max_price]
-        
-        results = [v for v in results if v.get('available', False)]
+        if not results and settings.FUZZY_VEHICLE_MATCHING and (make or model):
+            fuzzy_make = self._resolve_name(catalog, 'make', make)
+            fuzzy_model = self._resolve_name(catalog, 'model', model)
+            if (fuzzy_make, fuzzy_model) != (make, model):
+                logger.info(f"Fuzzy vehicle match: {make}/{model} -> {fuzzy_make}/{fuzzy_model}")
+                results = catalog.search(make=fuzzy_make, model=fuzzy_model, category=category, max_price=max_price)
         
         logger.info(f"Search returned {len(results)} vehicles")
         return results
     
+    def _resolve_name(self, catalog: VehicleCatalog, field: str, value: Optional[str]) -> Optional[str]:
+        if not value:
+            return value
+        resolved = catalog.matcher.resolve(field, value, settings.FUZZY_MATCH_MIN_SCORE, settings.FUZZY_MATCH_MARGIN)
+        return resolved or value
+    
+    def match_vehicle_names(self, text: str, field: Optional[str] = None, limit: int = 5) -> List[Dict]:
+        """Ranked catalog makes/models/variants for a (possibly misheard) name, with scores."""
+        return self.catalog.matcher.match(text, field=field, limit=limit)
+    
+    def find_relevant_vehicles(self, requirements: str, k: Optional[int] = None) -> List[Dict]:
+        """The k available vehicles that best fit a free-text requirement, best first."""
+        return self.retriever.search(requirements, k or settings.RECOMMENDATION_TOP_K)
+    
     def get_vehicle_summary(self, vehicle: Dict) -> str:
-        summary = f"{vehicle['year']} {vehicle['make']} {vehicle['model']} {vehicle['variant']}"
-        summary += f" - ${vehicle['price']:,}"
-        
-        if vehicle.get('fuel_type'):
-            summary += f", {vehicle['fuel_type']}"
-        
-        if vehicle.get('features'):
-            key_features = ', '.join(vehicle['features'][:3])
-            summary += f". Key features: {key_features}"
-        
-        return summary
+        return self.catalog.summary(vehicle)
     
     def get_available_categories(self) -> List[str]:
-        categories = set(v['category'] for v in self.get_all_vehicles() if v.get('available', False))
-        return sorted(list(categories))
+        return self.catalog.categories
     
     def get_test_drive_info(self) -> Dict:
         return self.knowledge_base.get('test_drive_slots', {})
@@ -101,3 +233,56 @@ class KnowledgeService:
             result += f"And {len(vehicles) - max_items} more options."
         
         return result
+    
+    def list_vehicles(self,
+                      category: Optional[str] = None,
+                      make: Optional[str] = None,
+                      model: Optional[str] = None,
+                      max_price: Optional[float] = None) -> Tuple[List[Dict], str]:
+        """Vehicles in `category`, or else matching make/model/max_price, and the spoken listing of them.
+        
+        Both are cached per catalog version, so a repeated question gets the
+        same list object and byte-identical text (which the TTS audio cache
+        then also hits) without searching or formatting again.
+        """
+        snapshot = self._snapshot
+        if category:
+            key = ('category', category.strip().lower())
+        else:
+            key = ('search', (make or '').strip().lower(), (model or '').strip().lower(), max_price)
+        
+        with self._listings_lock:
+            if self._listings_version != snapshot.version:
+                self._listings.clear()
+                self._listings_version = snapshot.version
+            cached = self._listings.get(key)
+            if cached is not None:
+                self._listings.move_to_end(key)
+                self.listing_hits += 1
+                return cached
+            self.listing_misses += 1
+        
+        if category:
+            vehicles = self.get_vehicles_by_category(category)
+        else:
+            vehicles = self.search_vehicles(make=make, model=model, max_price=max_price)
+        listing = (vehicles, self.format_vehicle_list(vehicles))
+        
+        with self._listings_lock:
+            # Only cache it if no reload happened while it was being built
+            if self._listings_version == snapshot.version and self._snapshot is snapshot:
+                self._listings[key] = listing
+                while len(self._listings) > settings.LISTING_CACHE_SIZE:
+                    self._listings.popitem(last=False)
+        return listing
+    
+    def get_listing_stats(self) -> Dict:
+        with self._listings_lock:
+            total = self.listing_hits + self.listing_misses
+            return {
+                "entries": len(self._listings),
+                "catalog_version": self._listings_version,
+                "hits": self.listing_hits,
+                "misses": self.listing_misses,
+                "hit_rate": round(self.listing_hits / total, 3) if total else 0.0
+            }
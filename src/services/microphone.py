@@ -0,0 +1,50 @@
+from config.settings import settings
+from typing import Callable
+import logging
+import pyaudio
+
+logger = logging.getLogger(__name__)
+
+
+class MicrophoneStream:
+    """Captures the local microphone as 16-bit mono PCM and hands every frame to a callback.
+
+    PyAudio delivers frames on its own thread, so capture keeps running while the
+    caller's thread is busy speaking a reply; that is what lets the CLI hear a
+    barge-in.
+    """
+
+    def __init__(self, on_frame: Callable[[bytes], None]):
+        self.on_frame = on_frame
+        self._audio = None
+        self._stream = None
+
+    def start(self):
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=settings.AUDIO_FORMAT,
+            channels=settings.AUDIO_CHANNELS,
+            rate=settings.SPEECH_SAMPLE_RATE,
+            input=True,
+            frames_per_buffer=settings.AUDIO_CHUNK_SIZE,
+            stream_callback=self._on_audio
+        )
+        self._stream.start_stream()
+        logger.info("Microphone capture started")
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        try:
+            self.on_frame(in_data)
+        except Exception as e:
+            logger.error(f"Microphone frame handler failed: {str(e)}")
+        return None, pyaudio.paContinue
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+        logger.info("Microphone capture stopped")
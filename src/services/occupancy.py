@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+from typing import Iterable, List, Sequence, Union
+
+import numpy as np
+
+
+class OccupancyMap:
+    """Confirmed booking times over a date range, sorted, so any number of slot
+    checks can be answered from the one load that produced them.
+
+    A slot is taken once `capacity` bookings start less than `window` away from
+    it, either side (see SlotEngine for how the window is derived).
+    """
+
+    def __init__(self, start: datetime, end: datetime, booking_times: Union[np.ndarray, Sequence[datetime]],
+                 window: timedelta, capacity: int = 1):
+        self.start = start
+        self.end = end
+        self.window = np.timedelta64(int(window.total_seconds()), "s")
+        self.capacity = capacity
+        self._times = np.sort(np.asarray(booking_times, dtype="datetime64[s]"))
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    def free_mask(self, slots: np.ndarray) -> np.ndarray:
+        """For each datetime64 in `slots`, whether it's free: two binary searches over the bookings."""
+        slots = slots.astype("datetime64[s]")
+        clashes = (np.searchsorted(self._times, slots + self.window, side="left")
+                   - np.searchsorted(self._times, slots - self.window, side="right"))
+        return clashes < self.capacity
+
+    def is_free(self, slot: datetime) -> bool:
+        return bool(self.free_mask(np.array([slot], dtype="datetime64[s]"))[0])
+
+    def free_slots(self, slots: Iterable[datetime]) -> List[datetime]:
+        """The free ones among `slots`, earliest first."""
+        slots = np.sort(np.array(list(slots), dtype="datetime64[s]"))
+        return slots[self.free_mask(slots)].tolist()
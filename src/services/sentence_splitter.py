@@ -0,0 +1,52 @@
+from typing import List
+import re
+
+# A sentence ends at ., ! or ? followed by whitespace; the lookbehinds keep common
+# abbreviations and list numbers ("Dr.", "e.g.", "1.") from ending a sentence.
+SENTENCE_BOUNDARY = re.compile(
+    r"(?<!\bMr\.)(?<!\bMs\.)(?<!\bMrs\.)(?<!\bDr\.)(?<!\bSt\.)(?<!\bvs\.)(?<!\be\.g\.)(?<!\bi\.e\.)"
+    r"(?<!\b\d\.)(?<!\b\d\d\.)(?<=[.!?])\s+"
+)
+
+# Fragments shorter than this ("1.", "Sure!") are merged into the next sentence so
+# TTS isn't asked to synthesize tiny clips with audible seams between them.
+MIN_SENTENCE_CHARS = 20
+
+
+def split_sentences(text: str, min_chars: int = MIN_SENTENCE_CHARS) -> List[str]:
+    """Splits a response into speakable sentences, in order.
+
+    Goes through SentenceStream so a reply split whole and the same reply split while
+    streaming produce identical sentences (and therefore identical TTS cache keys).
+    """
+    stream = SentenceStream(min_chars)
+    return stream.feed(text) + stream.flush()
+
+
+class SentenceStream:
+    """Incremental sentence splitter: feed streamed text, get back sentences as they complete."""
+
+    def __init__(self, min_chars: int = MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        sentences = []
+        start = 0
+
+        # A boundary needs the whitespace after the punctuation, so the last
+        # sentence in the buffer is only released once the next one has begun.
+        for match in SENTENCE_BOUNDARY.finditer(self._buffer):
+            candidate = self._buffer[start:match.start()].strip()
+            if len(candidate) >= self.min_chars:
+                sentences.append(candidate)
+                start = match.end()
+
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return [rest] if rest else []
@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+import re
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Used when the knowledge base leaves something out; they match the rules the
+# booking flow had before it read them from there
+DEFAULT_DURATION_MINUTES = 30
+DEFAULT_BUFFER_MINUTES = 15
+DEFAULT_AVAILABLE_HOURS = ["9:00", "10:00", "11:00", "14:00", "15:00", "16:00", "17:00"]
+DEFAULT_OPENING = (9 * 60, 18 * 60)
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+# "Mon-Sat: 9AM-7PM", "Sun: 10:30AM-5PM"
+HOURS_PATTERN = re.compile(
+    r"([a-z]{3})[a-z]*(?:\s*-\s*([a-z]{3})[a-z]*)?\s*:\s*"
+    r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)\s*-\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)",
+    re.IGNORECASE
+)
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def _minute_of_day(hour: str, minute: Optional[str], meridiem: str) -> int:
+    hour = int(hour) % 12 + (12 if meridiem.lower() == "pm" else 0)
+    return hour * 60 + int(minute or 0)
+
+
+def parse_weekly_hours(text: str) -> Dict[int, Tuple[int, int]]:
+    """Weekday (Monday = 0) -> (opening, closing) minute of day, from a dealership hours string.
+
+    Days the string doesn't mention are closed.
+    """
+    hours = {}
+    for first, last, open_h, open_m, open_ap, close_h, close_m, close_ap in HOURS_PATTERN.findall(text or ""):
+        if first.lower() not in WEEKDAYS or (last and last.lower() not in WEEKDAYS):
+            continue
+        start = WEEKDAYS.index(first.lower())
+        end = WEEKDAYS.index(last.lower()) if last else start
+        window = (_minute_of_day(open_h, open_m, open_ap), _minute_of_day(close_h, close_m, close_ap))
+        for offset in range((end - start) % 7 + 1):
+            hours[(start + offset) % 7] = window
+    return hours
+
+
+def parse_hour(hour_str: str) -> Tuple[int, int]:
+    hour, minute = hour_str.split(":")
+    return int(hour), int(minute)
+
+
+class SlotEngine:
+    """Test-drive slot rules: when drives can start, how long they take, and what clashes.
+
+    A drive occupies `duration` plus `buffer` either side, so two drives clash
+    when their starts are less than duration + buffer apart. Each vehicle takes
+    `capacity` drives at once.
+
+    Offered slots are the `available_hours` that fit inside that weekday's
+    opening hours. They're laid out once as offsets into a week, so the
+    candidates for any range are a single broadcast over whole weeks.
+    """
+
+    def __init__(self,
+                 duration_minutes: int = DEFAULT_DURATION_MINUTES,
+                 buffer_minutes: int = DEFAULT_BUFFER_MINUTES,
+                 available_hours: Sequence[str] = DEFAULT_AVAILABLE_HOURS,
+                 weekly_hours: Optional[Dict[int, Tuple[int, int]]] = None,
+                 capacity: int = 1):
+        self.duration = timedelta(minutes=duration_minutes)
+        self.buffer = timedelta(minutes=buffer_minutes)
+        self.window = self.duration + self.buffer
+        self.available_hours = [parse_hour(h) for h in available_hours]
+        self.weekly_hours = weekly_hours if weekly_hours is not None else {day: DEFAULT_OPENING for day in range(7)}
+        self.capacity = capacity
+        self._week_offsets = self._offsets(self.available_hours)
+
+    @classmethod
+    def from_knowledge_base(cls, data: Dict) -> "SlotEngine":
+        slots = data.get("test_drive_slots", {})
+        hours_text = data.get("dealership", {}).get("hours")
+        weekly_hours = parse_weekly_hours(hours_text) if hours_text else None
+        if hours_text and not weekly_hours:
+            logger.warning(f"Couldn't read dealership hours '{hours_text}', using {DEFAULT_OPENING}")
+            weekly_hours = None
+        return cls(
+            duration_minutes=slots.get("duration_minutes", DEFAULT_DURATION_MINUTES),
+            buffer_minutes=slots.get("buffer_minutes", DEFAULT_BUFFER_MINUTES),
+            available_hours=slots.get("available_hours", DEFAULT_AVAILABLE_HOURS),
+            weekly_hours=weekly_hours,
+            capacity=slots.get("capacity_per_vehicle", 1)
+        )
+
+    def is_bookable(self, slot: datetime) -> bool:
+        """Whether a drive starting at `slot` fits inside that day's opening hours."""
+        hours = self.weekly_hours.get(slot.weekday())
+        if hours is None:
+            return False
+        minute = slot.hour * 60 + slot.minute
+        return hours[0] <= minute and minute + self.duration.total_seconds() / 60 <= hours[1]
+
+    def _offsets(self, times: List[Tuple[int, int]]) -> np.ndarray:
+        """Seconds from Monday 00:00 of every offered slot in a week, ascending."""
+        offsets = []
+        for weekday in range(7):
+            if weekday not in self.weekly_hours:
+                continue
+            opening, closing = self.weekly_hours[weekday]
+            minutes = self.duration.total_seconds() / 60
+            offsets.extend(weekday * SECONDS_PER_DAY + (h * 60 + m) * 60
+                           for h, m in sorted(set(times)) if opening <= h * 60 + m and h * 60 + m + minutes <= closing)
+        return np.array(offsets, dtype=np.int64)
+
+    def candidates(self, start: datetime, days: int, available_hours: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Offered slots at or after `start` on it and the following days, as sorted datetime64[s]."""
+        offsets = self._week_offsets if available_hours is None else self._offsets([parse_hour(h) for h in available_hours])
+        first_day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        monday = np.datetime64(first_day - timedelta(days=first_day.weekday()), "s")
+        weeks = -(-(first_day.weekday() + days) // 7)
+        grid = (monday + np.arange(weeks, dtype=np.int64)[:, None] * (7 * SECONDS_PER_DAY) + offsets).ravel()
+        return grid[(grid >= np.datetime64(start, "s")) & (grid < np.datetime64(first_day + timedelta(days=days), "s"))]
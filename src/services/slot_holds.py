@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+import threading
+import time
+
+
+class Hold(NamedTuple):
+    slot: datetime
+    vehicle_id: Optional[str]
+    expires_at: float
+
+
+class SlotHolds:
+    """Short-lived reservations of a slot by a caller, between "that time is free"
+    and the booking being saved a few turns later.
+
+    Each holder (a conversation) has at most one hold; taking a new one replaces
+    it. Holds expire on their own after `ttl_seconds`, so an abandoned call
+    doesn't keep a slot. They live in this process only: the booking insert
+    itself is what keeps the database free of double bookings.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._holds: Dict[str, Hold] = {}
+        # Held while a hold is being decided, so two callers can't both take the last place
+        self.lock = threading.RLock()
+        self.placed = 0
+        self.expired = 0
+        self.converted = 0
+        self.refused = 0
+
+    def _purge(self, now: float):
+        for holder in [h for h, hold in self._holds.items() if hold.expires_at <= now]:
+            del self._holds[holder]
+            self.expired += 1
+
+    def place(self, holder: str, slot: datetime, vehicle_id: Optional[str]):
+        with self.lock:
+            self._holds[holder] = Hold(slot, vehicle_id, time.monotonic() + self.ttl_seconds)
+            self.placed += 1
+
+    def release(self, holder: str, converted: bool = False):
+        with self.lock:
+            if self._holds.pop(holder, None) is not None and converted:
+                self.converted += 1
+
+    def held_by(self, holder: str) -> Optional[Hold]:
+        with self.lock:
+            self._purge(time.monotonic())
+            return self._holds.get(holder)
+
+    def times(self, low: datetime, high: datetime, vehicle_id: Optional[str] = None,
+              exclude: Optional[str] = None) -> List[datetime]:
+        """Slots strictly between `low` and `high` held by anyone but `exclude`; only
+        `vehicle_id`'s when given. Strict like OccupancyMap and the conditional insert,
+        so a hold exactly one window away never clashes."""
+        with self.lock:
+            self._purge(time.monotonic())
+            return [hold.slot for holder, hold in self._holds.items()
+                    if holder != exclude and low < hold.slot < high
+                    and (vehicle_id is None or hold.vehicle_id == vehicle_id)]
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            self._purge(time.monotonic())
+            return {
+                "active": len(self._holds),
+                "placed": self.placed,
+                "converted": self.converted,
+                "expired": self.expired,
+                "refused": self.refused
+            }
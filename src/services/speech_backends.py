@@ -0,0 +1,214 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from src.services.audio_formats import AudioFormat, get_audio_format
+from config.settings import settings
+from typing import Any, Callable, Iterable, Optional
+import io
+import itertools
+import logging
+import random
+import threading
+import time
+import wave
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechBackendError(Exception):
+    """A synthesizer/recognizer failed in a way that means it should not be reused."""
+
+
+class SpeechBackend(ABC):
+    """Engine-specific half of SpeechService.
+
+    Handles returned by the create_* methods are opaque to the caller; SpeechService
+    keeps them in pools and passes them back for every call, so a backend only has
+    to pay connection setup when a handle is created or (re)connected. Synthesis
+    returns audio in the backend's `output_format`.
+    """
+
+    name = "backend"
+    output_format: AudioFormat
+
+    @abstractmethod
+    def create_synthesizer(self, to_speaker: bool = False) -> Any:
+        ...
+
+    @abstractmethod
+    def synthesize(self, synthesizer: Any, ssml: str) -> bytes:
+        """Returns the audio; raises SpeechBackendError when the handle is broken."""
+
+    @abstractmethod
+    def create_recognizer(self) -> Any:
+        ...
+
+    @abstractmethod
+    def recognize_once(self, recognizer: Any) -> Optional[str]:
+        """Returns the transcript, or None when nothing was recognized."""
+
+    @abstractmethod
+    def create_stream_recognizer(self,
+                                 on_partial: Callable[[str], None],
+                                 on_final: Callable[[str], None]) -> "StreamingRecognizer":
+        """Starts continuous recognition over pushed 16-bit mono PCM at SPEECH_SAMPLE_RATE."""
+
+    def open_connection(self, handle: Any):
+        """Opens the service connection ahead of the first request; no-op by default."""
+
+    def is_connected(self, handle: Any) -> bool:
+        return True
+
+    def stop_speaking(self, synthesizer: Any):
+        """Cuts off audio a to_speaker synthesizer is playing; no-op by default."""
+
+    def close(self, handle: Any):
+        """Releases a handle that is being discarded from its pool."""
+
+
+class StreamingRecognizer(ABC):
+    """Continuous recognizer fed by pushed audio frames.
+
+    on_partial receives interim hypotheses; on_final receives each utterance once
+    the engine detects its end. Both are called from the engine's own threads.
+    """
+
+    @abstractmethod
+    def write(self, pcm: bytes):
+        ...
+
+    @abstractmethod
+    def close(self):
+        ...
+
+
+class FakeStreamingRecognizer(StreamingRecognizer):
+    """Treats non-silent frames as speech and the first silent frame after them as end-of-utterance."""
+
+    def __init__(self, backend: "FakeSpeechBackend", on_partial, on_final):
+        self.backend = backend
+        self.on_partial = on_partial
+        self.on_final = on_final
+        self.speech_bytes = 0
+        self.closed = False
+
+    def write(self, pcm: bytes):
+        if self.closed:
+            return
+        if any(pcm):
+            self.speech_bytes += len(pcm)
+            self.on_partial(f"... ({self.speech_bytes} bytes)")
+        elif self.speech_bytes:
+            self._finish()
+
+    def _finish(self):
+        self.speech_bytes = 0
+        with self.backend._lock:
+            text = self.backend.transcripts.popleft() if self.backend.transcripts else None
+        if text:
+            self.on_final(text)
+
+    def close(self):
+        if self.speech_bytes:
+            self._finish()
+        self.closed = True
+
+
+class _FakeHandle:
+    _ids = itertools.count(1)
+
+    def __init__(self, kind: str):
+        self.id = next(self._ids)
+        self.kind = kind
+        self.connected = False
+
+
+class FakeSpeechBackend(SpeechBackend):
+    """Local stand-in for a speech engine, for exercising pools and pipelines offline.
+
+    Simulates a connection handshake on first use of each handle, per-character
+    synthesis time and optional random failures, and returns silence whose length
+    tracks the text: real WAV or raw PCM, or for compressed formats a placeholder
+    of the size that format's bitrate would produce. Recognition replays the given
+    transcripts in order.
+    """
+
+    name = "fake"
+
+    def __init__(self,
+                 connect_latency: float = 0.15,
+                 synthesis_latency_per_char: float = 0.0001,
+                 failure_rate: float = 0.0,
+                 transcripts: Optional[Iterable[str]] = None,
+                 seed: Optional[int] = None,
+                 output_format: Optional[str] = None):
+        self.output_format = get_audio_format(output_format or settings.TTS_OUTPUT_FORMAT)
+        self.connect_latency = connect_latency
+        self.synthesis_latency_per_char = synthesis_latency_per_char
+        self.failure_rate = failure_rate
+        self.transcripts = deque(transcripts or [])
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.handles_created = 0
+        self.connections_opened = 0
+        self.failures = 0
+
+    def _new_handle(self, kind: str) -> _FakeHandle:
+        with self._lock:
+            self.handles_created += 1
+        return _FakeHandle(kind)
+
+    def create_synthesizer(self, to_speaker: bool = False) -> _FakeHandle:
+        return self._new_handle("speaker" if to_speaker else "synthesizer")
+
+    def create_recognizer(self) -> _FakeHandle:
+        return self._new_handle("recognizer")
+
+    def open_connection(self, handle: _FakeHandle):
+        if not handle.connected:
+            time.sleep(self.connect_latency)
+            handle.connected = True
+            with self._lock:
+                self.connections_opened += 1
+
+    def is_connected(self, handle: _FakeHandle) -> bool:
+        return handle.connected
+
+    def _maybe_fail(self, handle: _FakeHandle):
+        with self._lock:
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+        if failed:
+            handle.connected = False
+            raise SpeechBackendError(f"fake {handle.kind} {handle.id} failed")
+
+    def synthesize(self, synthesizer: _FakeHandle, ssml: str) -> bytes:
+        self.open_connection(synthesizer)
+        time.sleep(len(ssml) * self.synthesis_latency_per_char)
+        self._maybe_fail(synthesizer)
+        return self._silence(seconds=len(ssml) / 60)
+
+    def recognize_once(self, recognizer: _FakeHandle) -> Optional[str]:
+        self.open_connection(recognizer)
+        self._maybe_fail(recognizer)
+        with self._lock:
+            return self.transcripts.popleft() if self.transcripts else None
+
+    def create_stream_recognizer(self, on_partial, on_final) -> FakeStreamingRecognizer:
+        return FakeStreamingRecognizer(self, on_partial, on_final)
+
+    def _silence(self, seconds: float) -> bytes:
+        fmt = self.output_format
+        pcm = b"\x00\x00" * int(seconds * fmt.sample_rate)
+        if fmt.is_raw_pcm:
+            return pcm
+        if not fmt.is_wav:
+            return b"\x00" * int(seconds * fmt.kbps * 1000 / 8)
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(fmt.sample_rate)
+            wav.writeframes(pcm)
+        return buffer.getvalue()
@@ -0,0 +1,143 @@
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """No pooled resource became free within the acquire timeout."""
+
+
+class ResourcePool:
+    """Bounded, thread-safe pool of long-lived speech engine handles.
+
+    Handles are created lazily up to max_size and handed out most-recently-used
+    first, so the warmest connections are reused. Before a handle is handed out it
+    goes through `validate(handle, idle_seconds)`, which may reconnect it or reject
+    it; a rejected handle, or one whose user raised, is closed and replaced.
+    """
+
+    def __init__(self,
+                 name: str,
+                 factory: Callable[[], Any],
+                 max_size: int,
+                 validate: Optional[Callable[[Any, float], bool]] = None,
+                 close: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.factory = factory
+        self.max_size = max_size
+        self.validate = validate
+        self._close = close
+
+        self._idle: "deque[tuple]" = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+
+        self.created = 0
+        self.recycled = 0
+        self.acquisitions = 0
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        resource = self._checkout(timeout)
+        try:
+            yield resource
+        except Exception:
+            self.discard(resource)
+            raise
+        else:
+            self._checkin(resource)
+
+    def prewarm(self, count: int, prepare: Optional[Callable[[Any], None]] = None) -> int:
+        """Creates up to `count` handles ahead of time, running `prepare` (e.g. connect) on each."""
+        warmed = []
+        try:
+            for _ in range(min(count, self.max_size)):
+                with self._cond:
+                    if self._size >= self.max_size:
+                        break
+                    self._size += 1
+                resource = self._create()
+                warmed.append(resource)
+                if prepare:
+                    prepare(resource)
+        finally:
+            for resource in warmed:
+                self._checkin(resource)
+        logger.info(f"Pool '{self.name}' prewarmed with {len(warmed)} handles")
+        return len(warmed)
+
+    def _checkout(self, timeout: Optional[float]) -> Any:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise PoolTimeoutError(f"No '{self.name}' handle free after {timeout}s")
+                    self._cond.wait(remaining)
+
+                self.acquisitions += 1
+                if self._idle:
+                    resource, last_used = self._idle.pop()
+                else:
+                    self._size += 1
+                    resource, last_used = None, None
+
+            if resource is None:
+                return self._create()
+
+            idle_seconds = time.monotonic() - last_used
+            try:
+                healthy = self.validate is None or self.validate(resource, idle_seconds)
+            except Exception as e:
+                logger.warning(f"Pool '{self.name}' health check failed: {str(e)}")
+                healthy = False
+
+            if healthy:
+                return resource
+            self.discard(resource)
+
+    def _create(self) -> Any:
+        try:
+            resource = self.factory()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        self.created += 1
+        return resource
+
+    def _checkin(self, resource: Any):
+        with self._cond:
+            self._idle.append((resource, time.monotonic()))
+            self._cond.notify()
+
+    def discard(self, resource: Any):
+        """Drops a broken handle; the next acquire creates a fresh one in its place."""
+        if self._close:
+            try:
+                self._close(resource)
+            except Exception as e:
+                logger.warning(f"Error closing '{self.name}' handle: {str(e)}")
+        with self._cond:
+            self._size -= 1
+            self.recycled += 1
+            self._cond.notify()
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "created": self.created,
+                "recycled": self.recycled,
+                "acquisitions": self.acquisitions
+            }
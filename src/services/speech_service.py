@@ -1,14 +1,106 @@
 import azure.cognitiveservices.speech as speechsdk
+from src.services.audio_cache import AudioCache
+from src.services.audio_formats import get_audio_format
+from src.services.speech_backends import SpeechBackend, SpeechBackendError, StreamingRecognizer
+from src.services.speech_pool import ResourcePool
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque
 from config.settings import settings
-from typing import Optional
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class SpeechService:
+class SynthesisPipeline:
+    """Synthesizes sentences concurrently and hands their audio back in submission order."""
+    
+    def __init__(self, speech_service: "SpeechService", executor: ThreadPoolExecutor):
+        self.speech_service = speech_service
+        self.executor = executor
+        self._pending: "deque[Tuple[int, str, Future]]" = deque()
+        self._next_seq = 0
+    
+    def submit(self, sentence: str) -> int:
+        seq = self._next_seq
+        self._next_seq += 1
+        self._pending.append((seq, sentence, self.executor.submit(self.speech_service.text_to_speech, sentence)))
+        return seq
+    
+    def ready(self) -> Iterator[Tuple[int, str, bytes]]:
+        """Yields finished chunks without blocking, stopping at the first one still in flight."""
+        while self._pending and self._pending[0][2].done():
+            seq, sentence, future = self._pending.popleft()
+            yield seq, sentence, future.result()
+    
+    def drain(self) -> Iterator[Tuple[int, str, bytes]]:
+        """Yields every remaining chunk in order, waiting for each as needed."""
+        while self._pending:
+            seq, sentence, future = self._pending.popleft()
+            yield seq, sentence, future.result()
+    
+    def cancel(self):
+        while self._pending:
+            self._pending.popleft()[2].cancel()
+
+
+class _AzureHandle:
+    """A Speech SDK synthesizer/recognizer plus the connection kept open for it."""
+    
+    def __init__(self, client):
+        self.client = client
+        self.connection = None
+        self.connected = False
+
+
+class AzureStreamingRecognizer(StreamingRecognizer):
+    """Continuous recognition over a push stream fed with browser PCM frames."""
     
-    def __init__(self):
+    def __init__(self, speech_config: speechsdk.SpeechConfig, on_partial, on_final):
+        stream_format = speechsdk.audio.AudioStreamFormat(
+            samples_per_second=settings.SPEECH_SAMPLE_RATE, bits_per_sample=16, channels=1
+        )
+        self.push_stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+        self.recognizer = speechsdk.SpeechRecognizer(
+            speech_config=speech_config,
+            audio_config=speechsdk.audio.AudioConfig(stream=self.push_stream)
+        )
+        
+        def on_recognizing(evt):
+            if evt.result.text:
+                on_partial(evt.result.text)
+        
+        def on_recognized(evt):
+            if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech and evt.result.text:
+                on_final(evt.result.text)
+        
+        def on_canceled(evt):
+            logger.error(f"Stream recognition canceled: {evt.cancellation_details.reason} "
+                         f"{evt.cancellation_details.error_details}")
+        
+        self.recognizer.recognizing.connect(on_recognizing)
+        self.recognizer.recognized.connect(on_recognized)
+        self.recognizer.canceled.connect(on_canceled)
+        self.recognizer.start_continuous_recognition_async()
+        self.closed = False
+    
+    def write(self, pcm: bytes):
+        if not self.closed:
+            self.push_stream.write(pcm)
+    
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.push_stream.close()
+        self.recognizer.stop_continuous_recognition_async()
+
+
+class AzureSpeechBackend(SpeechBackend):
+    
+    name = "azure"
+    
+    def __init__(self, output_format: Optional[str] = None):
         if not settings.AZURE_SPEECH_KEY or settings.AZURE_SPEECH_KEY == "":
             error_msg = (
                 "Azure Speech Key is missing! Please set AZURE_SPEECH_KEY in your .env file.\n"
@@ -25,21 +117,19 @@ class SpeechService:
             logger.error(error_msg)
             raise ValueError(error_msg)
         
+        self.output_format = get_audio_format(output_format or settings.TTS_OUTPUT_FORMAT)
         logger.info(f"Initializing Azure Speech with region: {settings.AZURE_SPEECH_REGION}")
         
         try:
-            self.speech_config = speechsdk.SpeechConfig(
-                subscription=settings.AZURE_SPEECH_KEY,
-                region=settings.AZURE_SPEECH_REGION
+            self.speech_config = self._make_config()
+            # Audio returned to callers uses the configured (usually compressed) format;
+            # the local speaker keeps the SDK default
+            self.synthesis_config = self._make_config()
+            self.synthesis_config.set_speech_synthesis_output_format(
+                getattr(speechsdk.SpeechSynthesisOutputFormat, self.output_format.sdk_format)
             )
             
-            self.speech_config.speech_recognition_language = settings.SPEECH_LANGUAGE
-            self.speech_config.speech_synthesis_language = settings.SPEECH_LANGUAGE
-            self.speech_config.speech_synthesis_voice_name = settings.TTS_VOICE_NAME
-            
-            self.sample_rate = settings.SPEECH_SAMPLE_RATE
-            
-            logger.info("Azure Speech Service initialized successfully")
+            logger.info(f"Azure Speech Service initialized successfully (output {self.output_format.name})")
             
         except RuntimeError as e:
             error_msg = (
@@ -53,40 +143,154 @@ class SpeechService:
             logger.error(error_msg)
             raise ValueError(error_msg) from e
     
-    def speech_to_text_from_microphone(self) -> Optional[str]:
-        try:
-            logger.info("Listening from microphone...")
-            
-            audio_config = speechsdk.AudioConfig(use_default_microphone=True)
-            
-            speech_recognizer = speechsdk.SpeechRecognizer(
-                speech_config=self.speech_config,
-                audio_config=audio_config
-            )
-            
-            result = speech_recognizer.recognize_once()
-            
-            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                logger.info(f"Recognized: {result.text}")
-                return result.text
-            elif result.reason == speechsdk.ResultReason.NoMatch:
-                logger.warning("No speech could be recognized")
-                return None
-            elif result.reason == speechsdk.ResultReason.Canceled:
-                cancellation = result.cancellation_details
-                logger.error(f"Speech recognition canceled: {cancellation.reason}")
-                if cancellation.reason == speechsdk.CancellationReason.Error:
-                    logger.error(f"Error details: {cancellation.error_details}")
-                return None
-            
-        except Exception as e:
-            logger.error(f"STT error: {str(e)}")
+    def _make_config(self) -> speechsdk.SpeechConfig:
+        speech_config = speechsdk.SpeechConfig(
+            subscription=settings.AZURE_SPEECH_KEY,
+            region=settings.AZURE_SPEECH_REGION
+        )
+        
+        speech_config.speech_recognition_language = settings.SPEECH_LANGUAGE
+        speech_config.speech_synthesis_language = settings.SPEECH_LANGUAGE
+        speech_config.speech_synthesis_voice_name = settings.TTS_VOICE_NAME
+        # How much trailing silence ends an utterance in continuous recognition
+        speech_config.set_property(
+            speechsdk.PropertyId.Speech_SegmentationSilenceTimeoutMs,
+            str(settings.SPEECH_END_SILENCE_MS)
+        )
+        return speech_config
+    
+    def create_synthesizer(self, to_speaker: bool = False) -> _AzureHandle:
+        # audio_config=None returns the audio data instead of playing it on local hardware
+        audio_config = speechsdk.audio.AudioOutputConfig(use_default_speaker=True) if to_speaker else None
+        return self._track(_AzureHandle(speechsdk.SpeechSynthesizer(
+            speech_config=self.speech_config if to_speaker else self.synthesis_config,
+            audio_config=audio_config
+        )), speechsdk.Connection.from_speech_synthesizer)
+    
+    def create_recognizer(self) -> _AzureHandle:
+        audio_config = speechsdk.AudioConfig(use_default_microphone=True)
+        return self._track(_AzureHandle(speechsdk.SpeechRecognizer(
+            speech_config=self.speech_config,
+            audio_config=audio_config
+        )), speechsdk.Connection.from_recognizer)
+    
+    def create_stream_recognizer(self, on_partial, on_final) -> AzureStreamingRecognizer:
+        return AzureStreamingRecognizer(self.speech_config, on_partial, on_final)
+    
+    def _track(self, handle: _AzureHandle, connection_factory) -> _AzureHandle:
+        handle.connection = connection_factory(handle.client)
+        
+        def on_connected(evt):
+            handle.connected = True
+        
+        def on_disconnected(evt):
+            handle.connected = False
+        
+        handle.connection.connected.connect(on_connected)
+        handle.connection.disconnected.connect(on_disconnected)
+        return handle
+    
+    def open_connection(self, handle: _AzureHandle):
+        if not handle.connected:
+            handle.connection.open(True)
+    
+    def is_connected(self, handle: _AzureHandle) -> bool:
+        return handle.connected
+    
+    def close(self, handle: _AzureHandle):
+        handle.connection.close()
+    
+    def stop_speaking(self, synthesizer: _AzureHandle):
+        synthesizer.client.stop_speaking_async().get()
+    
+    def synthesize(self, synthesizer: _AzureHandle, ssml: str) -> bytes:
+        result = synthesizer.client.speak_ssml_async(ssml).get()
+        
+        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+            return result.audio_data
+        
+        if result.reason == speechsdk.ResultReason.Canceled:
+            cancellation = result.cancellation_details
+            logger.error(f"Speech synthesis canceled: {cancellation.reason}")
+            if cancellation.reason == speechsdk.CancellationReason.Error:
+                raise SpeechBackendError(cancellation.error_details)
+        else:
+            logger.error(f"Speech synthesis failed: {result.reason}")
+        return b''
+    
+    def recognize_once(self, recognizer: _AzureHandle) -> Optional[str]:
+        result = recognizer.client.recognize_once()
+        
+        if result.reason == speechsdk.ResultReason.RecognizedSpeech:
+            return result.text
+        elif result.reason == speechsdk.ResultReason.NoMatch:
+            logger.warning("No speech could be recognized")
             return None
+        elif result.reason == speechsdk.ResultReason.Canceled:
+            cancellation = result.cancellation_details
+            logger.error(f"Speech recognition canceled: {cancellation.reason}")
+            if cancellation.reason == speechsdk.CancellationReason.Error:
+                raise SpeechBackendError(cancellation.error_details)
+        return None
+
+
+class SpeechService:
     
-    def text_to_speech(self, text: str) -> bytes:
-        """Synthesizes text and returns the audio bytes (for web/API use)."""
+    def __init__(self, backend: Optional[SpeechBackend] = None):
+        self.backend = backend or AzureSpeechBackend()
+        self.output_format = self.backend.output_format
+        self.sample_rate = settings.SPEECH_SAMPLE_RATE
+        self.audio_cache = AudioCache() if settings.TTS_CACHE_ENABLED else None
+        self._stream_executor = ThreadPoolExecutor(
+            max_workers=settings.TTS_STREAM_WORKERS, thread_name_prefix="tts-stream"
+        )
+        
+        # Long-lived engine handles, so a turn doesn't pay connection setup
+        self.synthesizer_pool = self._make_pool("synthesizer", self.backend.create_synthesizer,
+                                                settings.SPEECH_SYNTHESIZER_POOL_SIZE)
+        self.speaker_pool = self._make_pool("speaker", lambda: self.backend.create_synthesizer(to_speaker=True), 1)
+        self.recognizer_pool = self._make_pool("recognizer", self.backend.create_recognizer, 1)
+        self._active_speaker = None
+        
+        logger.info(f"Speech service initialized ({self.backend.name} backend)")
+    
+    def _make_pool(self, name: str, factory, max_size: int) -> ResourcePool:
+        return ResourcePool(name, factory, max_size, validate=self._check_handle, close=self.backend.close)
+    
+    def _check_handle(self, handle: Any, idle_seconds: float) -> bool:
+        # The service drops idle connections; reopen them before use rather than mid-request
+        if idle_seconds > settings.SPEECH_CONNECTION_REFRESH_SECONDS or not self.backend.is_connected(handle):
+            self.backend.open_connection(handle)
+        return True
+    
+    def prewarm(self, count: Optional[int] = None) -> int:
+        """Creates synthesizers and opens their connections ahead of the first turn."""
+        count = settings.SPEECH_POOL_PREWARM if count is None else count
         try:
-            ssml = f"""
+            return self.synthesizer_pool.prewarm(count, prepare=self.backend.open_connection)
+        except Exception as e:
+            logger.error(f"Speech pool prewarm failed: {str(e)}")
+            return 0
+    
+    def get_pool_stats(self) -> Dict:
+        return {
+            "synthesizer": self.synthesizer_pool.get_stats(),
+            "speaker": self.speaker_pool.get_stats(),
+            "recognizer": self.recognizer_pool.get_stats()
+        }
+    
+    def _run_pooled(self, pool: ResourcePool, call):
+        """Runs call(handle) on a pooled handle, retrying once on a fresh handle if it breaks."""
+        for attempt in range(2):
+            try:
+                with pool.acquire(timeout=settings.SPEECH_POOL_ACQUIRE_TIMEOUT) as handle:
+                    return call(handle)
+            except SpeechBackendError as e:
+                logger.warning(f"Recycling broken {pool.name} ({str(e)}), attempt {attempt + 1}")
+        raise SpeechBackendError(f"{pool.name} failed twice")
+    
+    def _build_ssml(self, text: str) -> str:
+        return f"""
             <speak version='1.0' xml:lang='{settings.SPEECH_LANGUAGE}'>
                 <voice name='{settings.TTS_VOICE_NAME}'>
                     <prosody rate='{settings.TTS_SPEAKING_RATE}' pitch='{settings.TTS_PITCH}'>
@@ -95,19 +299,67 @@ class SpeechService:
                 </voice>
             </speak>
             """
+    
+    def open_stream(self, on_partial, on_final) -> StreamingRecognizer:
+        """Starts continuous recognition over audio pushed from a remote client."""
+        return self.backend.create_stream_recognizer(on_partial, on_final)
+    
+    def speech_to_text_from_microphone(self) -> Optional[str]:
+        try:
+            logger.info("Listening from microphone...")
+            text = self._run_pooled(self.recognizer_pool, self.backend.recognize_once)
+            if text:
+                logger.info(f"Recognized: {text}")
+            return text
             
-            # Configure to return audio data to stream instead of local speaker
-            speech_synthesizer = speechsdk.SpeechSynthesizer(
-                speech_config=self.speech_config, 
-                audio_config=None # None means don't play to local hardware
-            )
-            result = speech_synthesizer.speak_ssml(ssml)
-            
-            if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                return result.audio_data
-            else:
-                logger.error(f"Speech synthesis failed: {result.reason}")
-                return b''
+        except Exception as e:
+            logger.error(f"STT error: {str(e)}")
+            return None
+    
+    def text_to_speech(self, text: str) -> bytes:
+        """Synthesizes text and returns the audio bytes, in output_format (for web/API use)."""
+        if self.audio_cache is None:
+            return self._synthesize(text)
+        
+        key = self._cache_key(text)
+        audio = self.audio_cache.get(key)
+        if audio is not None:
+            logger.info(f"TTS cache hit: {text[:50]}")
+            return audio
+        
+        audio = self._synthesize(text)
+        self.audio_cache.put(key, audio)
+        return audio
+    
+    def _cache_key(self, text: str) -> str:
+        return AudioCache.make_key(text, settings.TTS_VOICE_NAME, settings.TTS_SPEAKING_RATE,
+                                   settings.TTS_PITCH, self.output_format.name)
+    
+    def synthesis_pipeline(self) -> SynthesisPipeline:
+        return SynthesisPipeline(self, self._stream_executor)
+    
+    def warm_cache(self, prompts: Iterable[str]) -> int:
+        """Pre-synthesizes known prompts into the audio cache; returns how many were added."""
+        if self.audio_cache is None:
+            return 0
+        
+        added = 0
+        for text in prompts:
+            key = self._cache_key(text)
+            if key in self.audio_cache:
+                continue
+            audio = self._synthesize(text)
+            if audio:
+                self.audio_cache.put(key, audio)
+                added += 1
+        
+        logger.info(f"TTS cache warmed with {added} new prompts")
+        return added
+    
+    def _synthesize(self, text: str) -> bytes:
+        try:
+            ssml = self._build_ssml(text)
+            return self._run_pooled(self.synthesizer_pool, lambda synth: self.backend.synthesize(synth, ssml))
                 
         except Exception as e:
             logger.error(f"TTS Error: {str(e)}")
@@ -120,60 +372,40 @@ class SpeechService:
         try:
             logger.info(f"Speaking: {text[:50]}...")
             
-            ssml = f"""
-            <speak version='1.0' xml:lang='{settings.SPEECH_LANGUAGE}'>
-                <voice name='{settings.TTS_VOICE_NAME}'>
-                    <prosody rate='{settings.TTS_SPEAKING_RATE}' pitch='{settings.TTS_PITCH}'>
-                        {text}
-                    </prosody>
-                </voice>
-            </speak>
-            """
-            
-            audio_config = speechsdk.audio.AudioOutputConfig(use_default_speaker=True)
-            
-            speech_synthesizer = speechsdk.SpeechSynthesizer(
-                speech_config=self.speech_config,
-                audio_config=audio_config
-            )
-            
-            result = speech_synthesizer.speak_ssml_async(ssml).get()
-            
-            if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                logger.info("Speech completed successfully")
-            elif result.reason == speechsdk.ResultReason.Canceled:
-                cancellation = result.cancellation_details
-                logger.error(f"Speech synthesis canceled: {cancellation.reason}")
-                if cancellation.reason == speechsdk.CancellationReason.Error:
-                    logger.error(f"Error details: {cancellation.error_details}")
+            ssml = self._build_ssml(text)
+            self._run_pooled(self.speaker_pool, lambda synth: self._play(synth, ssml))
+            logger.info("Speech completed successfully")
                     
         except Exception as e:
             logger.error(f"Speak error: {str(e)}")
             print(f"[TTS Error - Text only]: {text}")
     
+    def _play(self, speaker: Any, ssml: str) -> bytes:
+        self._active_speaker = speaker
+        try:
+            return self.backend.synthesize(speaker, ssml)
+        finally:
+            self._active_speaker = None
+    
+    def stop_speaking(self) -> bool:
+        """Cuts off speak() mid-sentence, e.g. when the caller barges in."""
+        speaker = self._active_speaker
+        if speaker is None:
+            return False
+        try:
+            self.backend.stop_speaking(speaker)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not stop playback: {str(e)}")
+            return False
+    
     def recognize_from_microphone(self) -> Optional[str]:
         try:
             logger.info("Listening...")
-            
-            audio_config = speechsdk.AudioConfig(use_default_microphone=True)
-            
-            speech_recognizer = speechsdk.SpeechRecognizer(
-                speech_config=self.speech_config,
-                audio_config=audio_config
-            )
-            
-            result = speech_recognizer.recognize_once()
-            
-            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                logger.info(f"Recognized: {result.text}")
-                return result.text
-            elif result.reason == speechsdk.ResultReason.NoMatch:
-                logger.warning("No speech could be recognized")
-                return None
-            elif result.reason == speechsdk.ResultReason.Canceled:
-                cancellation = result.cancellation_details
-                logger.error(f"Recognition canceled: {cancellation.reason}")
-                return None
+            text = self._run_pooled(self.recognizer_pool, self.backend.recognize_once)
+            if text:
+                logger.info(f"Recognized: {text}")
+            return text
                 
         except Exception as e:
             logger.error(f"Microphone recognition error: {str(e)}")
@@ -0,0 +1,135 @@
+from bisect import bisect_right
+from collections import defaultdict
+from src.services.kb_snapshot import column
+from src.services.vehicle_matcher import VehicleMatcher
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+INDEXED_FIELDS = ("make", "model", "category")
+
+
+def format_summary(year, make, model, variant, price, fuel_type=None, features=None) -> str:
+    """One-line spoken description, e.g. '2024 Toyota Camry XSE - $32,500, Hybrid. Key features: ...'."""
+    summary = f"{year} {make} {model} {variant} - ${price:,}"
+    if fuel_type:
+        summary += f", {fuel_type}"
+    if features:
+        summary += f". Key features: {', '.join(features[:3])}"
+    return summary
+
+
+class VehicleCatalog:
+    """Read-only indexes over the knowledge base's vehicle list, built once per load.
+
+    Every index holds positions into `vehicles`, in list order, and (apart from
+    the id map) only covers available vehicles, since that is all the searches
+    return. Lookups by make/model/category are dictionary hits, max_price is a
+    bisect over a price-sorted array, and a search with several filters walks the
+    smallest candidate list and checks membership in the others. `matcher` ranks
+    makes/models/variants against misheard names. A vehicle's summary line is
+    formatted the first time it's asked for and reused after that (formatting all
+    of them up front would cost more at startup than the snapshot saves).
+    """
+
+    def __init__(self, vehicles: Sequence[Dict], aliases: Optional[Dict[str, Dict[str, str]]] = None):
+        self.vehicles = vehicles
+        self._by_id: Dict[str, int] = {}
+        self._positions: Dict[str, Dict[str, Tuple[int, ...]]] = {}
+        self._position_sets: Dict[str, Dict[str, FrozenSet[int]]] = {}
+
+        # Built from columns, so a snapshot-backed vehicle list doesn't have to build its rows
+        ids = column(vehicles, 'id')
+        availability = column(vehicles, 'available', False)
+        prices = column(vehicles, 'price')
+        self._price_by_position = [float('inf') if price is None else price for price in prices]
+        keys = {field: [str(value).lower() for value in column(vehicles, field, '')] for field in INDEXED_FIELDS}
+
+        groups = {field: defaultdict(list) for field in INDEXED_FIELDS}
+        available = []
+        priced = []
+        for position, vehicle_id in enumerate(ids):
+            self._by_id.setdefault(vehicle_id, position)
+            if not availability[position]:
+                continue
+            available.append(position)
+            for field in INDEXED_FIELDS:
+                groups[field][keys[field][position]].append(position)
+            if prices[position] is not None:
+                priced.append((prices[position], position))
+
+        for field, group in groups.items():
+            self._positions[field] = {key: tuple(positions) for key, positions in group.items()}
+            self._position_sets[field] = {key: frozenset(positions) for key, positions in group.items()}
+
+        self._available = tuple(available)
+        priced.sort()
+        self._prices = [price for price, _ in priced]
+        self._price_positions = [position for _, position in priced]
+        categories = column(vehicles, 'category')
+        self._categories = sorted({categories[p] for p in available if categories[p]})
+
+        self._summaries: List[Optional[str]] = [None] * len(vehicles)
+        self.matcher = VehicleMatcher(vehicles, aliases)
+
+        logger.info(f"Vehicle catalog indexed: {len(vehicles)} vehicles, {len(available)} available")
+
+    def __len__(self) -> int:
+        return len(self.vehicles)
+
+    def get(self, vehicle_id: str) -> Optional[Dict]:
+        position = self._by_id.get(vehicle_id)
+        return self.vehicles[position] if position is not None else None
+
+    def summary(self, vehicle: Dict) -> str:
+        """The vehicle's summary line; memoized for the catalog's own rows."""
+        position = self._by_id.get(vehicle.get('id'))
+        own_row = position is not None and self.vehicles[position] is vehicle
+        if own_row and self._summaries[position] is not None:
+            return self._summaries[position]
+        
+        summary = format_summary(vehicle['year'], vehicle['make'], vehicle['model'], vehicle['variant'],
+                                 vehicle['price'], vehicle.get('fuel_type'), vehicle.get('features'))
+        if own_row:
+            self._summaries[position] = summary
+        return summary
+
+    @property
+    def categories(self) -> List[str]:
+        """Sorted categories that have at least one available vehicle."""
+        return list(self._categories)
+
+    def search(self,
+               make: Optional[str] = None,
+               model: Optional[str] = None,
+               category: Optional[str] = None,
+               max_price: Optional[float] = None) -> List[Dict]:
+        """Available vehicles matching every given filter, in catalog order."""
+        filters = [(field, value.lower()) for field, value in
+                   (("make", make), ("model", model), ("category", category)) if value]
+
+        candidates: Sequence[int] = self._available
+        checks = []
+        if filters:
+            # Walk the smallest posting list, test membership in the rest
+            lists = sorted(((self._positions[field].get(key, ()), field, key) for field, key in filters),
+                           key=lambda entry: len(entry[0]))
+            candidates, smallest_field, smallest_key = lists[0]
+            checks = [self._position_sets[field].get(key, frozenset()) for _, field, key in lists[1:]]
+
+        if max_price:
+            cutoff = bisect_right(self._prices, max_price)
+            if cutoff < len(candidates):
+                # The price range is the narrower set, so start from it instead
+                if filters:
+                    checks.append(self._position_sets[smallest_field].get(smallest_key, frozenset()))
+                candidates = sorted(self._price_positions[:cutoff])
+            else:
+                prices = self._price_by_position
+                candidates = [p for p in candidates if prices[p] <= max_price]
+
+        for check in checks:
+            candidates = [p for p in candidates if p in check]
+        vehicles = self.vehicles
+        return [vehicles[p] for p in candidates]
@@ -0,0 +1,172 @@
+from collections import defaultdict
+from src.services.kb_snapshot import column
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+import re
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MATCHED_FIELDS = ("make", "model", "variant")
+
+NUMBER_WORDS = {
+    "zero": 0, "oh": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+    "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+TENS_WORDS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90}
+
+# Letter groups that sound alike, applied before vowels are dropped
+PHONETIC_RULES = [("ph", "f"), ("ck", "k"), ("gh", ""), ("q", "k"), ("x", "ks"), ("z", "s"), ("c", "k"), ("y", "i"), ("w", "v")]
+
+# Weight of trigram similarity vs. a matching phonetic key in the score
+TRIGRAM_WEIGHT = 0.7
+PHONETIC_WEIGHT = 0.3
+# Multi-word queries ("toyota camry") are also matched word span by word span;
+# a span match scores a little below the same match on the whole query
+MAX_SPAN_WORDS = 3
+SPAN_PENALTY = 0.95
+
+
+def spoken_numbers_to_digits(text: str) -> str:
+    """'f one fifty' -> 'f 1 50', 'rav four' -> 'rav 4', 'twenty one' -> '21'."""
+    tokens = re.findall(r"[a-z0-9]+", text.lower())
+    out = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in TENS_WORDS:
+            value = TENS_WORDS[token]
+            if i + 1 < len(tokens) and 0 < NUMBER_WORDS.get(tokens[i + 1], 0) < 10:
+                value += NUMBER_WORDS[tokens[i + 1]]
+                i += 1
+            out.append(str(value))
+        elif token in NUMBER_WORDS:
+            out.append(str(NUMBER_WORDS[token]))
+        else:
+            out.append(token)
+        i += 1
+    return " ".join(out)
+
+
+def compact(text: str) -> str:
+    """Spelling-insensitive form: spoken numbers as digits, no spaces or punctuation ('F-150' -> 'f150')."""
+    return spoken_numbers_to_digits(text).replace(" ", "")
+
+
+def phonetic_key(text: str) -> str:
+    """Rough sound-alike key: similar letters merged, vowels after the first letter dropped, repeats collapsed."""
+    key = compact(text)
+    for pattern, replacement in PHONETIC_RULES:
+        key = key.replace(pattern, replacement)
+    if not key:
+        return key
+    key = key[0] + re.sub(r"[aeiouh]", "", key[1:])
+    return re.sub(r"(.)\1+", r"\1", key)
+
+
+def trigrams(text: str) -> frozenset:
+    padded = f" {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class VehicleMatcher:
+    """Ranks catalog makes/models/variants against noisy (speech-recognized) names.
+
+    Every distinct name is indexed by the character trigrams and the phonetic key
+    of its compact form, plus any aliases pointing at it. Posting lists are numpy
+    arrays, so scoring a query is a bincount over the postings of its trigrams and
+    a few vector operations, whatever the number of names.
+    """
+
+    def __init__(self, vehicles: Sequence[Dict], aliases: Optional[Dict[str, Dict[str, str]]] = None):
+        self._terms: List[Tuple[str, str]] = []  # (field, value)
+        self._ids: Dict[Tuple[str, str], int] = {}
+        exact: Dict[str, List[int]] = defaultdict(list)
+        by_gram: Dict[str, List[int]] = defaultdict(list)
+        by_sound: Dict[str, List[int]] = defaultdict(list)
+        gram_counts = []
+
+        # Distinct (make, model, variant) combinations, in first-seen order - far fewer than vehicles
+        for values in dict.fromkeys(zip(*(column(vehicles, field) for field in MATCHED_FIELDS))):
+            for field, value in zip(MATCHED_FIELDS, values):
+                if not value or (field, str(value)) in self._ids:
+                    continue
+                term_id = len(self._terms)
+                self._terms.append((field, str(value)))
+                self._ids[(field, str(value))] = term_id
+
+                key = compact(str(value))
+                grams = trigrams(key)
+                gram_counts.append(len(grams))
+                exact[key].append(term_id)
+                for gram in grams:
+                    by_gram[gram].append(term_id)
+                by_sound[phonetic_key(key)].append(term_id)
+
+        # Aliases are only kept when they point at something actually in the catalog
+        for field, table in (aliases or {}).items():
+            for alias, canonical in table.items():
+                if (field, canonical) in self._ids:
+                    exact[compact(alias)].append(self._ids[(field, canonical)])
+
+        as_array = lambda ids: np.array(ids, dtype=np.int32)
+        self._exact = {key: as_array(ids) for key, ids in exact.items()}
+        self._by_gram = {gram: as_array(ids) for gram, ids in by_gram.items()}
+        self._by_sound = {key: as_array(ids) for key, ids in by_sound.items()}
+        self._gram_counts = np.array(gram_counts, dtype=np.float32)
+        fields = np.array([field for field, _ in self._terms])
+        self._field_masks = {field: fields == field for field in MATCHED_FIELDS}
+
+        logger.info(f"Vehicle matcher indexed {len(self._terms)} names")
+
+    def match(self, text: str, field: Optional[str] = None, limit: int = 5) -> List[Dict]:
+        """Best matching names for `text`, as [{'field', 'value', 'score'}] sorted by score (1.0 = exact/alias)."""
+        words = spoken_numbers_to_digits(text or "").split()
+        if not words or not self._terms:
+            return []
+
+        scores = self._score("".join(words))
+        if len(words) > 1:
+            for size in range(1, min(MAX_SPAN_WORDS, len(words) - 1) + 1):
+                for start in range(len(words) - size + 1):
+                    np.maximum(scores, self._score("".join(words[start:start + size])) * SPAN_PENALTY, out=scores)
+
+        if field is not None:
+            scores = np.where(self._field_masks.get(field, False), scores, 0)
+
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        ranked = sorted((term_id for term_id in top.tolist() if scores[term_id] > 0),
+                        key=lambda term_id: (-scores[term_id], term_id))
+        return [
+            {"field": self._terms[term_id][0], "value": self._terms[term_id][1], "score": round(float(scores[term_id]), 3)}
+            for term_id in ranked
+        ]
+
+    def _score(self, key: str) -> np.ndarray:
+        """Score of every name against the compact query `key`."""
+        grams = trigrams(key)
+        postings = [self._by_gram[gram] for gram in grams if gram in self._by_gram]
+        if postings:
+            shared = np.bincount(np.concatenate(postings), minlength=len(self._terms))
+            scores = TRIGRAM_WEIGHT * 2 * shared / (len(grams) + self._gram_counts)
+        else:
+            scores = np.zeros(len(self._terms), dtype=np.float32)
+
+        sound_matches = self._by_sound.get(phonetic_key(key))
+        if sound_matches is not None:
+            scores[sound_matches] += PHONETIC_WEIGHT
+        exact = self._exact.get(key)
+        if exact is not None:
+            scores[exact] = 1.0
+        return scores
+
+    def resolve(self, field: str, text: str, min_score: float, margin: float) -> Optional[str]:
+        """The catalog value `text` most likely means, if the best match is good and clearly ahead."""
+        candidates = self.match(text, field=field, limit=2)
+        if not candidates or candidates[0]["score"] < min_score:
+            return None
+        if len(candidates) > 1 and candidates[0]["score"] - candidates[1]["score"] < margin:
+            return None
+        return candidates[0]["value"]
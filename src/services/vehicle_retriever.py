@@ -0,0 +1,216 @@
+from collections import defaultdict
+from pathlib import Path
+from src.services.kb_snapshot import column
+from typing import Dict, List, Optional, Sequence
+import logging
+import re
+import zlib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Everyday wording -> the catalog vocabulary it implies, so "something for the
+# kids and road trips" lands on third-row SUVs without an embedding model
+QUERY_EXPANSIONS = {
+    "family": "third row seating suv minivan safety",
+    "kids": "third row seating suv minivan safety",
+    "commute": "hybrid fuel efficient sedan adaptive cruise control",
+    "commuter": "hybrid fuel efficient sedan adaptive cruise control",
+    "efficient": "hybrid electric",
+    "economical": "hybrid electric",
+    "eco": "hybrid electric",
+    "green": "electric hybrid",
+    "mileage": "hybrid electric",
+    "ev": "electric",
+    "tow": "truck towing package 4wd",
+    "towing": "truck towing package 4wd",
+    "haul": "truck towing package",
+    "offroad": "4wd awd truck suv",
+    "snow": "awd 4wd",
+    "luxury": "leather seats premium sunroof",
+    "luxurious": "leather seats premium sunroof",
+    "premium": "leather seats premium",
+    "tech": "apple carplay wireless charging autopilot over the air updates",
+    "safe": "safety collision mitigation lane departure warning safety sense",
+    "space": "third row seating suv",
+    "roomy": "third row seating suv",
+}
+CHEAP_WORDS = {"cheap", "cheapest", "affordable", "budget", "inexpensive", "economical", "value"}
+BUDGET_PATTERN = re.compile(
+    r"(?:under|below|less than|max(?:imum)?|up to|within|budget(?: of| is)?|around|about)\s*(\$)?\s*"
+    r"(\d[\d,]*(?:\.\d+)?)\s*(?:(k|grand|thousand)\b)?", re.IGNORECASE
+)
+
+
+def vehicle_document(vehicle: Dict) -> str:
+    """The text a vehicle is retrieved by: identity, category, powertrain and features."""
+    parts = [vehicle.get('make', ''), vehicle.get('model', ''), vehicle.get('variant', ''),
+             vehicle.get('category', ''), vehicle.get('fuel_type', ''), vehicle.get('transmission', '')]
+    parts += vehicle.get('features', [])
+    parts += vehicle.get('colors', [])
+    return " ".join(str(part) for part in parts if part)
+
+
+def parse_budget(text: str) -> Optional[float]:
+    """'under 40k' / 'budget of $35,000' -> the price ceiling, if the caller named one.
+
+    Only amounts with a $, a k/grand/thousand or at least four digits count, so
+    "seats up to 7" or "about 5 years old" aren't read as prices.
+    """
+    for match in BUDGET_PATTERN.finditer(text or ""):
+        dollar, amount, thousands = match.groups()
+        value = float(amount.replace(",", ""))
+        if thousands or (dollar and value < 1000):
+            return value * 1000
+        if dollar or value >= 1000:
+            return value
+    return None
+
+
+class HashingEmbedder:
+    """Bag of words and word pairs, hashed into a fixed number of signed dimensions.
+
+    Uses crc32 rather than hash() so vectors are stable across processes and can be
+    persisted.
+    """
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+
+    @staticmethod
+    def tokens(text: str) -> List[str]:
+        words = [word[:-1] if len(word) > 3 and word.endswith("s") else word
+                 for word in re.findall(r"[a-z0-9]+", text.lower())]
+        return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Sublinear term-frequency vectors, one row per text (not yet IDF-weighted or normalized)."""
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = defaultdict(float)
+            for token in self.tokens(text):
+                digest = zlib.crc32(token.encode("utf-8"))
+                counts[digest % self.dimensions] += 1.0 if digest & 0x80000000 else -1.0
+            for column, count in counts.items():
+                matrix[row, column] = np.sign(count) * (1 + np.log(abs(count))) if count else 0.0
+        return matrix
+
+
+# Looked up on query tokens, so keyed the way the embedder spells them ("kids" -> "kid")
+EXPANSIONS_BY_TOKEN = {HashingEmbedder.tokens(word)[0]: expansion for word, expansion in QUERY_EXPANSIONS.items()}
+
+
+class VehicleRetriever:
+    """Top-k vehicle candidates for a free-text requirement, without a network call.
+
+    Vehicles that share a description (the same trim in stock several times)
+    share one "profile" row in a TF-IDF matrix over hashed words. The matrix is
+    what gets persisted; availability and prices are read from the live vehicle
+    list, so a stock change doesn't need a rebuild. A query scores every profile
+    with one matrix-vector product, drops profiles with nothing available within
+    the caller's budget, and returns the cheapest available unit of each of the
+    best k profiles, so the candidates are also distinct.
+    """
+
+    def __init__(self, vehicles: Sequence[Dict], embedder: HashingEmbedder,
+                 matrix: np.ndarray, idf: np.ndarray, profile_of: np.ndarray):
+        self.vehicles = vehicles
+        self.embedder = embedder
+        self.matrix = matrix
+        self.idf = idf
+        self.profile_of = profile_of
+        self._index_stock()
+
+    @classmethod
+    def build(cls, vehicles: Sequence[Dict], dimensions: int) -> "VehicleRetriever":
+        profiles: Dict[str, int] = {}
+        profile_of = np.array([profiles.setdefault(vehicle_document(v), len(profiles)) for v in vehicles],
+                              dtype=np.int32)
+        embedder = HashingEmbedder(dimensions)
+        tf = embedder.embed(list(profiles))
+
+        document_frequency = np.count_nonzero(tf, axis=0)
+        idf = (np.log((1 + len(profiles)) / (1 + document_frequency)) + 1).astype(np.float32)
+        matrix = tf * idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+
+        logger.info(f"Built retrieval index: {len(vehicles)} vehicles, {len(profiles)} profiles, {dimensions} dims")
+        return cls(vehicles, embedder, matrix, idf, profile_of)
+
+    @classmethod
+    def load_or_build(cls, vehicles: Sequence[Dict], path: str, fingerprint: str, dimensions: int) -> "VehicleRetriever":
+        """Loads the persisted index if it was built from this exact knowledge base, else rebuilds and saves it."""
+        try:
+            with np.load(path) as stored:
+                if (int(stored["version"]) == FORMAT_VERSION and str(stored["fingerprint"]) == fingerprint
+                        and int(stored["dimensions"]) == dimensions and len(stored["profile_of"]) == len(vehicles)):
+                    logger.info(f"Loaded retrieval index from {path}")
+                    return cls(vehicles, HashingEmbedder(dimensions), stored["matrix"], stored["idf"],
+                               stored["profile_of"])
+                logger.info("Retrieval index is stale, rebuilding")
+        except FileNotFoundError:
+            logger.info("No retrieval index yet, building")
+        except Exception as e:
+            logger.warning(f"Could not read retrieval index {path}: {str(e)}")
+
+        retriever = cls.build(vehicles, dimensions)
+        try:
+            retriever.save(path, fingerprint)
+        except OSError as e:
+            logger.warning(f"Could not persist retrieval index: {str(e)}")
+        return retriever
+
+    def save(self, path: str, fingerprint: str):
+        target = Path(path)
+        tmp = target.with_name(target.name + ".tmp.npz")
+        np.savez(tmp, version=FORMAT_VERSION, fingerprint=fingerprint, dimensions=self.embedder.dimensions,
+                 matrix=self.matrix, idf=self.idf, profile_of=self.profile_of)
+        tmp.replace(target)
+
+    def _index_stock(self):
+        """Cheapest available unit and its price per profile, from the live vehicle list."""
+        profile_count = self.matrix.shape[0]
+        self._profile_price = np.full(profile_count, np.inf)
+        self._profile_pick = np.full(profile_count, -1, dtype=np.int64)
+
+        available = np.flatnonzero(np.array(column(self.vehicles, 'available', False), dtype=bool))
+        if not len(available):
+            return
+        prices = np.array([np.inf if price is None else price for price in column(self.vehicles, 'price')],
+                          dtype=np.float64)[available]
+        profiles = np.asarray(self.profile_of)[available]
+        # Sort by (profile, price, position); the first entry of each profile is its pick
+        order = np.lexsort((available, prices, profiles))
+        picked_profiles, first = np.unique(profiles[order], return_index=True)
+        self._profile_price[picked_profiles] = prices[order][first]
+        self._profile_pick[picked_profiles] = available[order][first]
+
+    def _query_vector(self, text: str) -> np.ndarray:
+        words = set(self.embedder.tokens(text))
+        expanded = " ".join([text] + [EXPANSIONS_BY_TOKEN[word] for word in words if word in EXPANSIONS_BY_TOKEN])
+        query = self.embedder.embed([expanded])[0] * self.idf
+        norm = np.linalg.norm(query)
+        return query / norm if norm else query
+
+    def search(self, requirements: str, k: int) -> List[Dict]:
+        scores = self.matrix @ self._query_vector(requirements)
+
+        eligible = self._profile_pick >= 0
+        budget = parse_budget(requirements)
+        if budget is not None and np.any(eligible & (self._profile_price <= budget)):
+            eligible &= self._profile_price <= budget
+        if not np.any(eligible):
+            return []
+
+        if CHEAP_WORDS & set(self.embedder.tokens(requirements)):
+            prices = np.where(eligible, self._profile_price, 0)
+            scores = scores - 0.2 * prices / max(prices.max(), 1)
+
+        scores = np.where(eligible, scores, -np.inf)
+        k = min(k, int(eligible.sum()))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = sorted(top.tolist(), key=lambda profile: (-scores[profile], profile))
+        return [self.vehicles[self._profile_pick[profile]] for profile in top]
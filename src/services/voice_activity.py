@@ -0,0 +1,88 @@
+from config.settings import settings
+from typing import List, Optional
+import numpy as np
+
+SPEECH_START = "speech_start"
+SPEECH_END = "speech_end"
+
+FRAME_MS = 20
+
+
+class EnergyVAD:
+    """Energy-based voice-activity detector over 16-bit mono PCM.
+
+    Audio is cut into 20 ms frames; a frame is voiced when its RMS level clears
+    both the absolute threshold and the running noise floor plus a margin. Speech
+    starts after VAD_SPEECH_MS of mostly voiced frames and ends after
+    VAD_HANGOVER_MS of unvoiced ones, so clicks and short bursts don't count.
+    """
+
+    def __init__(self,
+                 sample_rate: Optional[int] = None,
+                 threshold_db: Optional[float] = None,
+                 margin_db: Optional[float] = None,
+                 speech_ms: Optional[int] = None,
+                 hangover_ms: Optional[int] = None):
+        self.sample_rate = sample_rate or settings.SPEECH_SAMPLE_RATE
+        self.threshold_db = settings.VAD_THRESHOLD_DB if threshold_db is None else threshold_db
+        self.margin_db = settings.VAD_NOISE_MARGIN_DB if margin_db is None else margin_db
+        self.start_frames = max(1, (speech_ms or settings.VAD_SPEECH_MS) // FRAME_MS)
+        self.end_frames = max(1, (hangover_ms or settings.VAD_HANGOVER_MS) // FRAME_MS)
+
+        self.frame_bytes = self.sample_rate * FRAME_MS // 1000 * 2
+        self.noise_floor_db = self.threshold_db - self.margin_db
+        self.in_speech = False
+
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._remainder = b""
+
+    def feed(self, pcm: bytes) -> List[str]:
+        """Consumes a chunk of audio and returns the speech start/end events it contained."""
+        data = self._remainder + pcm
+        usable = len(data) - len(data) % self.frame_bytes
+        self._remainder = data[usable:]
+        if not usable:
+            return []
+
+        frames = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32).reshape(-1, self.frame_bytes // 2)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        levels = 20 * np.log10(rms / 32768.0 + 1e-9)
+
+        events = []
+        for level in levels.tolist():
+            event = self._step(level)
+            if event:
+                events.append(event)
+        return events
+
+    def _step(self, level: float) -> Optional[str]:
+        voiced = level > max(self.threshold_db, self.noise_floor_db + self.margin_db)
+
+        # Track the background level: follow it down quickly, up slowly, so that
+        # speech hardly moves it but steady noise (fans, echo) is learned in seconds
+        rate = 0.2 if level < self.noise_floor_db else 0.002
+        self.noise_floor_db += rate * (level - self.noise_floor_db)
+
+        if voiced:
+            self._voiced_run += 1
+            self._silent_run = 0
+        else:
+            # Decay rather than reset, so a short dip inside a word doesn't restart the count
+            self._voiced_run = max(0, self._voiced_run - 1)
+            self._silent_run += 1
+
+        if not self.in_speech and self._voiced_run >= self.start_frames:
+            self.in_speech = True
+            return SPEECH_START
+        if self.in_speech and self._silent_run >= self.end_frames:
+            self.in_speech = False
+            self._voiced_run = 0
+            return SPEECH_END
+        return None
+
+    def reset(self):
+        self.in_speech = False
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._remainder = b""
@@ -0,0 +1,25 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.services.booking_service import BookingService
+from config.settings import settings
+
+
+@pytest.fixture
+def booking_service(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "AVAILABILITY_CACHE_ENABLED", True)
+    service = BookingService(f"sqlite:///{tmp_path}/bookings.db")
+    yield service
+    service.engine.dispose()
+
+
+@pytest.fixture
+def day():
+    """Midnight a week from now: far enough ahead that every slot that day can be offered."""
+    return (datetime.now() + timedelta(days=7)).replace(hour=0, minute=0, second=0, microsecond=0)
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.orchestrator.agent_orchestrator import CANCELLATION_PROMPT, AgentOrchestrator
+from config.settings import settings
+
+
+class SlowUnderstanding:
+    """Stands in for the LLM: every turn is a cancellation, understood after `delay` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def aunderstand_turn(self, user_input, conversation_history):
+        await asyncio.sleep(self.delay)
+        return {"intent": "cancellation", "entities": {}, "booking_details": {}}
+
+
+@pytest.fixture
+def orchestrator(booking_service, monkeypatch):
+    monkeypatch.setattr(settings, "FAST_PATH_CLASSIFIER", False)
+    monkeypatch.setattr(settings, "COMBINED_TURN_UNDERSTANDING", True)
+    services = SimpleNamespace(llm=None, knowledge_service=None, booking_service=booking_service, speech_service=None,
+                               conversational_agent=SlowUnderstanding(0.2), knowledge_agent=None, booking_agent=None,
+                               turn_classifier=None)
+    return AgentOrchestrator(services)
+
+
+def test_restarting_the_microphone_keeps_the_slot_hold(orchestrator, booking_service, day):
+    slot = day.replace(hour=10)
+    closed = []
+    assert booking_service.hold_slot(slot, "veh_1", orchestrator.slot_holder)
+    orchestrator.voice_channel = SimpleNamespace(close=lambda: closed.append(True))
+
+    orchestrator.close_voice_channel()
+    assert closed and orchestrator.voice_channel is None
+    assert booking_service.slot_holds.held_by(orchestrator.slot_holder) is not None
+
+    orchestrator.close()
+    assert booking_service.slot_holds.held_by(orchestrator.slot_holder) is None
+
+
+def run_turn(orchestrator, interrupt_after: float):
+    replies = []
+
+    def turn():
+        with orchestrator.turn_lock:
+            orchestrator.begin_turn()
+            replies.extend(orchestrator.stream_text_input("forget it"))
+
+    thread = threading.Thread(target=turn)
+    thread.start()
+    time.sleep(interrupt_after)
+    orchestrator.interrupt()
+    thread.join()
+    return replies
+
+
+def test_barge_in_during_understanding_skips_the_handler(orchestrator):
+    handled = []
+    orchestrator._handle_cancellation = lambda: handled.append(True) or CANCELLATION_PROMPT
+
+    assert run_turn(orchestrator, 0.05) == []
+    assert handled == []
+    assert [m["role"] for m in orchestrator.conversation_history] == ["user"]
+
+
+def test_barge_in_waits_for_a_started_handler(orchestrator):
+    steps = []
+
+    def slow_handler():
+        steps.append("started")
+        time.sleep(0.3)
+        steps.append("finished")
+        return CANCELLATION_PROMPT
+
+    orchestrator._handle_cancellation = slow_handler
+    # Interrupted while the handler runs: the turn gives up the lock only once it's done
+    assert run_turn(orchestrator, 0.35) == []
+    assert steps == ["started", "finished"]
+    assert not orchestrator.turn_lock.locked()
+    # Not heard, but recorded so the dialogue knows the request was cleared
+    assert orchestrator.conversation_history[-1] == {"role": "assistant", "content": CANCELLATION_PROMPT}
@@ -0,0 +1,64 @@
+import io
+
+import pytest
+
+from src.services.booking_io import BookingFormatError, export_file, import_file, read_bookings
+from src.services.booking_service import BookingService
+
+COLUMNS = ("customer_name", "customer_phone", "vehicle_id", "vehicle_name", "booking_date", "created_at", "status")
+
+
+def seed(service, day, count=25):
+    rows = [{"customer_name": f"Walk-in {i}", "customer_phone": "5551234567", "vehicle_id": f"veh_{i % 5}",
+             "vehicle_name": "2024 Test Car", "booking_date": day.replace(hour=9 + i // 5),
+             "status": "cancelled" if i % 7 == 0 else "confirmed"} for i in range(count)]
+    return service.create_bookings(rows, batch_size=10)
+
+
+def without_ids(rows):
+    return [tuple(row[column] for column in COLUMNS) for row in rows]
+
+
+@pytest.mark.parametrize("name", ["bookings.csv", "bookings.jsonl"])
+def test_export_imports_back_unchanged(booking_service, day, tmp_path, name):
+    assert seed(booking_service, day) == 25
+    path = str(tmp_path / name)
+    assert export_file(booking_service, path) == 25
+
+    copy = BookingService(f"sqlite:///{tmp_path}/copy.db")
+    assert import_file(copy, path) == 25
+    assert without_ids(copy.iter_bookings()) == without_ids(booking_service.iter_bookings())
+    copy.engine.dispose()
+
+
+def test_export_filters_by_date_and_status(booking_service, day, tmp_path):
+    seed(booking_service, day)
+    path = str(tmp_path / "morning.jsonl")
+    count = export_file(booking_service, path, day.replace(hour=9), day.replace(hour=11), "confirmed")
+    with open(path) as source:
+        rows = list(read_bookings(source, "jsonl"))
+    assert count == len(rows) == 8
+    assert all(row["status"] == "confirmed" and row["booking_date"].hour in (9, 10) for row in rows)
+
+
+@pytest.mark.parametrize("name, content, problem", [
+    ("bad.csv", "customer_name,vehicle_id,booking_date\nSam,veh_1,2030-06-03 10:00\nAlex,,2030-06-03 11:00\n",
+     "Line 3: missing vehicle_id"),
+    ("bad.csv", "customer_name,vehicle_id,booking_date\nSam,veh_1,next week\n", "Line 2: unreadable booking_date"),
+    ("bad.jsonl", '{"customer_name": "Sam", "vehicle_id": "veh_1", "booking_date": "2030-06-03T10:00"}\nnot json\n',
+     "Line 2: not a JSON object"),
+])
+def test_bad_row_rejects_the_whole_file(booking_service, tmp_path, name, content, problem):
+    path = tmp_path / name
+    path.write_text(content)
+    with pytest.raises(BookingFormatError, match=problem):
+        import_file(booking_service, str(path))
+    assert list(booking_service.iter_bookings()) == []
+
+
+def test_reads_csv_rows_as_bookings():
+    source = io.StringIO("customer_name,vehicle_id,booking_date,created_at,status\n"
+                         "Sam,veh_1,2030-06-03 10:00,,\n")
+    (row,) = read_bookings(source, "csv")
+    assert row["booking_date"].isoformat() == "2030-06-03T10:00:00"
+    assert row["created_at"] is None and row["status"] == "confirmed"
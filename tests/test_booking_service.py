@@ -0,0 +1,138 @@
+import threading
+from datetime import timedelta
+
+import pytest
+
+from src.services.booking_service import BookingService, InvalidBookingError, SlotUnavailableError
+
+
+def book(service: BookingService, slot, vehicle_id="veh_1", holder=None, name="Sam"):
+    return service.create_booking(name, "5551234567", vehicle_id, "2024 Test Car", slot, holder)
+
+
+def test_booked_slot_is_refused_with_alternatives(booking_service, day):
+    slot = day.replace(hour=10)
+    book(booking_service, slot)
+
+    # A slot overlapping the first drive (duration plus buffer) clashes too
+    for clashing in (slot, slot + timedelta(minutes=30)):
+        with pytest.raises(SlotUnavailableError) as raised:
+            book(booking_service, clashing, name="Alex")
+        alternatives = raised.value.alternatives
+        assert alternatives and len(alternatives) <= 3
+        assert slot not in alternatives
+        assert all(a.date() == day.date() for a in alternatives)
+
+    # Another vehicle is free at the same time
+    assert book(booking_service, slot, vehicle_id="veh_2").id is not None
+
+
+def test_held_slot_is_refused_to_everyone_but_the_holder(booking_service, day):
+    slot = day.replace(hour=14)
+    assert booking_service.hold_slot(slot, "veh_1", "caller-a")
+    assert not booking_service.hold_slot(slot, "veh_1", "caller-b")
+    assert slot.strftime("%H:%M") not in booking_service.get_available_slots(day, vehicle_id="veh_1", holder="caller-b")
+    assert slot.strftime("%H:%M") in booking_service.get_available_slots(day, vehicle_id="veh_1", holder="caller-a")
+
+    with pytest.raises(SlotUnavailableError) as raised:
+        book(booking_service, slot, holder="caller-b")
+    assert slot not in raised.value.alternatives
+
+    booking = book(booking_service, slot, holder="caller-a")
+    assert booking.booking_date == slot
+    stats = booking_service.get_hold_stats()
+    assert stats["active"] == 0 and stats["converted"] == 1 and stats["refused"] == 1
+
+
+def test_released_hold_frees_the_slot(booking_service, day):
+    slot = day.replace(hour=15)
+    assert booking_service.hold_slot(slot, "veh_1", "caller-a")
+    booking_service.release_hold("caller-a")
+    assert book(booking_service, slot, holder="caller-b").id is not None
+
+
+def test_racing_callers_book_a_slot_once(booking_service, day):
+    slot = day.replace(hour=11)
+    barrier = threading.Barrier(8)
+    booked, refused = [], []
+
+    def caller(index):
+        barrier.wait()
+        try:
+            booked.append(book(booking_service, slot, name=f"Caller {index}"))
+        except SlotUnavailableError:
+            refused.append(index)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(booked) == 1 and len(refused) == 7
+    assert [b.booking_date for b in booking_service.get_bookings_by_date(day)] == [slot]
+
+
+def test_cache_is_written_through_on_create_and_cancel(booking_service, day):
+    cache = booking_service.availability_cache
+    assert "10:00" in booking_service.get_available_slots(day, vehicle_id="veh_1")
+    misses = cache.get_stats()["misses"]
+
+    booking = book(booking_service, day.replace(hour=10))
+    assert "10:00" not in booking_service.get_available_slots(day, vehicle_id="veh_1")
+    assert not booking_service.is_slot_available(day.replace(hour=10), "veh_1")
+
+    assert booking_service.cancel_booking(booking.id)
+    assert "10:00" in booking_service.get_available_slots(day, vehicle_id="veh_1")
+
+    stats = cache.get_stats()
+    # Both writes patched the cached day instead of dropping it
+    assert stats["write_throughs"] == 2
+    assert stats["misses"] == misses
+
+
+def test_refused_booking_leaves_the_cache_alone(booking_service, day):
+    book(booking_service, day.replace(hour=10))
+    writes = booking_service.availability_cache.get_stats()["write_throughs"]
+    with pytest.raises(SlotUnavailableError):
+        book(booking_service, day.replace(hour=10), name="Alex")
+    assert booking_service.availability_cache.get_stats()["write_throughs"] == writes
+    assert len(booking_service.get_bookings_by_date(day)) == 1
+
+
+def test_create_bookings_rejects_a_bad_row_and_saves_nothing(booking_service, day):
+    good = {"customer_name": "Walk-in", "vehicle_id": "veh_1", "booking_date": day.replace(hour=9)}
+    for bad, problem in (({"customer_name": "Walk-in", "vehicle_id": "veh_1"}, "missing booking_date"),
+                         ({**good, "status": "pending"}, "unknown status"),
+                         ({**good, "booking_date": "tomorrow"}, "booking_date must be a datetime")):
+        with pytest.raises(InvalidBookingError, match=problem) as raised:
+            booking_service.create_bookings([good, good, good, bad], batch_size=2)
+        assert raised.value.index == 3
+    assert list(booking_service.iter_bookings()) == []
+
+
+def test_hold_exactly_one_window_away_does_not_clash(booking_service, day):
+    slot = day.replace(hour=10)
+    window = booking_service.slot_engine.window
+    assert booking_service.hold_slot(slot, "veh_1", "caller-a")
+
+    # Closer than a window, the availability check and the booking both refuse it
+    closer = slot + window - timedelta(minutes=1)
+    assert not booking_service.is_slot_available(closer, "veh_1")
+    with pytest.raises(SlotUnavailableError):
+        book(booking_service, closer, holder="caller-b")
+
+    # Exactly a window away, both accept it
+    for neighbour in (slot - window, slot + window):
+        assert booking_service.is_slot_available(neighbour, "veh_1")
+        assert book(booking_service, neighbour, holder="caller-b").booking_date == neighbour
+
+
+def test_refused_hold_gives_up_the_earlier_one(booking_service, day):
+    earlier, wanted = day.replace(hour=10), day.replace(hour=14)
+    assert booking_service.hold_slot(earlier, "veh_1", "caller-a")
+    book(booking_service, wanted, name="Alex")
+
+    assert not booking_service.hold_slot(wanted, "veh_1", "caller-a")
+    assert booking_service.slot_holds.held_by("caller-a") is None
+    assert booking_service.hold_slot(earlier, "veh_1", "caller-b")
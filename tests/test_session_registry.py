@@ -0,0 +1,53 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.orchestrator.session_registry import SessionRegistry
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def registry(clock):
+    released = []
+    booking_service = SimpleNamespace(release_hold=released.append)
+    services = SimpleNamespace(llm=None, knowledge_service=None, booking_service=booking_service, speech_service=None,
+                               conversational_agent=None, knowledge_agent=None, booking_agent=None,
+                               turn_classifier=None)
+    registry = SessionRegistry(services, max_sessions=10, idle_ttl_seconds=60)
+    registry.released = released
+    return registry
+
+
+def test_touch_keeps_a_microphone_only_call_alive(registry, clock):
+    caller = registry.get("voice")
+    idle = registry.get("idle")
+    for _ in range(3):
+        clock[0] += 40
+        # Frames and utterances arrive through touch, never get
+        assert registry.touch("voice") is caller
+
+    registry.get("someone-else")
+    assert "voice" in registry and "idle" not in registry
+    # Only the idle caller's slot hold was let go
+    assert registry.released == [idle.slot_holder]
+
+
+def test_find_does_not_refresh(registry, clock):
+    registry.get("voice")
+    clock[0] += 40
+    registry.find("voice")
+    clock[0] += 40
+    registry.get("someone-else")
+    assert "voice" not in registry
+
+
+def test_touch_never_opens_a_session(registry):
+    assert registry.touch("gone") is None
+    assert "gone" not in registry and len(registry) == 0
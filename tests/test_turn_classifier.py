@@ -0,0 +1,66 @@
+import pytest
+
+from src.agents.turn_classifier import TIER_DIALOGUE_STATE, TIER_LLM, TIER_PATTERN, TurnClassifier
+
+
+@pytest.fixture
+def classifier():
+    return TurnClassifier()
+
+
+@pytest.mark.parametrize("text, name, confidence", [
+    ("My name is sarah connor", "Sarah Connor", 0.8),
+    ("i'm john", "John", 0.8),
+    ("This is Bob.", "Bob", 0.8),
+    ("Priya", "Priya", 0.6),
+])
+def test_reads_a_name_only_when_it_looks_like_one(classifier, text, name, confidence):
+    result = classifier.classify(text, "customer_name")
+    assert result["intent"] == "booking"
+    assert result["entities"] == {"customer_name": name}
+    assert result["confidence"] == confidence < 1.0
+    assert result["tier"] == TIER_DIALOGUE_STATE
+
+
+@pytest.mark.parametrize("text", [
+    "sounds great", "hold on", "next tuesday", "what colours", "sarah", "I'm just browsing", "Wednesday", "Actually",
+])
+def test_leaves_other_replies_to_the_llm(classifier, text):
+    assert classifier.classify(text, "customer_name") is None
+
+
+@pytest.mark.parametrize("text, slot, entities", [
+    ("(555) 123-4567", "customer_phone", {"customer_phone": "5551234567"}),
+    ("555.123.4567", "customer_name", {"customer_phone": "5551234567"}),
+    ("at 3 p.m.", "time", {"time": "3 PM"}),
+    ("2:30pm", "time", {"time": "2:30PM"}),
+    ("next Tuesday", "date", {"date": "next tuesday"}),
+    ("tomorrow", "date", {"date": "tomorrow"}),
+])
+def test_reads_the_slot_being_asked_for(classifier, text, slot, entities):
+    result = classifier.classify(text, slot)
+    assert result["intent"] == "booking"
+    assert result["entities"] == entities
+    assert result["booking_details"] == {}
+
+
+@pytest.mark.parametrize("text, slot", [("3pm", "date"), ("tomorrow", "time"), ("3pm", None), ("Priya", None)])
+def test_slot_answers_need_the_matching_question(classifier, text, slot):
+    assert classifier.classify(text, slot) is None
+
+
+@pytest.mark.parametrize("text, intent", [("Hello there!", "greeting"), ("yes please", "confirmation"),
+                                          ("never mind", "cancellation")])
+def test_fixed_phrases_in_any_state(classifier, text, intent):
+    for slot in (None, "customer_name", "time"):
+        result = classifier.classify(text, slot)
+        assert result["intent"] == intent and result["tier"] == TIER_PATTERN
+
+
+def test_counts_turns_per_tier(classifier):
+    classifier.classify("hi")
+    classifier.classify("Priya", "customer_name")
+    classifier.classify("what SUVs do you have?")
+    stats = classifier.get_stats()
+    assert stats["tiers"] == {TIER_PATTERN: 1, TIER_DIALOGUE_STATE: 1, TIER_LLM: 1}
+    assert stats["llm_calls_saved"] == 2
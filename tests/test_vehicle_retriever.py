@@ -0,0 +1,45 @@
+import pytest
+
+from src.services.vehicle_retriever import (EXPANSIONS_BY_TOKEN, QUERY_EXPANSIONS, HashingEmbedder, VehicleRetriever,
+                                            parse_budget)
+
+VEHICLES = [
+    {"id": "sedan_001", "category": "sedan", "make": "Toyota", "model": "Camry", "price": 32500, "available": True,
+     "fuel_type": "Gasoline", "features": ["Apple CarPlay"]},
+    {"id": "suv_001", "category": "suv", "make": "Honda", "model": "Pilot", "price": 45000, "available": True,
+     "fuel_type": "Gasoline", "features": ["Third Row Seating", "Honda Sensing Safety"]},
+    {"id": "suv_002", "category": "suv", "make": "Lexus", "model": "RX", "price": 52000, "available": True,
+     "fuel_type": "Gasoline", "features": ["Leather Seats", "Premium Audio", "Sunroof"]},
+]
+
+
+@pytest.fixture
+def retriever():
+    return VehicleRetriever.build(VEHICLES, 1024)
+
+
+@pytest.mark.parametrize("word", sorted(QUERY_EXPANSIONS))
+def test_every_expansion_fires_on_its_word(word):
+    assert EXPANSIONS_BY_TOKEN[HashingEmbedder.tokens(word)[0]] == QUERY_EXPANSIONS[word]
+
+
+@pytest.mark.parametrize("query, best", [("something for the kids", "suv_001"), ("a luxurious ride", "suv_002")])
+def test_everyday_wording_reaches_the_catalog(retriever, query, best):
+    assert retriever.search(query, 1)[0]["id"] == best
+
+
+@pytest.mark.parametrize("text, budget", [
+    ("under 40k", 40000.0),
+    ("budget of $35,000", 35000.0),
+    ("around 30 grand", 30000.0),
+    ("max 25000", 25000.0),
+    ("under $40", 40000.0),
+    ("seats up to 7 kids, under 45k", 45000.0),
+    ("seats up to 7 people", None),
+    ("about 5 years old", None),
+    ("room for about 6", None),
+    ("up to 7 kids", None),
+])
+def test_budget_needs_a_price_marker_or_a_price_sized_number(text, budget):
+    assert parse_budget(text) == budget
+
@@ -30,31 +30,151 @@ function addMessage(text, sender) {
     chatWindow.scrollTop = chatWindow.scrollHeight;
 }
 
-// Audio: Play
-function playAudio(hexString) {
-    if (!hexString || !voiceEnabled) return;
-    const byteArray = new Uint8Array(hexString.match(/.{1,2}/g).map(byte => parseInt(byte, 16)));
-    const blob = new Blob([byteArray], { type: 'audio/wav' });
+// Audio: Play (audio arrives as a binary attachment, i.e. an ArrayBuffer, and the
+// payload says which format it is in)
+let currentAudio = null;
+
+function playAudio(data) {
+    if (!data.audio || !voiceEnabled) return;
+    if (data.mime === 'audio/pcm') {
+        enqueueAudioChunk(data); // headerless, so <audio> can't play it
+        return;
+    }
+    const blob = new Blob([data.audio], { type: data.mime || 'audio/wav' });
     const url = URL.createObjectURL(blob);
-    const audio = new Audio(url);
-    audio.play();
+    currentAudio = new Audio(url);
+    currentAudio.play();
+}
+
+// Audio: Streaming playback. Chunks are decoded as they arrive and scheduled
+// back-to-back on one AudioContext clock, so sentences play without gaps.
+let audioCtx = null;
+let playbackTime = 0;
+let scheduleChain = Promise.resolve();
+let activeSources = new Set();
+let playbackGeneration = 0; // bumped on barge-in so chunks still decoding are dropped
+
+function getAudioContext() {
+    if (!audioCtx) audioCtx = new (window.AudioContext || window.webkitAudioContext)();
+    if (audioCtx.state === 'suspended') audioCtx.resume();
+    return audioCtx;
+}
+
+function scheduleBuffer(buffer) {
+    const ctx = getAudioContext();
+    const source = ctx.createBufferSource();
+    source.buffer = buffer;
+    source.connect(ctx.destination);
+    const startAt = Math.max(ctx.currentTime, playbackTime);
+    source.start(startAt);
+    playbackTime = startAt + buffer.duration;
+    activeSources.add(source);
+    source.onended = () => activeSources.delete(source);
+}
+
+// Raw 16-bit little-endian mono PCM straight into an AudioBuffer
+function pcmToAudioBuffer(ctx, arrayBuffer, sampleRate) {
+    const samples = new Int16Array(arrayBuffer, 0, Math.floor(arrayBuffer.byteLength / 2));
+    const buffer = ctx.createBuffer(1, samples.length, sampleRate);
+    const channel = buffer.getChannelData(0);
+    for (let i = 0; i < samples.length; i++) channel[i] = samples[i] / 0x8000;
+    return buffer;
+}
+
+function enqueueAudioChunk(data) {
+    const ctx = getAudioContext();
+    const generation = playbackGeneration;
+    // Start decoding immediately, but schedule strictly in arrival (= sequence) order
+    const decoded = data.mime === 'audio/pcm'
+        ? Promise.resolve(pcmToAudioBuffer(ctx, data.audio, data.sample_rate))
+        : ctx.decodeAudioData(data.audio);
+    scheduleChain = scheduleChain
+        .then(() => decoded)
+        .then(buffer => { if (generation === playbackGeneration) scheduleBuffer(buffer); })
+        .catch(err => console.error('Audio chunk failed to decode', err));
+}
+
+// Stops everything playing or scheduled; returns whether anything was audible
+function stopPlayback() {
+    let wasPlaying = activeSources.size > 0;
+    activeSources.forEach(source => source.stop());
+    activeSources.clear();
+    playbackGeneration++;
+    playbackTime = 0;
+    if (currentAudio && !currentAudio.paused) {
+        currentAudio.pause();
+        wasPlaying = true;
+    }
+    currentAudio = null;
+    return wasPlaying;
 }
 
 // Socket Response
-socket.on('assistant_response', (data) => {
-    // Reset Mic UI
+let liveMessage = null; // assistant bubble being filled by streamed text
+let cancelledTurn = 0;  // replies up to this turn were interrupted by the caller
+
+function isCancelled(data) {
+    return data.turn !== undefined && data.turn <= cancelledTurn;
+}
+
+function resetMicUI() {
+    // While the mic is streaming it stays live across turns
+    if (micStream) {
+        micStatus.innerText = "Listening...";
+        return;
+    }
     micHub.classList.remove('mic-active');
     micStatus.innerText = "Tap to speak";
     micBtn.disabled = false;
     userInput.disabled = false;
+}
+
+socket.on('user_transcript', (data) => {
+    addMessage(data.text, 'user');
+});
+
+socket.on('assistant_partial', (data) => {
+    if (isCancelled(data)) return;
+    resetMicUI();
+    if (!liveMessage) {
+        liveMessage = document.createElement('div');
+        liveMessage.classList.add('msg', 'assistant');
+        chatWindow.appendChild(liveMessage);
+    }
+    liveMessage.innerText += data.text;
+    chatWindow.scrollTop = chatWindow.scrollHeight;
+});
+
+socket.on('assistant_response', (data) => {
+    if (isCancelled(data)) return;
+    resetMicUI();
 
     if (data.user_said) addMessage(data.user_said, 'user');
-    addMessage(data.response, 'assistant');
-    playAudio(data.audio);
+    if (liveMessage) {
+        liveMessage.innerText = data.response;
+        liveMessage = null;
+    } else {
+        addMessage(data.response, 'assistant');
+    }
+    if (!data.streaming) playAudio(data);
+});
+
+socket.on('assistant_audio_chunk', (data) => {
+    if (!data.audio || !voiceEnabled || isCancelled(data)) return;
+    enqueueAudioChunk(data);
+});
+
+// Barge-in: the caller started talking over the assistant
+socket.on('barge_in', (data) => {
+    cancelledTurn = Math.max(cancelledTurn, data.turn);
+    const stopped = stopPlayback();
+    liveMessage = null;
+    socket.emit('barge_in_ack', { turn: data.turn, stopped: stopped });
 });
 
 // Start Overlay
 startBtn.addEventListener('click', () => {
+    getAudioContext(); // browsers only allow audio to start from a user gesture
     overlay.style.opacity = '0';
     setTimeout(() => {
         overlay.style.display = 'none';
@@ -71,16 +191,71 @@ function handleChat() {
     socket.emit('send_message', { message: text });
 }
 
-function handleVoice() {
-    // Set UI to Listening mode
+// Microphone: capture locally, downsample to 16 kHz 16-bit mono PCM and stream
+// the frames to the server's recognizer until the mic is tapped again.
+const STREAM_SAMPLE_RATE = 16000;
+let micStream = null;
+let micContext = null;
+let micProcessor = null;
+
+function downsampleToInt16(input, inputRate) {
+    const ratio = inputRate / STREAM_SAMPLE_RATE;
+    const output = new Int16Array(Math.floor(input.length / ratio));
+    for (let i = 0; i < output.length; i++) {
+        const start = Math.floor(i * ratio);
+        const end = Math.min(Math.floor((i + 1) * ratio), input.length);
+        let sum = 0;
+        for (let j = start; j < end; j++) sum += input[j];
+        const sample = Math.max(-1, Math.min(1, sum / Math.max(1, end - start)));
+        output[i] = sample < 0 ? sample * 0x8000 : sample * 0x7fff;
+    }
+    return output;
+}
+
+async function startMicStream() {
+    micStream = await navigator.mediaDevices.getUserMedia({
+        audio: { channelCount: 1, echoCancellation: true, noiseSuppression: true }
+    });
+    micContext = new (window.AudioContext || window.webkitAudioContext)();
+    const source = micContext.createMediaStreamSource(micStream);
+    micProcessor = micContext.createScriptProcessor(4096, 1, 1);
+    micProcessor.onaudioprocess = (event) => {
+        const pcm = downsampleToInt16(event.inputBuffer.getChannelData(0), micContext.sampleRate);
+        socket.emit('audio_frame', pcm.buffer);
+    };
+    source.connect(micProcessor);
+    micProcessor.connect(micContext.destination);
+
+    socket.emit('start_stream');
     micHub.classList.add('mic-active');
     micStatus.innerText = "Listening...";
-    micBtn.disabled = true;
-    userInput.disabled = true;
-    
-    socket.emit('start_voice');
 }
 
+function stopMicStream() {
+    socket.emit('stop_stream');
+    if (micProcessor) micProcessor.disconnect();
+    if (micContext) micContext.close();
+    if (micStream) micStream.getTracks().forEach(track => track.stop());
+    micStream = micContext = micProcessor = null;
+    micHub.classList.remove('mic-active');
+    micStatus.innerText = "Tap to speak";
+}
+
+function handleVoice() {
+    if (micStream) {
+        stopMicStream();
+        return;
+    }
+    startMicStream().catch(err => {
+        console.error('Microphone unavailable', err);
+        micStatus.innerText = "Microphone unavailable";
+    });
+}
+
+socket.on('partial_transcript', (data) => {
+    micStatus.innerText = data.text;
+});
+
 sendBtn.addEventListener('click', handleChat);
 userInput.addEventListener('keypress', (e) => { if(e.key === 'Enter') handleChat(); });
 micBtn.addEventListener('click', handleVoice);
\ No newline at end of file